@@ -2,16 +2,28 @@
 
 # Examples control some example games (found in ./examples)
 # Just do python3 examples.py <name> to run them
+# Blackjack sessions can be recorded and played back:
+#   python3 demos.py blackjack record <file> [seed]
+#   python3 demos.py blackjack replay <file>
+#   python3 demos.py blackjack benchmark <file>     (replays as fast as possible)
+# Blackjack can be streamed and watched from another terminal:
+#   python3 demos.py blackjack stream <host:port or socket path>
+#   python3 demos.py watch <host:port or socket path>
+# Blackjack can be hosted for many players at once, each connecting from their own terminal:
+#   python3 demos.py blackjack serve <socket path>
+#   python3 demos.py connect <socket path>
 
 import sys
 
 # Import all the examples
 from examples.test import test
-from examples.Blackjack import run as runBlackjack
+from examples.Blackjack import run as runBlackjack, serve as serveBlackjack
+
+from gent import watchStream, parseAddress, connectToServer
 
 if __name__ == "__main__":
     
-    if len(sys.argv) != 2:
+    if len(sys.argv) < 2:
         raise Exception("Please specify the game you want to play.")
 
     # Testing call
@@ -19,8 +31,25 @@ if __name__ == "__main__":
         test()
     
     # Blackjack
-    if sys.argv[1] == "blackjack":
-        runBlackjack()
+    elif sys.argv[1] == "blackjack":
+        if len(sys.argv) >= 4 and sys.argv[2] == "record":
+            runBlackjack(recordPath = sys.argv[3], seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0)
+        elif len(sys.argv) >= 4 and sys.argv[2] in ("replay", "benchmark"):
+            runBlackjack(replayPath = sys.argv[3], realTime = sys.argv[2] == "replay")
+        elif len(sys.argv) >= 4 and sys.argv[2] == "stream":
+            runBlackjack(streamAddress = parseAddress(sys.argv[3]))
+        elif len(sys.argv) >= 4 and sys.argv[2] == "serve":
+            serveBlackjack(sys.argv[3])
+        else:
+            runBlackjack()
+
+    # Watch a streamed game
+    elif sys.argv[1] == "watch" and len(sys.argv) >= 3:
+        watchStream(parseAddress(sys.argv[2]))
+
+    # Play a game hosted by a GameServer
+    elif sys.argv[1] == "connect" and len(sys.argv) >= 3:
+        connectToServer(sys.argv[2])
 
     # Didn't call a valid game
     else:
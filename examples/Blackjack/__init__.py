@@ -1,3 +1,3 @@
 # Copyright Clayton Brown 2019. See LICENSE file.
 
-from .blackjack import run
\ No newline at end of file
+from .blackjack import run, serve
\ No newline at end of file
@@ -1,23 +1,69 @@
 # Copyright Clayton Brown 2019. See LICENSE file.
 
 # Main blackjack file. Create the game and starts the menu screen.
-from .state import STATE
+from .state import BlackJackState
 
 from .screens import initializeScreens
 
-from gent import Game
+from gent import Game, GameServer, ReplayEventGetter
 
-def run():
+def createGame(eventGetter = None, outputStream = None) -> Game:
+    '''
+    Create a blackjack game on the start screen, with its own state. Also used as the GameServer gameFactory, so every session deals its own cards.
+    '''
 
-    # Initialize the state
-    STATE.deal()
-
-    # Create the game object
-    g = Game(STATE, (54, 19))
+    state = BlackJackState()
+    g = Game(state, (54, 19), eventGetter = eventGetter, outputStream = outputStream)
 
     # Add all the screens to the game
     initializeScreens(g)
 
     # Start the game on the start screen
     g.goToScreen("Start")
-    g.gameLoop()
\ No newline at end of file
+
+    return g
+
+def run(recordPath: str = None, replayPath: str = None, realTime: bool = True, seed: int = None, streamAddress = None):
+    '''
+    Parameters
+    ----------
+    recordPath: File to record the session to
+
+    replayPath: Recording to play back instead of using the keyboard
+
+    realTime: Whether a replay waits between events like the recording, or runs as fast as possible
+
+    seed: Random seed stored in the recording, so the replay deals the same cards
+
+    streamAddress: Unix socket path or (host, port) to stream the frames to, so the game can be watched remotely
+    '''
+
+    # Replays give the game the recorded events instead of the keyboard
+    eventGetter = None
+    if replayPath is not None:
+        eventGetter = ReplayEventGetter(replayPath, realTime)
+
+    # Create the game object
+    g = createGame(eventGetter)
+
+    if recordPath is not None:
+        g.startRecording(recordPath, seed)
+
+    if streamAddress is not None:
+        g.startStreaming(streamAddress)
+
+    # Initialize the state. Done after recording starts so the deal uses the recorded seed
+    g.gameState.deal()
+
+    g.gameLoop()
+
+def serve(socketPath: str):
+    '''
+    Host a blackjack game for everyone who connects to the unix socket, until stopped with ctrl+c. Connect with connectToServer.
+    '''
+
+    server = GameServer(createGame, socketPath)
+    try:
+        server.serveForever()
+    except KeyboardInterrupt:
+        server.stop()
\ No newline at end of file
@@ -7,5 +7,6 @@ from gent import Game
 
 def initializeScreens(game: Game):
     
-    game.addScreen("Start", setStart)
+    # The start screen never changes, so it is kept built. The game screen deals new cards each time
+    game.addScreen("Start", setStart, cache = True)
     game.addScreen("Game",  setGame)
\ No newline at end of file
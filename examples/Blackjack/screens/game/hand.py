@@ -8,7 +8,7 @@ from gent import Box
 from gent import GameObject
 from gent import TextLine
 
-from ...state import STATE
+from ...state import BlackJackState
 
 class CardDisplay(GameObject):
     '''
@@ -38,8 +38,6 @@ class CardDisplay(GameObject):
 
         else:
             self.name.text = " " + cardData.name + " of " + cardData.suit
-            
-        self.name.rerender()
 
     def render(self):
         
@@ -51,9 +49,11 @@ class Hand(GameObject):
     The start screen contains the blackjack background image and user options.
     '''
 
-    def __init__(self, box: Box, cardList: List[CardData], player: str):
+    def __init__(self, box: Box, state: BlackJackState, cardList: List[CardData], player: str):
         GameObject.__init__(self, box)
 
+        self.state: BlackJackState = state
+
         self.cardList: List[CardData] = cardList
         self.player: TextLine = TextLine(Box(0, 0, self.w, 1), player, (255, 255, 255), (60, 15, 90), justify="C")
         self.cardTotal: TextLine = TextLine(Box(0, 1, self.w, 1), "", (255, 255, 255), (60, 15, 90), justify="C")
@@ -70,19 +70,17 @@ class Hand(GameObject):
         self.player.drawOn(self)
 
         if self.player.text == "Player":
-            self.cardTotal.text = "Total: " + str(STATE.playerCardTotal)
+            self.cardTotal.text = "Total: " + str(self.state.playerCardTotal)
         else:
-            self.cardTotal.text = "Total: " + str(STATE.dealerCardTotal)
-        self.cardTotal.rerender()
+            self.cardTotal.text = "Total: " + str(self.state.dealerCardTotal)
         self.cardTotal.drawOn(self)
 
         for y in range(len(self.cardList)):
 
             hide = False
-            if y == 0 and self.player.text == "Dealer" and STATE.turn == "player":
+            if y == 0 and self.player.text == "Dealer" and self.state.turn == "player":
                 hide = True
 
             data = self.cardList[y]
             self.cardObjects[y].setCard(data, hide=hide)
-            self.cardObjects[y].rerender()
             self.cardObjects[y].drawOn(self)
\ No newline at end of file
@@ -8,7 +8,7 @@ from gent import Event
 from .hand import Hand
 from .controls import Controls
 
-from ...state import STATE
+from ...state import BlackJackState
 
 class GameScreen(GameObject):
     '''
@@ -19,11 +19,14 @@ class GameScreen(GameObject):
         GameObject.__init__(self, Box(0, 0, 54, 19), game = game)
         # self.addObjectHandler()
 
+        # Each game has its own state, so several games can be hosted at once
+        self.state: BlackJackState = game.gameState
+
         playerBox = Box(0, 0, 26, 12)
-        self.playerHand: Hand = Hand(playerBox, STATE.playerCards, "Player")
+        self.playerHand: Hand = Hand(playerBox, self.state, self.state.playerCards, "Player")
 
         dealerBox = Box(28, 0, 26, 12)
-        self.dealerHand: Hand = Hand(dealerBox, STATE.dealerCards, "Dealer")
+        self.dealerHand: Hand = Hand(dealerBox, self.state, self.state.dealerCards, "Dealer")
 
         self.controls: Controls = Controls()
     
@@ -34,7 +37,7 @@ class GameScreen(GameObject):
 
         # Hit
         if event.keyName == "RETURN":
-            STATE.hit("player")
+            self.state.hit("player")
         
         # Stay
         if event.keyName == "SPACE":
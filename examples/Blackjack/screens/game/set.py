@@ -4,14 +4,12 @@ from gent import Game
 
 from .screen import GameScreen
 
-from ...state import STATE
-
 def setGame(game: Game):
     '''
     Set all the correct game object for the blackjack game start menu
     '''
 
-    STATE.deal()
+    game.gameState.deal()
 
     # Now create the necessary start menu info
     gameScreen = GameScreen(game)
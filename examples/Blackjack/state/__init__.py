@@ -1,5 +1,5 @@
 # Copyright Clayton Brown 2019. See LICENSE file.
 
-from .gameState import STATE
+from .gameState import BlackJackState
 
 from .deck import CardData, Deck
\ No newline at end of file
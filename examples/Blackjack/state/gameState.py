@@ -94,7 +94,4 @@ class BlackJackState(GameState):
         else:
             self.dealerCards.append(self.deck.cards.pop(0))
         
-        self.determineTotals()
-
-
-STATE = BlackJackState()
\ No newline at end of file
+        self.determineTotals()
\ No newline at end of file
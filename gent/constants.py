@@ -10,4 +10,5 @@ CONNECTION_UP    = { "e" }
 CONNECTION_DOWN  = { "d" }
 
 # HOTKEYS
-HOTKEY_OPEN_HELP = { "h" }
\ No newline at end of file
+HOTKEY_OPEN_HELP = { "h" }
+HOTKEY_FILTER    = { "/" }
\ No newline at end of file
@@ -9,12 +9,23 @@ from .game import Selection
 from .game import Game
 
 from .gameState import GameState
+from .autoSaver import AutoSaver
+from .gameStateHistory import GameStateHistory
+from .screenCache import ScreenCache
+from .replay import EventRecorder, ReplayEventGetter, NullEventGetter
 
-from .canvas import Canvas
+from .canvas import Canvas, CanvasPool, CANVAS_POOL
+from .virtualTerminal import VirtualTerminal
+from .frameStream import FrameStreamer, FrameViewer, watchStream, parseAddress
 
-from .timing import timeFunction
+from .gameServer import GameServer, connectToServer
+
+from .timing import timeFunction, sleepFunction
+from .timing import Clock, MonotonicClock, VirtualClock, setClock, getClock
 
 from .box import Box
 
+from .spatialIndex import SpatialGrid
+
 from .selection import Selection_Box
 from .selection import Selection_Fill
\ No newline at end of file
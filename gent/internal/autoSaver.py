@@ -0,0 +1,192 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from threading import Thread, Lock, Condition, Event
+
+from typing import Dict, Union
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+from .gameState import GameState, INCREMENTAL_MANIFEST
+from .timing import timeFunction
+
+def writeAtomic(filePath: str, data: bytes):
+    '''
+    Write data to a file so that the file either has its old contents or all of the new contents, even if the program is killed part way through.
+    The data is written to a temporary file, flushed to disk, and then renamed over the file.
+    '''
+
+    directory = os.path.dirname(os.path.abspath(filePath))
+
+    fileDescriptor, temporaryPath = tempfile.mkstemp(dir = directory)
+    try:
+        with os.fdopen(fileDescriptor, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaryPath, filePath)
+
+    except BaseException:
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+        raise
+
+    # Make sure the rename itself is on disk. Directories can't be opened like this on windows
+    if os.name == "posix":
+        directoryDescriptor = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(directoryDescriptor)
+        finally:
+            os.close(directoryDescriptor)
+
+class AutoSaver(Thread):
+    '''
+    Saves a GameState on a background thread, so saving never stalls the update loop.
+
+    Asking for a save pickles the gameState on the calling thread, so the save is a consistent copy of it. Hashing and writing happen on this thread.
+
+    Parameters
+    ----------
+    gameState: The gameState to save
+
+    savePath: Where to save. A file, or a directory if incremental is set
+
+    interval: Seconds between automatic saves when update is called. None only saves when requestSave is called
+
+    incremental: Whether to save each attribute to its own file in the savePath directory, and only write the attributes which have changed.
+        A save only takes effect once its manifest is written, so a crash part way through leaves the previous save whole. Load the directory with GameState.load
+    '''
+
+    def __init__(self, gameState: GameState, savePath: str, interval: float = 60.0, incremental: bool = False):
+        Thread.__init__(self, daemon = True)
+
+        self.gameState: GameState = gameState
+        self.savePath: str = savePath
+        self.interval: float = interval
+        self.incremental: bool = incremental
+
+        # The newest snapshot which hasn't been written yet. If another save is asked for first, the older snapshot is skipped
+        self.pendingSnapshot: Union[bytes, Dict[str, bytes]] = None
+        self.lock: Lock = Lock()
+        self.saveEvent: Event = Event()
+
+        # Count requested and finished saves so that flush can wait for them
+        self.requestedSaves: int = 0
+        self.finishedSaves: int = 0
+        self.finishedCondition: Condition = Condition(self.lock)
+
+        # Time of the last save request
+        self.lastSaveTime: float = timeFunction()
+
+        # For incremental saves, the file holding each attribute in the last manifest written
+        self.savedFiles: Dict[str, str] = {}
+
+        # The last error writing a save, if there was one. Errors don't stop the saver
+        self.lastError: Exception = None
+
+        self.running: bool = True
+
+    def requestSave(self):
+        '''
+        Snapshot the gameState and save it in the background. Should be called from the thread which changes the gameState.
+        '''
+
+        snapshot = self.gameState.createSnapshot(perAttribute = self.incremental)
+
+        with self.lock:
+            self.pendingSnapshot = snapshot
+            self.requestedSaves += 1
+
+        self.lastSaveTime = timeFunction()
+        self.saveEvent.set()
+
+    def update(self, now: float):
+        '''
+        Ask for a save if the interval has passed. Called each update by the game.
+        '''
+
+        if self.interval is not None and now - self.lastSaveTime >= self.interval:
+            self.requestSave()
+
+    def flush(self, timeout: float = None) -> bool:
+        '''
+        Wait for every requested save to be written. Returns False if the timeout ran out first.
+        '''
+
+        with self.finishedCondition:
+            return self.finishedCondition.wait_for(lambda: self.finishedSaves >= self.requestedSaves or not self.is_alive(), timeout)
+
+    def stop(self, saveFirst: bool = True):
+        '''
+        Stop the saver after writing any pending save.
+
+        Parameters
+        ----------
+        saveFirst: Whether to snapshot and save the gameState one last time
+        '''
+
+        if saveFirst:
+            self.requestSave()
+
+        self.flush()
+
+        self.running = False
+        self.saveEvent.set()
+
+    def run(self):
+
+        while self.running:
+            self.saveEvent.wait()
+            self.saveEvent.clear()
+
+            with self.lock:
+                snapshot = self.pendingSnapshot
+                savesIncluded = self.requestedSaves
+                self.pendingSnapshot = None
+
+            if snapshot is None:
+                continue
+
+            try:
+                if self.incremental:
+                    self.writeIncremental(snapshot)
+                else:
+                    writeAtomic(self.savePath, snapshot)
+                self.lastError = None
+
+            except Exception as e: #pylint: disable=broad-except
+                self.lastError = e
+
+            with self.finishedCondition:
+                self.finishedSaves = savesIncluded
+                self.finishedCondition.notify_all()
+
+    def writeIncremental(self, snapshot: Dict[str, bytes]):
+        '''
+        Write each attribute which changed since the last save to a new file, then write the manifest listing them.
+            Until the manifest is replaced, it still lists the files of the previous save, which are left untouched.
+        '''
+
+        os.makedirs(self.savePath, exist_ok = True)
+
+        attributeFiles = {}
+        for key, data in snapshot.items():
+
+            # Named after the hash, so an unchanged attribute keeps its file
+            fileName = "%s.%s.pickle" % (key, hashlib.sha1(data).hexdigest())
+            if self.savedFiles.get(key) != fileName:
+                writeAtomic(os.path.join(self.savePath, fileName), data)
+
+            attributeFiles[key] = fileName
+
+        # The manifest is written after the attributes, so it only ever lists attributes which have been written
+        writeAtomic(os.path.join(self.savePath, INCREMENTAL_MANIFEST), pickle.dumps(attributeFiles, protocol = pickle.HIGHEST_PROTOCOL))
+        self.savedFiles = attributeFiles
+
+        # Then the files of earlier saves can be removed
+        savedFileNames = set(attributeFiles.values())
+        for fileName in os.listdir(self.savePath):
+            if fileName.endswith(".pickle") and fileName not in savedFileNames:
+                os.remove(os.path.join(self.savePath, fileName))
\ No newline at end of file
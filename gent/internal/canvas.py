@@ -1,6 +1,8 @@
 # Copyright Clayton Brown 2019. See LICENSE file.
 
-from typing import List
+from typing import Dict, List
+
+from threading import Lock
 
 import numpy
 
@@ -11,6 +13,8 @@ from sty import fg, bg
 from ..utilities import ImageData
 from typing import Tuple
 
+from .box import Box
+
 class Canvas:
     '''
     The Canvas class holds all the screen information necessary to draw in the terminal.
@@ -39,6 +43,32 @@ class Canvas:
         # Populate the character and format arrays with default values
         self.clearCanvas(" ", 0)
     
+    def view(self, box: Box, transparency: numpy.ndarray = None) -> "Canvas":
+        '''
+        Get a canvas which is a window onto a box of this canvas. Its arrays are views of this canvas's arrays, so drawing on it draws on this canvas without any copying.
+        Returns None if the box isn't entirely on this canvas.
+
+        Parameters
+        ----------
+        transparency: Array of (box.w, box.h) to use for the view's transparency instead of sharing this canvas's
+        '''
+
+        if box.x < 0 or box.y < 0 or box.w < 0 or box.h < 0 or box.x + box.w > self.width or box.y + box.h > self.height:
+            return None
+
+        x, y, w, h = box.x, box.y, box.w, box.h
+
+        # Skip __init__, which would allocate new arrays
+        view = Canvas.__new__(Canvas)
+        view.width = w
+        view.height = h
+        view.characters = self.characters[x:x + w, y:y + h]
+        view.textColors = self.textColors[x:x + w, y:y + h]
+        view.backgroundColors = self.backgroundColors[x:x + w, y:y + h]
+        view.transparency = self.transparency[x:x + w, y:y + h] if transparency is None else transparency
+
+        return view
+
     def drawImage(self, image: ImageData, location: Tuple[int] = (0, 0)):
         '''
         Draw imageData onto a location on the canvas
@@ -107,3 +137,105 @@ class Canvas:
         # Add the last
         return "".join(resultingString)
 
+class CanvasPool:
+    '''
+    Keeps released canvases so new ones of the same size can reuse their arrays instead of allocating.
+    Canvases are bucketed by (width, height). GameObjects get their canvases from CANVAS_POOL.
+
+    Parameters
+    ----------
+    maxPerSize: The most canvases kept of each size. Anything released past that is left to be freed
+    '''
+
+    def __init__(self, maxPerSize: int = 64):
+
+        self.maxPerSize: int = maxPerSize
+
+        # Released canvases keyed by (width, height)
+        self.buckets: Dict[tuple, List[Canvas]] = {}
+
+        # Released transparency arrays, used by gameObjects rendering onto canvas views, keyed by (width, height)
+        self.transparencyBuckets: Dict[tuple, List[numpy.ndarray]] = {}
+
+        # GameObjects are created and removed on both the event and update threads
+        self.lock: Lock = Lock()
+
+        # Counts for checking how well the pool is working
+        self.reused: int = 0
+        self.allocated: int = 0
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets.values())
+
+    def acquire(self, width: int, height: int) -> Canvas:
+        '''
+        Get a cleared canvas, reusing a released one if there is one of the right size.
+        '''
+
+        with self.lock:
+            bucket = self.buckets.get((width, height))
+            canvas = bucket.pop() if bucket else None
+
+            if canvas is None:
+                self.allocated += 1
+            else:
+                self.reused += 1
+
+        if canvas is None:
+            return Canvas(width, height)
+
+        # Put the canvas back how a new one starts
+        canvas.clearCanvas(" ", 0)
+        return canvas
+
+    def release(self, canvas: Canvas):
+        '''
+        Give a canvas back to the pool. It must not be used after this.
+        '''
+
+        # Views share another canvas's arrays, so pooling one would let two owners draw on the same cells
+        if canvas is None or canvas.characters.base is not None:
+            return
+
+        with self.lock:
+            bucket = self.buckets.setdefault((canvas.width, canvas.height), [])
+            if len(bucket) < self.maxPerSize:
+                bucket.append(canvas)
+
+    def acquireTransparency(self, width: int, height: int) -> numpy.ndarray:
+        '''
+        Get a cleared transparency array, reusing a released one if there is one of the right size.
+        '''
+
+        with self.lock:
+            bucket = self.transparencyBuckets.get((width, height))
+            transparency = bucket.pop() if bucket else None
+
+        if transparency is None:
+            return numpy.zeros((width, height), dtype = numpy.uint8)
+
+        transparency[:,:] = 0
+        return transparency
+
+    def releaseTransparency(self, transparency: numpy.ndarray):
+        '''
+        Give a transparency array back to the pool. It must not be used after this.
+        '''
+
+        if transparency is None:
+            return
+
+        with self.lock:
+            bucket = self.transparencyBuckets.setdefault(transparency.shape, [])
+            if len(bucket) < self.maxPerSize:
+                bucket.append(transparency)
+
+    def clear(self):
+
+        with self.lock:
+            self.buckets.clear()
+            self.transparencyBuckets.clear()
+
+# The pool GameObject canvases come from
+CANVAS_POOL: CanvasPool = CanvasPool()
+
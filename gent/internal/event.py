@@ -4,7 +4,7 @@ from dataclasses import dataclass
 
 from enum import Enum, auto
 
-from typing import Tuple
+from typing import List, Tuple
 
 from sys import platform
 
@@ -89,6 +89,14 @@ LINUX_EVENT_MAP = {
 
 }
 
+# SGR mouse reports look like ESC [ < button ; x ; y M (or m for a release)
+MOUSE_PREFIX = (27, 91, 60)
+MOUSE_TERMINATORS = { ord("M"), ord("m") }
+
+# Terminal sequences to turn SGR mouse reporting (clicks, drags, and scrolling) on and off
+MOUSE_ENABLE = "\x1b[?1000h\x1b[?1002h\x1b[?1006h"
+MOUSE_DISABLE = "\x1b[?1006l\x1b[?1002l\x1b[?1000l"
+
 @dataclass
 class Event:
     '''
@@ -104,11 +112,96 @@ class Event:
     # Character Value
     char: str = None
 
+    # Mouse events have the position (in characters, from the top left of the screen) and the button (0 left, 1 middle, 2 right)
+    mouseX: int = None
+    mouseY: int = None
+    mouseButton: int = None
+
+    def isMouseEvent(self) -> bool:
+        return self.mouseX is not None
+
+def isIncompleteMouseSequence(e: Tuple[int]) -> bool:
+    '''
+    Whether the input ends part way through a mouse report.
+    '''
+
+    # Find the start of the last mouse report
+    for i in range(len(e) - 3, -1, -1):
+        if e[i:i + 3] == MOUSE_PREFIX:
+            return not any(c in MOUSE_TERMINATORS for c in e[i + 3:])
+
+    return False
+
+def splitSequence(e: Tuple[int]) -> List[Tuple[int]]:
+    '''
+    Split input into the sequences for each event. Several mouse reports can arrive at once, such as while dragging.
+    '''
+
+    sequences = []
+
+    start = 0
+    i = 0
+    while i < len(e):
+
+        if e[i:i + 3] == MOUSE_PREFIX:
+
+            # Anything before the mouse report is a separate event
+            if i > start:
+                sequences.append(e[start:i])
+
+            # The mouse report ends with its terminator
+            end = i + 3
+            while end < len(e) and e[end] not in MOUSE_TERMINATORS:
+                end += 1
+
+            sequences.append(e[i:end + 1])
+            i = end + 1
+            start = i
+
+        else:
+            i += 1
+
+    if start < len(e):
+        sequences.append(e[start:])
+
+    return sequences
+
+def createMouseEvent(e: Tuple[int]) -> Event:
+    '''
+    Create an event from an SGR mouse report.
+    '''
+
+    event = Event(keyNumber = e)
+
+    button, x, y = [int(value) for value in "".join(chr(c) for c in e[3:-1]).split(";")]
+
+    # Terminal positions start at 1
+    event.mouseX = x - 1
+    event.mouseY = y - 1
+    event.mouseButton = button & 3
+
+    if button & 64:
+        event.keyName = "SCROLL_DOWN" if button & 1 else "SCROLL_UP"
+    elif button & 32:
+        event.keyName = "MOUSE_DRAG"
+    elif e[-1] == ord("M"):
+        event.keyName = "MOUSE_PRESS"
+    else:
+        event.keyName = "MOUSE_RELEASE"
+
+    return event
+
 def createEvent(e):
     '''
     Return a simple event object describing what input the user gave.
     '''
 
+    if e[:3] == MOUSE_PREFIX and len(e) > 3 and e[-1] in MOUSE_TERMINATORS:
+        try:
+            return createMouseEvent(e)
+        except ValueError:
+            pass
+
     event = Event()
     if len(e) == 1:
         event.char = chr(e[0])
@@ -0,0 +1,554 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from threading import Thread, Lock
+
+from typing import Dict, List, Tuple, Union
+
+import os
+import selectors
+import socket
+import struct
+import sys
+import time
+import zlib
+
+import colorama
+import numpy
+
+from .canvas import Canvas
+
+# Sent by the streamer when a viewer connects
+STREAM_MAGIC: bytes = b"GENTSTR1"
+
+# Each message is its kind, its flags, and the length of the payload which follows
+MESSAGE_HEADER = struct.Struct("<BBI")
+
+# Every payload starts with the size of the frame. Diffs then have the number of changed cells
+FRAME_SIZE = struct.Struct("<HH")
+DIFF_COUNT = struct.Struct("<I")
+
+# Message kinds
+FULL_FRAME: int = 0
+DIFF_FRAME: int = 1
+
+# Message flags
+COMPRESSED: int = 1
+
+# Bytes each cell takes in a frame: the character, the text color, and the background color
+CELL_BYTES: int = 4 + 3 + 3
+
+# A unix socket path, or a (host, port) for TCP
+Address = Union[str, Tuple[str, int]]
+
+def parseAddress(text: str) -> Address:
+    '''
+    Turn "host:port" into a TCP address. Anything else is treated as the path of a unix socket.
+    '''
+
+    host, _, port = text.rpartition(":")
+    if host != "" and port.isdigit():
+        return (host, int(port))
+
+    return text
+
+def createListener(address: Address) -> socket.socket:
+    '''
+    Create a socket listening on an address.
+    '''
+
+    if isinstance(address, str):
+        if os.path.exists(address):
+            os.remove(address)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+    listener.bind(address)
+    listener.listen()
+
+    return listener
+
+def createConnection(address: Address) -> socket.socket:
+
+    if isinstance(address, str):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(address)
+        return connection
+
+    connection = socket.create_connection(address)
+    connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return connection
+
+def receiveExactly(connection: socket.socket, count: int) -> bytes:
+    '''
+    Read exactly count bytes. Returns None if the connection closes first.
+    '''
+
+    data = bytearray()
+    while len(data) < count:
+        chunk = connection.recv(count - len(data))
+        if len(chunk) == 0:
+            return None
+        data += chunk
+
+    return bytes(data)
+
+############
+# ENCODING #
+############
+def encodeFullFrame(canvas: Canvas) -> bytes:
+    '''
+    Payload holding every cell of a canvas.
+    '''
+
+    return b"".join((
+        FRAME_SIZE.pack(canvas.width, canvas.height),
+        canvas.characters.astype("<u4").tobytes(),
+        numpy.ascontiguousarray(canvas.textColors).tobytes(),
+        numpy.ascontiguousarray(canvas.backgroundColors).tobytes(),
+    ))
+
+def encodeDiffFrame(canvas: Canvas, previous: Canvas) -> bytes:
+    '''
+    Payload holding only the cells of a canvas which are different from the previous frame. Returns None if a full frame would be smaller,
+        or if the frames aren't the same size.
+    '''
+
+    if (canvas.width, canvas.height) != (previous.width, previous.height):
+        return None
+
+    changed = (
+        (canvas.characters != previous.characters) |
+        numpy.any(canvas.textColors != previous.textColors, axis = 2) |
+        numpy.any(canvas.backgroundColors != previous.backgroundColors, axis = 2)
+    )
+
+    # Cells are numbered in the same order as the full frame
+    indices = numpy.flatnonzero(changed)
+
+    # Each changed cell also needs its index
+    if len(indices) * (CELL_BYTES + 4) >= canvas.width * canvas.height * CELL_BYTES:
+        return None
+
+    return b"".join((
+        FRAME_SIZE.pack(canvas.width, canvas.height),
+        DIFF_COUNT.pack(len(indices)),
+        indices.astype("<u4").tobytes(),
+        canvas.characters.reshape(-1)[indices].astype("<u4").tobytes(),
+        canvas.textColors.reshape(-1, 3)[indices].tobytes(),
+        canvas.backgroundColors.reshape(-1, 3)[indices].tobytes(),
+    ))
+
+def encodeMessage(kind: int, payload: bytes, compressionLevel: int = 0) -> bytes:
+    '''
+    Add the message header to a payload, compressing it with zlib if that makes it smaller.
+
+    Parameters
+    ----------
+    compressionLevel: zlib level from 1 to 9. 0 doesn't compress
+    '''
+
+    flags = 0
+    if compressionLevel > 0:
+        compressed = zlib.compress(payload, compressionLevel)
+        if len(compressed) < len(payload):
+            payload = compressed
+            flags |= COMPRESSED
+
+    return MESSAGE_HEADER.pack(kind, flags, len(payload)) + payload
+
+############
+# DECODING #
+############
+def applyFrame(canvas: Canvas, kind: int, payload: bytes) -> Canvas:
+    '''
+    Apply a frame payload to a canvas. Returns the canvas, which is a new one if the frame is a different size.
+    '''
+
+    width, height = FRAME_SIZE.unpack_from(payload)
+    offset = FRAME_SIZE.size
+
+    if canvas is None or (canvas.width, canvas.height) != (width, height):
+        if kind == DIFF_FRAME:
+            raise Exception("Frame diff received without a full frame to apply it to")
+        canvas = Canvas(width, height)
+
+    def readArray(dtype: str, count: int) -> numpy.ndarray:
+        nonlocal offset
+        array = numpy.frombuffer(payload, dtype = dtype, count = count, offset = offset)
+        offset += array.nbytes
+        return array
+
+    if kind == FULL_FRAME:
+        cellCount = width * height
+        canvas.characters[:,:] = readArray("<u4", cellCount).reshape(width, height)
+        canvas.textColors[:,:] = readArray("u1", cellCount * 3).reshape(width, height, 3)
+        canvas.backgroundColors[:,:] = readArray("u1", cellCount * 3).reshape(width, height, 3)
+
+    elif kind == DIFF_FRAME:
+        count, = DIFF_COUNT.unpack_from(payload, offset)
+        offset += DIFF_COUNT.size
+
+        indices = readArray("<u4", count)
+        canvas.characters.reshape(-1)[indices] = readArray("<u4", count)
+        canvas.textColors.reshape(-1, 3)[indices] = readArray("u1", count * 3).reshape(count, 3)
+        canvas.backgroundColors.reshape(-1, 3)[indices] = readArray("u1", count * 3).reshape(count, 3)
+
+    else:
+        raise Exception("Unknown frame kind %i" % kind)
+
+    return canvas
+
+class StreamViewer:
+    '''
+    A viewer connected to a FrameStreamer, and the bytes still waiting to be sent to it.
+    At most one frame is waiting at a time: if the viewer hasn't started taking it when the next frame is ready, the waiting one is replaced.
+    '''
+
+    def __init__(self, connection: socket.socket):
+
+        self.connection: socket.socket = connection
+
+        # Bytes being sent, and how many of them have gone
+        self.outgoing: bytes = STREAM_MAGIC
+        self.outgoingOffset: int = 0
+
+        # The latest frame, waiting for the outgoing bytes to finish
+        self.pendingMessage: bytes = None
+
+        # Diffs only apply to the frame before them, so a viewer which missed a frame needs a full one
+        self.needsFullFrame: bool = True
+
+        # Frames replaced before the viewer took them, since it last took one
+        self.droppedFrames: int = 0
+
+    def hasOutgoing(self) -> bool:
+        return self.outgoingOffset < len(self.outgoing) or self.pendingMessage is not None
+
+    def queueFrame(self, diffMessage: bytes, fullMessage: bytes):
+        '''
+        Queue the latest frame, replacing any frame the viewer hasn't started taking.
+        '''
+
+        if self.pendingMessage is not None:
+            self.droppedFrames += 1
+            self.needsFullFrame = True
+
+        if self.needsFullFrame or diffMessage is None:
+            self.pendingMessage = fullMessage
+        else:
+            self.pendingMessage = diffMessage
+
+        self.needsFullFrame = False
+
+    def send(self) -> int:
+        '''
+        Send as much as the connection will take without blocking. Returns the number of bytes sent.
+        '''
+
+        # Start on the waiting frame once the previous one has gone
+        if self.outgoingOffset >= len(self.outgoing):
+            if self.pendingMessage is None:
+                return 0
+
+            self.outgoing = self.pendingMessage
+            self.outgoingOffset = 0
+            self.pendingMessage = None
+            self.droppedFrames = 0
+
+        try:
+            sent = self.connection.send(memoryview(self.outgoing)[self.outgoingOffset:])
+        except (BlockingIOError, InterruptedError):
+            return 0
+
+        self.outgoingOffset += sent
+        return sent
+
+class FrameStreamer(Thread):
+    '''
+    Streams a game's frames to any number of viewers over a unix or TCP socket. Frames are sent from the canvas arrays rather than the printed text:
+        a viewer gets a full frame when it connects, and after that only the cells which changed, compressed with zlib.
+    The diff and compression are only done once for each frame, no matter how many viewers there are.
+
+    streamFrame, which Game calls after each frame is composed, only queues the frame, so a slow viewer can't hold up the game.
+        This thread accepts viewers and sends them their queued frames without blocking. Use Game.startStreaming to set one up.
+
+    Parameters
+    ----------
+    address: Unix socket path, or (host, port) for TCP
+
+    compressionLevel: zlib level from 1 to 9. 0 doesn't compress
+
+    maxDroppedFrames: Viewers which fall this many frames behind in a row are disconnected
+
+    sendTimeout: Viewers which take no bytes for this many seconds while a frame is waiting are disconnected
+    '''
+
+    def __init__(self, address: Address, compressionLevel: int = 6, maxDroppedFrames: int = 60, sendTimeout: float = 5.0):
+        Thread.__init__(self, daemon = True)
+
+        self.address: Address = address
+        self.compressionLevel: int = compressionLevel
+        self.maxDroppedFrames: int = maxDroppedFrames
+        self.sendTimeout: float = sendTimeout
+
+        self.listener: socket.socket = createListener(address)
+        self.listener.setblocking(False)
+
+        # Written to by streamFrame to wake the thread when there are frames to send
+        self.wakeReader, self.wakeWriter = socket.socketpair()
+        self.wakeReader.setblocking(False)
+        self.wakeWriter.setblocking(False)
+
+        self.selector: selectors.BaseSelector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.selector.register(self.wakeReader, selectors.EVENT_READ)
+
+        # Connected viewers, and when each last took some bytes
+        self.viewers: List[StreamViewer] = []
+        self.lastSendTimes: Dict[StreamViewer, float] = {}
+        self.viewerLock: Lock = Lock()
+
+        # Copy of the last frame streamed, which the next frame is compared against
+        self.previousCanvas: Canvas = None
+
+        # Byte counts, for measuring the bandwidth used
+        self.framesSent: int = 0
+        self.bytesSent: int = 0
+
+        self.isActive: bool = True
+
+    def run(self):
+
+        while self.isActive:
+
+            # Only wait to write to viewers which have something to send
+            with self.viewerLock:
+                for viewer in self.viewers:
+                    events = selectors.EVENT_READ | (selectors.EVENT_WRITE if viewer.hasOutgoing() else 0)
+                    self.selector.modify(viewer.connection, events, viewer)
+
+            for key, events in self.selector.select(0.1):
+
+                if key.fileobj is self.listener:
+                    self.acceptViewer()
+
+                elif key.fileobj is self.wakeReader:
+                    try:
+                        while self.wakeReader.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+
+                else:
+                    self.serviceViewer(key.data, events)
+
+            self.dropStalledViewers()
+
+    def acceptViewer(self):
+
+        try:
+            connection, _ = self.listener.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+
+        connection.setblocking(False)
+        if connection.family != socket.AF_UNIX:
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        viewer = StreamViewer(connection)
+        with self.viewerLock:
+            self.viewers.append(viewer)
+            self.lastSendTimes[viewer] = time.perf_counter()
+            self.selector.register(connection, selectors.EVENT_READ | selectors.EVENT_WRITE, viewer)
+
+    def serviceViewer(self, viewer: StreamViewer, events: int):
+        '''
+        Send a viewer its queued bytes. Viewers don't send anything, so the connection being readable means it has closed.
+        '''
+
+        with self.viewerLock:
+            if viewer not in self.lastSendTimes:
+                return
+
+            try:
+                if events & selectors.EVENT_READ and len(viewer.connection.recv(4096)) == 0:
+                    raise ConnectionError()
+
+                if events & selectors.EVENT_WRITE:
+                    sent = viewer.send()
+                    if sent > 0:
+                        self.bytesSent += sent
+                        self.lastSendTimes[viewer] = time.perf_counter()
+
+            except (BlockingIOError, InterruptedError):
+                pass
+            except OSError:
+                self.removeViewer(viewer)
+
+    def dropStalledViewers(self):
+
+        now = time.perf_counter()
+        with self.viewerLock:
+            for viewer in list(self.viewers):
+                stalled = viewer.hasOutgoing() and now - self.lastSendTimes[viewer] > self.sendTimeout
+                if stalled or viewer.droppedFrames > self.maxDroppedFrames:
+                    self.removeViewer(viewer)
+
+    def removeViewer(self, viewer: StreamViewer):
+        '''
+        Disconnect a viewer. The viewerLock must be held.
+        '''
+
+        self.viewers.remove(viewer)
+        del self.lastSendTimes[viewer]
+
+        try:
+            self.selector.unregister(viewer.connection)
+        except (KeyError, ValueError):
+            pass
+        viewer.connection.close()
+
+    def streamFrame(self, canvas: Canvas):
+        '''
+        Queue a frame for every viewer. This never waits on the viewers.
+        '''
+
+        with self.viewerLock:
+            if len(self.viewers) == 0:
+                self.previousCanvas = None
+                return
+
+            # Viewers which have already seen the previous frame only need the diff
+            diffMessage = None
+            if any(not viewer.needsFullFrame and viewer.pendingMessage is None for viewer in self.viewers):
+                payload = None if self.previousCanvas is None else encodeDiffFrame(canvas, self.previousCanvas)
+                if payload is not None:
+                    diffMessage = encodeMessage(DIFF_FRAME, payload, self.compressionLevel)
+
+            fullMessage = None
+            if diffMessage is None or any(viewer.needsFullFrame or viewer.pendingMessage is not None for viewer in self.viewers):
+                fullMessage = encodeMessage(FULL_FRAME, encodeFullFrame(canvas), self.compressionLevel)
+
+            for viewer in self.viewers:
+                viewer.queueFrame(diffMessage, fullMessage)
+
+            self.framesSent += 1
+
+            # Keep a copy, since the canvas is cleared and drawn on again
+            if self.previousCanvas is None or (self.previousCanvas.width, self.previousCanvas.height) != (canvas.width, canvas.height):
+                self.previousCanvas = Canvas(canvas.width, canvas.height)
+            self.previousCanvas.characters[:,:] = canvas.characters
+            self.previousCanvas.textColors[:,:] = canvas.textColors
+            self.previousCanvas.backgroundColors[:,:] = canvas.backgroundColors
+
+        # Wake the thread to send it
+        try:
+            self.wakeWriter.send(b"\0")
+        except OSError:
+            pass
+
+    def getViewerCount(self) -> int:
+
+        with self.viewerLock:
+            return len(self.viewers)
+
+    def stop(self):
+        '''
+        Disconnect every viewer and stop listening.
+        '''
+
+        self.isActive = False
+        if self.is_alive():
+            self.join()
+
+        self.selector.close()
+        self.listener.close()
+        self.wakeReader.close()
+        self.wakeWriter.close()
+        if isinstance(self.address, str):
+            try:
+                os.remove(self.address)
+            except OSError:
+                pass
+
+        with self.viewerLock:
+            for viewer in self.viewers:
+                viewer.connection.close()
+            self.viewers = []
+            self.lastSendTimes = {}
+
+class FrameViewer:
+    '''
+    Receives frames from a FrameStreamer and keeps a local canvas up to date with them.
+
+    Parameters
+    ----------
+    address: Unix socket path, or (host, port) for TCP
+    '''
+
+    def __init__(self, address: Address):
+
+        self.connection: socket.socket = createConnection(address)
+
+        if receiveExactly(self.connection, len(STREAM_MAGIC)) != STREAM_MAGIC:
+            self.connection.close()
+            raise Exception("%s is not a frame stream" % (address, ))
+
+        # The latest frame
+        self.canvas: Canvas = None
+
+        # Byte counts, for measuring the bandwidth used
+        self.framesReceived: int = 0
+        self.bytesReceived: int = len(STREAM_MAGIC)
+
+    def receiveFrame(self) -> Canvas:
+        '''
+        Wait for the next frame. Returns the updated canvas, or None once the stream has ended.
+        '''
+
+        header = receiveExactly(self.connection, MESSAGE_HEADER.size)
+        if header is None:
+            return None
+
+        kind, flags, length = MESSAGE_HEADER.unpack(header)
+
+        payload = receiveExactly(self.connection, length)
+        if payload is None:
+            return None
+
+        if flags & COMPRESSED:
+            payload = zlib.decompress(payload)
+
+        self.canvas = applyFrame(self.canvas, kind, payload)
+        self.framesReceived += 1
+        self.bytesReceived += MESSAGE_HEADER.size + length
+
+        return self.canvas
+
+    def close(self):
+        self.connection.close()
+
+def watchStream(address: Address, outputStream = None):
+    '''
+    Show a game being streamed by a FrameStreamer in this terminal, until the stream ends.
+    '''
+
+    if outputStream is None:
+        outputStream = sys.stdout
+
+    colorama.init()
+
+    viewer = FrameViewer(address)
+    try:
+        while True:
+            canvas = viewer.receiveFrame()
+            if canvas is None:
+                break
+
+            outputStream.write(colorama.Cursor.POS() + canvas.getCanvasText())
+            outputStream.flush()
+
+    finally:
+        viewer.close()
\ No newline at end of file
@@ -2,7 +2,7 @@
 
 #pylint: disable=wildcard-import,protected-access,bare-except
 
-from typing import Tuple, Dict, Set
+from typing import Tuple, Dict, Set, List
 from types import FunctionType
 
 from dataclasses import dataclass
@@ -17,22 +17,31 @@ import time
 
 import colorama
 
-from threading import Thread
+from threading import Thread, local
 
 from .box import Box
 
 from .event import Event
 from .event import EVENT_HANDLER
+from .event import MOUSE_ENABLE, MOUSE_DISABLE
 
-from .canvas import Canvas
-from .timing import timeFunction
+from .canvas import Canvas, CANVAS_POOL
+from .spatialIndex import SpatialGrid
+from .timing import timeFunction, sleepFunction, getClock, VirtualClock
 from .gameState import GameState
+from .autoSaver import AutoSaver
+from .gameStateHistory import GameStateHistory
 from .getch import EventGetter
-
-import pynput
+from .replay import EventRecorder, ReplayEventGetter, NullEventGetter, seedRandom
+from .frameStream import FrameStreamer, Address
+from .screenCache import ScreenCache, ScreenSnapshot, FOCUS_ATTRIBUTES, getNestedGameObjects
 
 import traceback
 
+# Views of the destination which opaque gameObjects are rendering onto, keyed by the id of the gameObject.
+#   Kept per thread so a view is never stored on the gameObject, where another thread could draw on it or release it
+RENDER_TARGETS = local()
+
 
 class GameObject:
     '''
@@ -61,8 +70,8 @@ class GameObject:
         GameObject.NEW_OBJECT_ID += 1
 
         # Create the real width and height (This is the raw input when the gameObject is created)
-        self.realX: int = box.x
-        self.realY: int = box.y
+        self._realX: int = box.x
+        self._realY: int = box.y
         self.realW: int = box.w
         self.realH: int = box.h
 
@@ -90,9 +99,13 @@ class GameObject:
         self.selectionHandler: Selection = selectionHandler
         self.selectionHandler.linkGameObject(self)
 
-        # Create the visuals for gameObjects
-        self.activeCanvas: Canvas = Canvas(self.realW, self.realH)
-        self.bufferCanvas: Canvas = Canvas(self.realW, self.realH)
+        # The visuals for gameObjects. They are only taken from the CANVAS_POOL when first used, since many gameObjects never draw anything
+        self._activeCanvas: Canvas = None
+        self._bufferCanvas: Canvas = None
+
+        # Transparency used when the gameObject renders straight onto what it is drawn on, so it doesn't change the destination's transparency.
+        #   Taken from the CANVAS_POOL like the canvases
+        self._viewTransparency: numpy.ndarray = None
 
         # Whether or not the object will use transparency values
         self.useTransparency: bool = False
@@ -109,23 +122,113 @@ class GameObject:
     def __hash__(self):
         return self.ID
 
-    def addObjectHandler(self):
+    def addObjectHandler(self, autoConnect: bool = False):
         '''
         Attaches an object handler to the gameObject. Also attaches the gameObject to th objectHandler
+
+        Parameters
+        ----------
+        autoConnect: Whether the objectHandler works out the connections between its gameObjects from their boxes
         '''
 
-        self.objectHandler = ObjectHandler(self)
+        self.objectHandler = ObjectHandler(self, autoConnect = autoConnect)
+
+    @property
+    def activeCanvas(self) -> Canvas:
+        '''
+        What the gameObject last rendered onto its own canvases. Opaque gameObjects are drawn by rendering straight onto the destination,
+            so for them this is only what the last rerender made. See rerender.
+        '''
+
+        if self._activeCanvas is None:
+            self._activeCanvas = CANVAS_POOL.acquire(self.realW, self.realH)
+
+        return self._activeCanvas
+
+    @activeCanvas.setter
+    def activeCanvas(self, canvas: Canvas):
+        self._activeCanvas = canvas
+
+    @property
+    def bufferCanvas(self) -> Canvas:
+
+        # While being drawn opaquely, the gameObject renders onto a view of the destination instead
+        renderTargets = getattr(RENDER_TARGETS, "canvases", None)
+        if renderTargets:
+            target = renderTargets.get(id(self))
+            if target is not None:
+                return target
+
+        if self._bufferCanvas is None:
+            self._bufferCanvas = CANVAS_POOL.acquire(self.realW, self.realH)
+
+        return self._bufferCanvas
+
+    @bufferCanvas.setter
+    def bufferCanvas(self, canvas: Canvas):
+        self._bufferCanvas = canvas
 
     def swapBuffers(self):
         '''
         Flip the active and buffer canvases
         '''
 
-        self.activeCanvas, self.bufferCanvas = self.bufferCanvas, self.activeCanvas
+        self._activeCanvas, self._bufferCanvas = self._bufferCanvas, self._activeCanvas
+
+    def releaseCanvases(self):
+        '''
+        Give the canvases back to the CANVAS_POOL. They are taken from the pool again if the gameObject is drawn after this.
+        '''
+
+        CANVAS_POOL.release(self._activeCanvas)
+        CANVAS_POOL.release(self._bufferCanvas)
+        CANVAS_POOL.releaseTransparency(self._viewTransparency)
+        self._activeCanvas = None
+        self._bufferCanvas = None
+        self._viewTransparency = None
 
     def getOffset(self):
         return (self.xOffset, self.yOffset)
 
+    def getBox(self) -> Box:
+        '''
+        The real box of the gameObject.
+        '''
+
+        return Box(self.realX, self.realY, self.realW, self.realH)
+
+    @property
+    def realX(self) -> int:
+        return self._realX
+
+    @realX.setter
+    def realX(self, x: int):
+        self.moveTo(x, self._realY)
+
+    @property
+    def realY(self) -> int:
+        return self._realY
+
+    @realY.setter
+    def realY(self, y: int):
+        self.moveTo(self._realX, y)
+
+    def moveTo(self, x: int, y: int):
+        '''
+        Move the gameObject, keeping the game's spatial index up to date. Setting realX or realY does the same.
+        '''
+
+        self._realX = x
+        self._realY = y
+        self.selectionHandler.setBoxes()
+
+        if self.game is not None:
+            self.game.updateGameObjectPosition(self)
+
+        # Automatic connections depend on where the gameObject is
+        if self.parentObjectHandler is not None:
+            self.parentObjectHandler.invalidateLayout()
+
     def drawOn(self, gameObject: "GameObject"):
         '''
         Bundles the draw call so you dont have to worry about getting the offset
@@ -145,10 +248,27 @@ class GameObject:
         # Don't do anything if the object is hidden
         if self.hide: return
 
-        self._render()
-
         x, y, w, h = self.realX + offset[0], self.realY + offset[1], self.realW, self.realH
 
+        # Opaque gameObjects render straight onto the destination through a view of it, with no canvas of their own and nothing to copy
+        if not self.useTransparency:
+
+            if self._viewTransparency is None or self._viewTransparency.shape != (w, h):
+                CANVAS_POOL.releaseTransparency(self._viewTransparency)
+                self._viewTransparency = CANVAS_POOL.acquireTransparency(w, h)
+
+            view = destination.view(Box(x, y, w, h), self._viewTransparency)
+            if view is not None:
+                renderTargets = RENDER_TARGETS.__dict__.setdefault("canvases", {})
+                renderTargets[id(self)] = view
+                try:
+                    self._renderToBuffer()
+                finally:
+                    del renderTargets[id(self)]
+                return
+
+        self._render()
+
         # If transparency is enabled, we need to do some extra math when drawing.
         if self.useTransparency:
 
@@ -212,6 +332,17 @@ class GameObject:
         
         return handlerReturn
 
+    def isCapturingKeys(self) -> bool:
+        '''
+        Whether the gameObject, or the gameObject it is handling, wants every key, such as while text is being typed.
+            The game's hotkeys are passed on to it instead of being used.
+        '''
+
+        if self.objectHandler is not None and not self.objectHandler.selectingObject and self.objectHandler.currentGameObject is not None:
+            return self.objectHandler.currentGameObject.isCapturingKeys()
+
+        return False
+
     def onEvent(self, event: Event):
         '''
         Is called each time the gameObject captures an event
@@ -219,6 +350,66 @@ class GameObject:
 
         # Virtual function to be overwritten
 
+    def handleMouseEvent(self, event: Event): #pylint: disable=unused-argument
+        '''
+        Allow the gameObject to handle a mouse event which happened on top of it.
+
+        Parameters
+        ----------
+        event: Mouse event. event.mouseX and event.mouseY are screen positions.
+        '''
+
+        # Virtual event handler to be overwritten by any children which need it
+        return EVENT_HANDLER.DID_NOT_HANDLE
+
+    def _handleMouseEvent(self, event: Event, origin: Tuple[int, int] = (0, 0)):
+        '''
+        How the game object should handle mouse events
+
+        Parameters
+        ----------
+        origin: Screen position of the canvas the gameObject is drawn on. (0, 0) for gameObjects in the game
+        '''
+
+        # The gameObjects in the objectHandler under the pointer get the first chance to handle the event. They are drawn at this gameObject's offset
+        if self.objectHandler is not None:
+            childOrigin = (origin[0] + self.realX + self.xOffset, origin[1] + self.realY + self.yOffset)
+
+            game = self.objectHandler.getGame()
+            screenChanges = None if game is None else game.screenChanges
+
+            for gameObject in self.objectHandler.getGameObjectsAtPoint(event.mouseX - childOrigin[0], event.mouseY - childOrigin[1]):
+                handlerReturn = gameObject._handleMouseEvent(event, childOrigin)
+                if handlerReturn is not None and handlerReturn != EVENT_HANDLER.DID_NOT_HANDLE:
+
+                    # Clicking inside a gameObject moves to it, so the keyboard carries on from there. Unless the click went to another screen
+                    if event.keyName == "MOUSE_PRESS" and (game is None or game.screenChanges == screenChanges):
+                        self.objectHandler.focusObject(gameObject)
+
+                    return handlerReturn
+
+        # Then the gameObject itself
+        handlerReturn = self.handleMouseEvent(event)
+        if handlerReturn is not None and handlerReturn != EVENT_HANDLER.DID_NOT_HANDLE:
+            return handlerReturn
+
+        # Otherwise, clicking on a gameObject in an objectHandler is the same as moving to it and pressing enter
+        if event.keyName == "MOUSE_PRESS" and event.mouseButton == 0 and self.parentObjectHandler is not None:
+            objectHandler = self.parentObjectHandler
+
+            # Leave whichever gameObject was being handled first
+            if not objectHandler.selectingObject:
+                if objectHandler.currentGameObject is self:
+                    return EVENT_HANDLER.DID_NOT_HANDLE
+                objectHandler.currentGameObject._onExit()
+                objectHandler.selectingObject = True
+
+            objectHandler.selectObject(self)
+            objectHandler.pressCurrentObject()
+            return EVENT_HANDLER.HANDLED
+
+        return EVENT_HANDLER.DID_NOT_HANDLE
+
     def update(self):
         '''
         Update function to call each frame.
@@ -253,6 +444,14 @@ class GameObject:
         Handler for gameObject setting its internal values
         '''
 
+        self._renderToBuffer()
+        self.swapBuffers()
+
+    def _renderToBuffer(self):
+        '''
+        Render onto the bufferCanvas, without making it the activeCanvas.
+        '''
+
         self.bufferCanvas.clearCanvas()
 
         self.render()
@@ -262,12 +461,14 @@ class GameObject:
         elif self.selectionStatus == self.OUTLINED: self.selectionHandler._default()
 
         self.renderAfterSelection()
-
-        self.swapBuffers()
     
     def rerender(self):
         '''
-        Wrapper for user's to call
+        Render the gameObject onto its own canvases now, making the result its activeCanvas.
+
+        Drawing always renders the gameObject again, so this isn't needed before draw or drawOn.
+            It is for reading activeCanvas outside of drawing: opaque gameObjects render straight onto whatever they are drawn on,
+            which leaves their activeCanvas as the last rerender made it.
         '''
 
         self._render()
@@ -347,10 +548,17 @@ class Node:
 
 class ObjectHandler:
     '''
+    Handles navigation between a group of gameObjects.
+
+    Parameters
+    ----------
+    gameObject: The gameObject the objectHandler is attached to
 
+    autoConnect: If True, each gameObject is connected to its nearest neighbour in each direction, worked out from the gameObject boxes.
+        The connections are rebuilt whenever the layout changes, rather than on every event.
     '''
 
-    def __init__(self, gameObject: GameObject):
+    def __init__(self, gameObject: GameObject, autoConnect: bool = False):
 
         # The gameObject the object handler is attached to
         self.gameObject: GameObject = gameObject
@@ -364,6 +572,10 @@ class ObjectHandler:
         # Whether or not the object handler is currently selecting an object, or handling an object
         self.selectingObject: bool = True
 
+        # Whether connections are worked out automatically, and whether they need to be worked out again
+        self.autoConnect: bool = autoConnect
+        self.layoutChanged: bool = True
+
     def addConnection(self, gameObject1: GameObject, gameObject2: GameObject, connectionType: str):
         '''
         Adds a connection between two gameobjects to the ObjectHandler. Will add the gameobjects to the ObjectHandler if they aren't already there
@@ -403,7 +615,84 @@ class ObjectHandler:
 
         self.gameObjects.add(gameObject2)
         gameObject2.parentObjectHandler = self
+
+        self.layoutChanged = True
     
+    def addGameObject(self, gameObject: GameObject):
+        '''
+        Adds a gameObject to the ObjectHandler without connecting it to anything. With autoConnect, the connections are worked out automatically.
+        '''
+
+        self.gameObjects.add(gameObject)
+        gameObject.parentObjectHandler = self
+
+        self.layoutChanged = True
+
+    def invalidateLayout(self):
+        '''
+        Call when a gameObject has moved. Automatic connections are rebuilt the next time they are needed.
+        '''
+
+        self.layoutChanged = True
+
+    def buildConnections(self):
+        '''
+        Connect each gameObject to its nearest neighbour in each direction.
+        '''
+
+        # Get all the boxes once
+        boxes = {gameObject: gameObject.getBox() for gameObject in self.gameObjects}
+
+        connections = {}
+        for gameObject in boxes:
+            connections[gameObject] = Node(
+                up = self.findNeighbour(gameObject, boxes, 0, -1),
+                down = self.findNeighbour(gameObject, boxes, 0, 1),
+                left = self.findNeighbour(gameObject, boxes, -1, 0),
+                right = self.findNeighbour(gameObject, boxes, 1, 0)
+            )
+
+        self.connections = connections
+        self.layoutChanged = False
+
+    @staticmethod
+    def findNeighbour(gameObject: GameObject, boxes: Dict[GameObject, Box], dx: int, dy: int) -> GameObject:
+        '''
+        Find the nearest gameObject in the direction (dx, dy). Returns None if there isn't one.
+        '''
+
+        box = boxes[gameObject]
+        centerX, centerY = box.x + box.w / 2, box.y + box.h / 2
+
+        nearestGameObject = None
+        nearestScore = None
+        for otherGameObject, otherBox in boxes.items():
+
+            if otherGameObject is gameObject:
+                continue
+
+            # Distance in the direction of movement. Only gameObjects in that direction can be connected
+            offsetX, offsetY = otherBox.x + otherBox.w / 2 - centerX, otherBox.y + otherBox.h / 2 - centerY
+            distance = offsetX * dx + offsetY * dy
+            if distance <= 0:
+                continue
+
+            # Distance off to the side of the direction of movement
+            sideDistance = abs(offsetX * dy) + abs(offsetY * dx)
+
+            # GameObjects which line up with the current gameObject are always preferred
+            if dx != 0:
+                linedUp = otherBox.y < box.y + box.h and box.y < otherBox.y + otherBox.h
+            else:
+                linedUp = otherBox.x < box.x + box.w and box.x < otherBox.x + otherBox.w
+
+            score = (not linedUp, distance + 2 * sideDistance)
+            if nearestScore is None or score < nearestScore:
+                nearestGameObject = otherGameObject
+                nearestScore = score
+
+        return nearestGameObject
+
     def clearConnections(self):
         '''
         Use with caution as things could seriously break if the connections aren't immediately reinstated
@@ -428,6 +717,8 @@ class ObjectHandler:
         self.gameObjects.add(gameObject)
         gameObject.parentObjectHandler = self
 
+        self.layoutChanged = True
+
     def _handleEvent(self, event: Event):
 
         # Can't do anything if there is not an active object
@@ -448,18 +739,7 @@ class ObjectHandler:
                 return EVENT_HANDLER.EXIT
 
             # Determine which game object is in the location determined by the key press
-            nextGameObject = None
-
-            # Determine which gameObject to move to if the gameObject is in the connections
-            if self.currentGameObject in self.connections:
-                if event.keyName in CONNECTION_UP:
-                    nextGameObject = self.connections[self.currentGameObject].up
-                if event.keyName in CONNECTION_DOWN:
-                    nextGameObject = self.connections[self.currentGameObject].down
-                if event.keyName in CONNECTION_LEFT:
-                    nextGameObject = self.connections[self.currentGameObject].left
-                if event.keyName in CONNECTION_RIGHT:
-                    nextGameObject = self.connections[self.currentGameObject].right
+            nextGameObject = self.getConnectedObject(self.currentGameObject, event.keyName)
             
             if event.keyName in self.hotKeys:
                 nextGameObject = self.hotKeys[event.keyName]
@@ -470,12 +750,7 @@ class ObjectHandler:
             
             # If return is pressed, we are now switching to object handling mode
             if event.keyName in CONNECTION_ENTER:
-                self.currentGameObject.onPress()
-                if self.currentGameObject.isSelectable:
-                    self.currentGameObject._onEntry()
-                    self.selectingObject = False
-                else:
-                    self.currentGameObject.onEntry()
+                self.pressCurrentObject()
                     
         # Otherwise, we need to pass the event to the selected gameobject
         elif self.currentGameObject._handleEvent(event) == EVENT_HANDLER.EXIT:
@@ -487,6 +762,96 @@ class ObjectHandler:
         
         return EVENT_HANDLER.DID_NOT_HANDLE
 
+    def getGameObjectsAtPoint(self, x: int, y: int) -> List[GameObject]:
+        '''
+        Get every visible gameObject which contains a point, relative to the gameObject the objectHandler is attached to.
+        '''
+
+        gameObjects = []
+        for gameObject in self.gameObjects:
+            if not gameObject.hide and gameObject.realX <= x < gameObject.realX + gameObject.realW and gameObject.realY <= y < gameObject.realY + gameObject.realH:
+                gameObjects.append(gameObject)
+
+        return gameObjects
+
+    def focusObject(self, gameObject: GameObject):
+        '''
+        Make a gameObject the one being handled, leaving whatever was being handled. Used when a gameObject inside it is clicked.
+        '''
+
+        if gameObject not in self.gameObjects:
+            return
+
+        if gameObject is self.currentGameObject and (not self.selectingObject or not gameObject.isSelectable):
+            return
+
+        if not self.selectingObject:
+            self.currentGameObject._onExit()
+            self.selectingObject = True
+
+        self.selectObject(gameObject)
+
+        if gameObject.isSelectable:
+            gameObject._onEntry()
+            self.selectingObject = False
+
+    def pressCurrentObject(self):
+        '''
+        Press the current gameObject. If it is selectable, the objectHandler switches to handling it.
+        '''
+
+        game = self.getGame()
+        screenChanges = None if game is None else game.screenChanges
+
+        self.currentGameObject.onPress()
+
+        # Pressing can go to another screen. The screen this is on may be cached, so it is left as it was rather than handling the gameObject
+        if game is not None and game.screenChanges != screenChanges:
+            return
+
+        if self.currentGameObject.isSelectable:
+            self.currentGameObject._onEntry()
+            self.selectingObject = False
+        else:
+            self.currentGameObject.onEntry()
+
+    def getGame(self) -> "Game":
+        '''
+        The game the objectHandler is in, found through the gameObjects it is nested in. None if it isn't in one yet.
+        '''
+
+        gameObject = self.gameObject
+        while gameObject.game is None and gameObject.parentObjectHandler is not None:
+            gameObject = gameObject.parentObjectHandler.gameObject
+
+        return gameObject.game
+
+    def getConnectedObject(self, gameObject: GameObject, keyName: str) -> GameObject:
+        '''
+        Determine which gameObject is connected to a gameObject in the direction of a key press. Returns None if there isn't one.
+
+        Can be overwritten by children which work out their connections some other way.
+        '''
+
+        # Automatic connections are only rebuilt after the layout changes
+        if self.autoConnect and self.layoutChanged:
+            self.buildConnections()
+
+        if gameObject not in self.connections:
+            return None
+
+        node = self.connections[gameObject]
+        if keyName in CONNECTION_UP:
+            return node.up
+        if keyName in CONNECTION_DOWN:
+            return node.down
+        if keyName in CONNECTION_LEFT:
+            return node.left
+        if keyName in CONNECTION_RIGHT:
+            return node.right
+
+        return None
+
     def selectObject(self, gameObject: GameObject):
         '''
         Unselect whatever the current gameObject is, and select a new gameObject
@@ -576,6 +941,8 @@ class Game:
     Parameters
     ----------
     canvasSize: Tuple of (canvasWidth, canvasHeight)
+
+    useMouse: Whether or not to turn on terminal mouse reporting. Mouse events go to the topmost gameObject under the pointer.
     '''
             
     class CanvasDrawThread(Thread):
@@ -596,54 +963,14 @@ class Game:
                     # Determine when this loop starts
                     startTime = timeFunction()
 
-
-                    ##############################
-                    # DRAW GAMEOBJECTS ON CANVAS #
-                    ##############################
-
-                    # First clear the canvas
-                    canvas = self.game.bufferCanvas
-                    canvas.clearCanvas()
-
-                    # Draw each gameObject in each layer
-                    layerList = sorted(list(self.game.layerToGameObjectIDMap))
-
-                    for layer in layerList:
-                        gameObjects = self.game.layerToGameObjectIDMap[layer]
-                        for gameObjectID in list(gameObjects):
-
-                            gameObject: GameObject
-                            try:
-                                gameObject = self.game.gameObjectsIDMap[gameObjectID]
-                            except KeyError:
-                                continue
-                            gameObject.draw(canvas)
-                    
-                    if self.game.helpActive:
-                        self.game.helpObject.draw(canvas)
-
-                    self.game.switchBuffers()
-
-
-                    ########################
-                    # PRINT WHAT WAS DRAWN #
-                    ########################
-                    
-                    # Print the new screen.
-                    if self.game.isDisplayActive:
-                        
-                        # Move the cursor back to the beginning of the screen
-                        print("%s" % colorama.Cursor.POS(), end = "")
-
-                        canvas = self.game.activeCanvas
-                        print(canvas.getCanvasText(), end = "")
+                    self.game.drawFrame()
                     
                     # Now we need to wait the appropriate amount of time before calling the next draw
                     timeLeft = self.game.drawDelay - (timeFunction() - startTime)
                     if timeLeft < 0.005: timeLeft = 0.005 # We never want to fully saturate this thread
 
                     # Sleep the appropriate amount of time to keep the drawDelay up
-                    time.sleep(timeLeft)
+                    sleepFunction(timeLeft)
                 
             except:
                 self.game.errorInDrawThread = True
@@ -667,59 +994,75 @@ class Game:
                 # As long as the game is active we want to update continuously
                 while self.game.isActive:
 
-                    # Update the game state time before any updates are performed
-                    self.game.gameState.updateTime()
-
-                    # Then perform any global game updates
-                    self.game._update()
-
-                    # Then we want to update every gameObject
-                    for gameObjectID in list(self.game.gameObjectsIDMap):
-
-                        gameObject: GameObject
-                        try:
-                            gameObject = self.game.gameObjectsIDMap[gameObjectID]
-                        except KeyError:
-                            continue
-                        
-                        gameObject._update()
+                    self.game.updateFrame()
                     
                     # Now we need to wait the appropriate amount of time before calling the next update fram
                     timeLeft = self.game.updateDelay - (timeFunction() - self.game.gameState.now)
                     if timeLeft < 0.005: timeLeft = 0.005 # We never want to fully saturate this thread
 
                     # Sleep the appropriate amount of time to keep the update rate up
-                    time.sleep(timeLeft)
+                    sleepFunction(timeLeft)
                         
             except:
                 self.game.errorInUpdateThread = True
                 self.game.quit()
                 print(traceback.format_exc())
 
-    def __init__(self, gameState: GameState, canvasSize: Tuple[int, int], updateDelay: float = 1 / 60, drawDelay: float = 1 / 60):
+    def __init__(self, gameState: GameState, canvasSize: Tuple[int, int], updateDelay: float = 1 / 60, drawDelay: float = 1 / 60, useMouse: bool = False, eventGetter: EventGetter = None, outputStream = None):
 
         # Initialize the gameState
         self.gameState: GameState = gameState
 
-        # Object used to manage event thread
-        self.eventGetter: EventGetter = EventGetter()
+        # Object used to manage event thread. A ReplayEventGetter can be given instead to play back a recording
+        if eventGetter is None:
+
+            # Without a real clock or terminal there is no keyboard to read from
+            if isinstance(getClock(), VirtualClock) or (outputStream is not None and not outputStream.isatty()):
+                eventGetter = NullEventGetter()
+            else:
+                eventGetter = EventGetter()
+        self.eventGetter: EventGetter = eventGetter
+
+        # Replays use the same random numbers as the recording
+        if isinstance(eventGetter, ReplayEventGetter) and eventGetter.seed is not None:
+            seedRandom(eventGetter.seed)
+
+        # Records the events which are handled. Set with startRecording
+        self.eventRecorder: EventRecorder = None
+
+        # Sends frames to remote viewers. Set with startStreaming
+        self.frameStreamer: FrameStreamer = None
 
         # Dictionary containing all the screens for this game and the respective functions to get there
         self.screens: Dict[str, FunctionType] = {}
 
+        # Screens which are kept built after they are left, and the cache holding them
+        self.cachedScreens: Set[str] = set()
+        self.screenCache: ScreenCache = ScreenCache()
+
+        # The screen last gone to with goToScreen, and which of the FOCUS_ATTRIBUTES its function set
+        self.currentScreen: str = None
+        self.screenChanges: int = 0
+        self.screenFocus: Dict[str, object] = {}
+
+        # Where frames are written. A VirtualTerminal can be given instead to check the output without a terminal
+        if outputStream is None:
+            outputStream = sys.stdout
+        self.outputStream = outputStream
+
         # Set the height and width of the game, and then set those values in the terminal
         self.width: int = canvasSize[0]
         self.height: int = canvasSize[1]
 
         # Resize the terminal game according to the platform
         if sys.platform == "darwin":
-            sys.stdout.write("\x1b[8;{rows};{cols}t".format(rows=self.height,cols=self.width))
+            self.outputStream.write("\x1b[8;{rows};{cols}t".format(rows=self.height,cols=self.width))
         
-        elif sys.platform == "win32":
+        elif sys.platform == "win32" and self.outputStream is sys.stdout:
             os.system("mode con lines=%i cols=%i" % (self.height, self.width))
         
         elif sys.platform == "linux":
-            print("\x1b[8;%i;%it" % (self.height, self.width))
+            self.outputStream.write("\x1b[8;%i;%it\n" % (self.height, self.width))
 
         # Assign the frame and update rates
         self.drawDelay: float = drawDelay
@@ -734,6 +1077,9 @@ class Game:
         # Dictionary of layers corresponding to all the game objects in that layer
         self.layerToGameObjectIDMap: Dict[int, set] = {}
 
+        # Spatial index of where each gameObject is. Used for culling, region queries and hit testing
+        self.spatialIndex: SpatialGrid = SpatialGrid()
+
         # The canvas buffer values. Setting up a double buffer so that drawing and things can happen on a different thread and not interrupt the draw loop.
         self.activeCanvas: Canvas = Canvas(self.width, self.height)
         self.bufferCanvas: Canvas = Canvas(self.width, self.height)
@@ -745,6 +1091,17 @@ class Game:
         self.helpObject: GameObject = None
         self.helpActive: bool = False
 
+        # Whether or not mouse reporting is turned on
+        self.useMouse: bool = useMouse
+
+        # Background saver for the gameState. Set with enableAutosave
+        self.autoSaver: AutoSaver = None
+        self.saveOnQuit: bool = False
+
+        # History of the gameState for rewinding. Set with enableHistory
+        self.gameStateHistory: GameStateHistory = None
+        self.captureEachUpdate: bool = False
+
         # Whether or not the subthreads need to continue
         self.isActive: bool = True
         self.isDisplayActive: bool = True
@@ -758,8 +1115,9 @@ class Game:
         self.updateThread: Game.UpdateThread = Game.UpdateThread(self)
         self.errorInUpdateThread: bool = False
 
-        # Initialize colorama
-        colorama.init()
+        # Initialize colorama. It wraps sys.stdout, so it isn't needed for any other outputStream, such as a GameServer session
+        if self.outputStream is sys.stdout:
+            colorama.init()
     
     def addGameObject(self, gameObject: GameObject, layer: int = 0):
         '''
@@ -787,6 +1145,9 @@ class Game:
         # Then add the gameObject to the gameObjectMap!
         self.gameObjectsIDMap[gameObject.ID] = gameObject
 
+        # Lastly, keep track of where the gameObject is
+        self.spatialIndex.insert(gameObject.ID, gameObject.getBox())
+
         return True
     
     def removeGameObject(self, gameObject: GameObject):
@@ -807,6 +1168,8 @@ class Game:
         # Then remove the gameObject from the gameObjectMap!
         del self.gameObjectsIDMap[gameObject.ID]
 
+        self.spatialIndex.remove(gameObject.ID)
+
         return True
 
     def clearGameObjects(self):
@@ -817,6 +1180,42 @@ class Game:
         for gameObjectID in list(self.gameObjectsIDMap):
             self.removeGameObject(self.gameObjectsIDMap[gameObjectID])
 
+    def updateGameObjectPosition(self, gameObject: GameObject):
+        '''
+        Update the spatial index after a gameObject has moved.
+        '''
+
+        if gameObject.ID in self.gameObjectsIDMap:
+            self.spatialIndex.update(gameObject.ID, gameObject.getBox())
+
+    def getGameObjectsInRegion(self, box: Box) -> List[GameObject]:
+        '''
+        Get every gameObject which overlaps a region, from the bottom layer to the top layer.
+        '''
+
+        gameObjects = []
+        for gameObjectID in self.spatialIndex.queryRegion(box):
+            gameObject = self.gameObjectsIDMap.get(gameObjectID)
+            if gameObject is not None:
+                gameObjects.append(gameObject)
+
+        gameObjects.sort(key = lambda gameObject: self.gameObjectIDToLayerMap[gameObject.ID])
+        return gameObjects
+
+    def getGameObjectsAtPoint(self, x: int, y: int) -> List[GameObject]:
+        '''
+        Get every gameObject which contains a point, from the top layer to the bottom layer.
+        '''
+
+        gameObjects = []
+        for gameObjectID in self.spatialIndex.queryPoint(x, y):
+            gameObject = self.gameObjectsIDMap.get(gameObjectID)
+            if gameObject is not None:
+                gameObjects.append(gameObject)
+
+        gameObjects.sort(key = lambda gameObject: self.gameObjectIDToLayerMap[gameObject.ID], reverse = True)
+        return gameObjects
+
     def assignGameObjectLayer(self, gameObject: GameObject, newLayer: int):
         '''
         Reassign a gameobject's render layer.
@@ -830,8 +1229,12 @@ class Game:
         
         '''
 
-        # First check to see if the use requested the help window to open or close.
-        if event.keyName in HOTKEY_OPEN_HELP and self.helpObject is not None:
+        # Mouse events go to whatever is under the pointer
+        if event.isMouseEvent():
+            self.handleMouseEvent(event)
+
+        # First check to see if the use requested the help window to open or close. Not while the active game object is being typed into
+        elif event.keyName in HOTKEY_OPEN_HELP and self.helpObject is not None and (self.helpActive or not self.isActiveObjectCapturingKeys()):
             if self.helpActive:
                 self.removeGameObject(self.helpObject)
             else:
@@ -846,6 +1249,204 @@ class Game:
         elif self.activeGameObject:
             self.activeGameObject._handleEvent(event)
 
+    def isActiveObjectCapturingKeys(self) -> bool:
+
+        activeGameObject = self.activeGameObject
+        return activeGameObject is not None and activeGameObject.isCapturingKeys()
+
+    def handleMouseEvent(self, event: Event):
+        '''
+        Give a mouse event to the gameObjects under the pointer, from the top layer down, until one of them handles it.
+        '''
+
+        # If the help window is active, it captures the event.
+        if self.helpObject in self.gameObjectsIDMap:
+            self.helpObject._handleMouseEvent(event)
+            return
+
+        for gameObject in self.getGameObjectsAtPoint(event.mouseX, event.mouseY):
+            if gameObject._handleMouseEvent(event) != EVENT_HANDLER.DID_NOT_HANDLE:
+                return
+
+    def updateFrame(self):
+        '''
+        Run a single update of the game. Called continuously by the update thread, or by simulate.
+        '''
+
+        # Update the game state time before any updates are performed
+        self.gameState.updateTime()
+
+        # Then perform any global game updates
+        self._update()
+
+        # Then we want to update every gameObject
+        for gameObjectID in list(self.gameObjectsIDMap):
+
+            gameObject: GameObject
+            try:
+                gameObject = self.gameObjectsIDMap[gameObjectID]
+            except KeyError:
+                continue
+            
+            gameObject._update()
+
+        # Record the gameState for rewinding
+        if self.gameStateHistory is not None and self.captureEachUpdate:
+            self.gameStateHistory.capture()
+
+        # Autosaves are only snapshotted here, the writing happens on the autosaver's thread
+        if self.autoSaver is not None:
+            self.autoSaver.update(self.gameState.now)
+
+    def drawFrame(self):
+        '''
+        Draw every gameObject and print the frame. Called continuously by the draw thread, or by simulate.
+        '''
+
+        self.composeFrame()
+        self.writeFrame()
+
+    def composeFrame(self):
+        '''
+        Draw every gameObject onto the canvas, and make it the active canvas.
+        '''
+
+        ##############################
+        # DRAW GAMEOBJECTS ON CANVAS #
+        ##############################
+
+        # Screens which were left are no longer being drawn, so their canvases can be reused
+        if self.screenCache.hasReleased():
+            self.releaseScreens()
+
+        # First clear the canvas
+        canvas = self.bufferCanvas
+        canvas.clearCanvas()
+
+        # The maps are read once, since going to another screen swaps them for new ones partway through a frame
+        layerToGameObjectIDMap = self.layerToGameObjectIDMap
+        gameObjectsIDMap = self.gameObjectsIDMap
+        spatialIndex = self.spatialIndex
+
+        # Only gameObjects which overlap the canvas need to be drawn
+        visibleIDs = spatialIndex.queryRegion(Box(0, 0, self.width, self.height))
+
+        # Draw each gameObject in each layer
+        layerList = sorted(list(layerToGameObjectIDMap))
+
+        for layer in layerList:
+            gameObjects = layerToGameObjectIDMap.get(layer, ())
+            for gameObjectID in list(gameObjects):
+
+                if gameObjectID not in visibleIDs:
+                    continue
+
+                gameObject: GameObject
+                try:
+                    gameObject = gameObjectsIDMap[gameObjectID]
+                except KeyError:
+                    continue
+                gameObject.draw(canvas)
+        
+        # The helpObject is read first, since it can be cleared before helpActive is
+        helpObject = self.helpObject
+        if self.helpActive and helpObject is not None:
+            helpObject.draw(canvas)
+
+        self.switchBuffers()
+
+        # Send the new frame to anyone watching
+        if self.frameStreamer is not None:
+            self.frameStreamer.streamFrame(self.activeCanvas)
+
+    def releaseScreens(self):
+        '''
+        Give the canvases of the screens which were left or dropped from the screenCache back to the CANVAS_POOL.
+            Only the gameObjects those screens own are released, not ones still used by the current screen, the game, or a cached screen.
+        '''
+
+        released, keptGameObjects = self.screenCache.takeReleased()
+
+        # The update thread may be adding gameObjects, in which case the screens are released next frame instead
+        try:
+            keptGameObjects += list(self.gameObjectsIDMap.values())
+            keptGameObjects += [getattr(self, name) for name in FOCUS_ATTRIBUTES]
+            keptIDs = {id(gameObject) for gameObject in getNestedGameObjects(keptGameObjects, set())}
+        except RuntimeError:
+            for snapshot in released:
+                self.screenCache.release(snapshot)
+            return
+
+        for snapshot in released:
+            snapshot.releaseCanvases(keptIDs)
+
+    def writeFrame(self):
+        '''
+        Write the active canvas to the outputStream.
+        '''
+
+        ########################
+        # PRINT WHAT WAS DRAWN #
+        ########################
+        
+        # Print the new screen.
+        if self.isDisplayActive:
+            
+            # Write the whole frame at once
+            self.outputStream.write(self.getFrameText())
+            self.outputStream.flush()
+
+    def getFrameText(self) -> str:
+        '''
+        The text which prints the active canvas, starting from the beginning of the screen.
+        '''
+
+        return colorama.Cursor.POS() + self.activeCanvas.getCanvasText()
+
+    def simulate(self, duration: float, draw: bool = False):
+        '''
+        Run the game for duration seconds of simulated time, as fast as possible and without any threads.
+        The clock must be a VirtualClock (see setClock), which is moved forward by updateDelay for each update.
+
+        If the eventGetter is a ReplayEventGetter, the recorded events are handled at their recorded times.
+            Events pushed to a NullEventGetter are handled at the next update.
+
+        Parameters
+        ----------
+        duration: Seconds of simulated time to run for
+
+        draw: Whether to also draw a frame every drawDelay seconds
+        '''
+
+        clock = getClock()
+        if not isinstance(clock, VirtualClock):
+            raise Exception("Game.simulate needs a VirtualClock. Call setClock(VirtualClock()) before creating the game")
+
+        isReplay = isinstance(self.eventGetter, ReplayEventGetter)
+        hasEvents = isReplay or isinstance(self.eventGetter, NullEventGetter)
+        if isReplay and self.eventGetter.startTime is None:
+            self.eventGetter.startTime = timeFunction()
+
+        endTime = timeFunction() + duration
+        nextDrawTime = timeFunction()
+
+        while self.isActive and timeFunction() < endTime:
+            clock.advance(self.updateDelay)
+
+            # Handle the events which happened before now
+            if hasEvents:
+                for event in self.eventGetter.getEventsUntil(timeFunction()):
+                    if event.keyName == "EXIT":
+                        self.isActive = False
+                        break
+                    self._handleEvent(event)
+
+            self.updateFrame()
+
+            if draw and timeFunction() >= nextDrawTime:
+                self.drawFrame()
+                nextDrawTime += self.drawDelay
+
     def switchBuffers(self):
         '''
         Flip the active and buffer canvass.
@@ -858,28 +1459,221 @@ class Game:
         Virtual function to overwrite by children. Called each loop in the updateLoop
         '''
     
-    def addScreen(self, screenName: str, function: FunctionType):
+    def addScreen(self, screenName: str, function: FunctionType, cache: bool = False):
         '''
         Adds to a dictionary a function which will reset the game to a specific value.
         The function must have a game obbject as its first and only argument.
+
+        Parameters
+        ----------
+        cache: Whether to keep the screen's gameObjects when the screen is left, so going back to it swaps them back in instead of calling the function again.
+            Only use this for screens which don't need to be reset each time they are gone to. See self.screenCache for the memory budget
         '''
 
         if callable(function):
             self.screens[screenName] = function
         else:
-            raise "Function parameter is not a callable."
+            raise Exception("Function parameter is not a callable.")
+
+        if cache:
+            self.cachedScreens.add(screenName)
+        else:
+            self.cachedScreens.discard(screenName)
+
+        # The function may have changed, so the old screen can't be used
+        self.screenCache.discard(screenName)
 
     
+    def startRecording(self, filePath: str, seed: int = None):
+        '''
+        Record every event to a file, so the session can be played back by passing a ReplayEventGetter to a Game.
+
+        Parameters
+        ----------
+        seed: Random seed to store with the recording. If given, random numbers are seeded with it now, and again when the recording is replayed
+        '''
+
+        self.stopRecording()
+        self.eventRecorder = EventRecorder(filePath, seed)
+
+    def stopRecording(self):
+
+        if self.eventRecorder is not None:
+            self.eventRecorder.close()
+            self.eventRecorder = None
+
+    def startStreaming(self, address: Address, compressionLevel: int = 6):
+        '''
+        Stream every frame to viewers connecting to an address, who can watch with watchStream. See FrameStreamer.
+
+        Parameters
+        ----------
+        address: Unix socket path, or (host, port) for TCP
+
+        compressionLevel: zlib level from 1 to 9. 0 doesn't compress
+        '''
+
+        self.stopStreaming()
+        self.frameStreamer = FrameStreamer(address, compressionLevel)
+        self.frameStreamer.start()
+
+    def stopStreaming(self):
+
+        if self.frameStreamer is not None:
+            self.frameStreamer.stop()
+            self.frameStreamer = None
+
+    def enableAutosave(self, savePath: str, interval: float = 60.0, incremental: bool = False, saveOnQuit: bool = True):
+        '''
+        Save the gameState in the background every interval seconds. See AutoSaver.
+
+        Parameters
+        ----------
+        savePath: Where to save. A file, or a directory if incremental is set
+
+        interval: Seconds between saves. None only saves when self.autoSaver.requestSave() is called
+
+        incremental: Whether to only write the gameState attributes which changed since the last save
+
+        saveOnQuit: Whether to save one last time when the game quits
+        '''
+
+        if self.autoSaver is not None:
+            self.autoSaver.stop(saveFirst = False)
+
+        self.autoSaver = AutoSaver(self.gameState, savePath, interval, incremental)
+        self.saveOnQuit = saveOnQuit
+        self.autoSaver.start()
+
+    def enableHistory(self, capacity: int = 600, captureEachUpdate: bool = True):
+        '''
+        Keep a history of gameState snapshots which can be restored. See GameStateHistory.
+
+        Parameters
+        ----------
+        capacity: The number of snapshots kept
+
+        captureEachUpdate: Whether to take a snapshot after every update. Otherwise call self.gameStateHistory.capture(), such as once a turn
+        '''
+
+        self.gameStateHistory = GameStateHistory(self.gameState, capacity)
+        self.captureEachUpdate = captureEachUpdate
+
+    def takeScreenSnapshot(self, focus: Dict[str, object] = None) -> ScreenSnapshot:
+        '''
+        Take the current gameObjects out of the game, leaving it empty. The maps are replaced rather than cleared, so the snapshot keeps them.
+
+        Parameters
+        ----------
+        focus: The FOCUS_ATTRIBUTES the screen's function set. Their current values are kept in the snapshot and the game's are left as they are
+        '''
+
+        if focus is None:
+            focus = {}
+
+        snapshot = ScreenSnapshot(
+            self.gameObjectIDToLayerMap,
+            self.gameObjectsIDMap,
+            self.layerToGameObjectIDMap,
+            self.spatialIndex,
+            {name: getattr(self, name) for name in focus}
+        )
+
+        # The draw thread may be looping over the layers, so they are swapped for new ones in one go
+        self.layerToGameObjectIDMap = {}
+        self.gameObjectIDToLayerMap = {}
+        self.gameObjectsIDMap = {}
+        self.spatialIndex = SpatialGrid(snapshot.spatialIndex.cellSize)
+
+        return snapshot
+
+    def restoreScreenSnapshot(self, snapshot: ScreenSnapshot):
+        '''
+        Swap the gameObjects of a snapshot into the game, replacing whatever is there.
+        '''
+
+        self.gameObjectIDToLayerMap = snapshot.gameObjectIDToLayerMap
+        self.gameObjectsIDMap = snapshot.gameObjectsIDMap
+        self.spatialIndex = snapshot.spatialIndex
+        self.layerToGameObjectIDMap = snapshot.layerToGameObjectIDMap
+
+        for name, value in snapshot.focus.items():
+            setattr(self, name, value)
+
+    def leaveScreen(self):
+        '''
+        Remove the current screen's gameObjects, keeping them in the screenCache if the screen is cached.
+        '''
+
+        if self.currentScreen in self.cachedScreens:
+            self.screenCache.store(self.currentScreen, self.takeScreenSnapshot(self.screenFocus))
+
+        # The next screen can reuse the canvases, once the draw thread is done with them
+        else:
+            self.screenCache.release(self.takeScreenSnapshot())
+
+        self.currentScreen = None
+        self.screenFocus = {}
+
+    def buildScreen(self, screenName: str) -> Dict[str, object]:
+        '''
+        Call a screen function. Returns which of the FOCUS_ATTRIBUTES it set, so they can be kept with the screen if it is cached.
+        '''
+
+        previous = {name: getattr(self, name) for name in FOCUS_ATTRIBUTES}
+
+        self.screens[screenName](self)
+
+        return {name: getattr(self, name) for name in FOCUS_ATTRIBUTES if getattr(self, name) is not previous[name]}
+
     def goToScreen(self, screenName: str):
         '''
-        Calls the saved screen function by passing in self.
+        Calls the saved screen function by passing in self. Cached screens which were built before are swapped back in instead.
         '''
 
         if screenName in self.screens:
-            self.clearGameObjects()
-            self.screens[screenName](self)
+            self.leaveScreen()
+
+            snapshot = self.screenCache.take(screenName)
+            if snapshot is not None:
+                self.restoreScreenSnapshot(snapshot)
+                self.screenFocus = snapshot.focus
+            else:
+                self.screenFocus = self.buildScreen(screenName)
+
+            self.currentScreen = screenName
+            self.screenChanges += 1
+        else:
+            raise Exception("Screen " + screenName + " not understood.")
+
+    def prebuildScreen(self, screenName: str):
+        '''
+        Build a cached screen ahead of time, so the first time it is gone to is as quick as every other time. The current screen isn't changed.
+        '''
+
+        if screenName not in self.cachedScreens:
+            raise Exception("Screen " + screenName + " isn't cached. Add it with addScreen(..., cache = True)")
+
+        if screenName in self.screenCache or screenName == self.currentScreen:
+            return
+
+        # The current screen's focus is put back afterwards, since the screen function may change it
+        current = self.takeScreenSnapshot(dict.fromkeys(FOCUS_ATTRIBUTES))
+
+        focus = self.buildScreen(screenName)
+        self.screenCache.store(screenName, self.takeScreenSnapshot(focus))
+
+        self.restoreScreenSnapshot(current)
+
+    def invalidateScreen(self, screenName: str = None):
+        '''
+        Drop a cached screen so it is built again the next time it is gone to. None drops every cached screen.
+        '''
+
+        if screenName is None:
+            self.screenCache.clear()
         else:
-            raise "Screen " + screenName + " not understood."
+            self.screenCache.discard(screenName)
     
     def quit(self):
         '''
@@ -889,33 +1683,46 @@ class Game:
         self.isActive = False
         self.isDisplayActive = False
 
+        if self.useMouse:
+            self.outputStream.write(MOUSE_DISABLE)
+            self.outputStream.flush()
+
         if not self.errorInDrawThread:
-            while self.canvasDrawThread.isAlive(): time.sleep(0.05)
+            while self.canvasDrawThread.is_alive(): time.sleep(0.05)
         if not self.errorInUpdateThread:
-            while self.updateThread.isAlive(): time.sleep(0.05)
+            while self.updateThread.is_alive(): time.sleep(0.05)
 
-        # Clsoe the getch thread
-        self.eventGetter.getchThread.running = False
+        # Once nothing is changing the gameState, finish writing any autosaves
+        if self.autoSaver is not None:
+            self.autoSaver.stop(saveFirst = self.saveOnQuit)
+
+        self.stopRecording()
+        self.stopStreaming()
 
-        while self.eventGetter.getchThread.isAlive():
-            # Simulate a keypress to end the getch thread
-            keyboard = pynput.keyboard.Controller()
-            keyboard.press(" ")
-            time.sleep(0.05)
+        # Clsoe the getch thread
+        self.eventGetter.close()
         
-        print("Successfully Quit Game\r\r")
+        self.outputStream.write("Successfully Quit Game\r\r\n")
+        self.outputStream.flush()
 
     def gameLoop(self):
         '''
         Start the game loop.
         '''
 
+        if self.useMouse:
+            self.outputStream.write(MOUSE_ENABLE)
+            self.outputStream.flush()
+
         self.canvasDrawThread.start()
         self.updateThread.start()
 
         while self.isActive:
             event = self.eventGetter.getEvent()
 
+            if self.eventRecorder is not None:
+                self.eventRecorder.record(event)
+
             # Control C
             if event.keyName == "EXIT":
                 self.quit()
@@ -0,0 +1,525 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from collections import deque
+
+from threading import Lock
+
+from types import FunctionType
+
+from typing import Any, Dict, List
+
+import codecs
+import os
+import selectors
+import socket
+import sys
+import traceback
+
+import numpy
+
+from .event import Event, createEvent, splitSequence, isIncompleteMouseSequence
+from .game import Game
+from .timing import timeFunction
+
+class SessionEventGetter:
+    '''
+    Stands in for the EventGetter of a Game hosted by a GameServer. The server reads the input and hands the events to the game itself,
+        so this only keeps the input which hasn't made a full event yet.
+    '''
+
+    def __init__(self):
+
+        # Turns the bytes from the connection back into characters
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors = "replace")
+
+        # Key numbers of a mouse report which hasn't been fully read yet
+        self.sequence: tuple = ()
+
+    def feed(self, data: bytes) -> List[Event]:
+        '''
+        Turn input from the connection into events.
+        '''
+
+        self.sequence += tuple(ord(character) for character in self.decoder.decode(data))
+
+        if len(self.sequence) == 0 or isIncompleteMouseSequence(self.sequence):
+            return []
+
+        events = [createEvent(sequence) for sequence in splitSequence(self.sequence)]
+        self.sequence = ()
+
+        return events
+
+    def getEvent(self):
+        raise Exception("Games hosted by a GameServer get their events from the server. Don't call gameLoop")
+
+    def close(self):
+        '''
+        The server closes the connection.
+        '''
+
+class SessionOutput:
+    '''
+    Stands in for the outputStream of a Game hosted by a GameServer. Writes are buffered until the server sends them.
+    '''
+
+    def __init__(self, session: "GameServer.Session"):
+        self.session: GameServer.Session = session
+
+    def write(self, text: str) -> int:
+        self.session.queueOutput(text.encode("utf-8"))
+        return len(text)
+
+    def flush(self):
+        '''
+        The server sends the output when the connection is ready.
+        '''
+
+    def isatty(self) -> bool:
+        return False
+
+class GameServer:
+    '''
+    Hosts many independent Game sessions in one process. Each connection to the unix socket, or each PTY, gets its own Game.
+
+    Every session is run by a single event loop: it reads input, runs updates, and sends output for all of them.
+        Games don't start any threads. Turning canvases into text is the slowest part of a frame, so it is handed to a shared pool of workers.
+        Canvas.getCanvasText is pure Python and holds the GIL, so the workers don't encode in parallel with each other or with the loop.
+        The pool only keeps the loop from stalling for a whole encode, letting it read input and run updates between the workers' time slices.
+        That is why a single worker is the default.
+    Assets loaded through getAsset are loaded once and shared by every session.
+
+    Parameters
+    ----------
+    gameFactory: Function which takes in (eventGetter, outputStream) and returns a new Game for a session.
+        These must be passed on to the Game. The game should be set up (such as with goToScreen), but gameLoop must not be called
+
+    socketPath: Path of the unix socket to listen on. None to only host PTY sessions
+
+    encodeWorkers: Number of threads turning canvases into text. More than one only helps if encoding releases the GIL
+
+    maxPendingBytes: If a session has more output than this waiting to be sent, its frames are skipped until it catches up
+    '''
+
+    class Session:
+        '''
+        A single connected user and their Game.
+        '''
+
+        def __init__(self, server: "GameServer", readFileDescriptor: int, writeFileDescriptor: int, connection: socket.socket = None):
+
+            self.server: GameServer = server
+
+            # Sockets are read and written with recv and send, PTYs with os.read and os.write
+            self.connection: socket.socket = connection
+            self.readFileDescriptor: int = readFileDescriptor
+            self.writeFileDescriptor: int = writeFileDescriptor
+
+            self.eventGetter: SessionEventGetter = SessionEventGetter()
+            self.outputBuffer: bytearray = bytearray()
+            self.outputLock: Lock = Lock()
+
+            self.game: Game = server.gameFactory(self.eventGetter, SessionOutput(self))
+
+            # When the next update and draw are due
+            self.nextUpdateTime: float = timeFunction()
+            self.nextDrawTime: float = timeFunction()
+
+            # The frame being encoded by the worker pool. Only one frame is encoded at a time for each session
+            self.encoding: Future = None
+
+            # The user's end of a PTY session, kept open for as long as the session is
+            self.ptySlaveFileDescriptor: int = None
+
+            self.isOpen: bool = True
+
+        def queueOutput(self, data: bytes):
+
+            with self.outputLock:
+                self.outputBuffer += data
+
+        def getPendingBytes(self) -> int:
+
+            with self.outputLock:
+                return len(self.outputBuffer)
+
+        def read(self) -> bytes:
+
+            if self.connection is not None:
+                return self.connection.recv(4096)
+
+            return os.read(self.readFileDescriptor, 4096)
+
+        def send(self):
+            '''
+            Send as much of the output as the connection will take.
+            '''
+
+            with self.outputLock:
+                if len(self.outputBuffer) == 0:
+                    return
+
+                if self.connection is not None:
+                    sent = self.connection.send(self.outputBuffer)
+                else:
+                    sent = os.write(self.writeFileDescriptor, self.outputBuffer)
+
+                del self.outputBuffer[:sent]
+
+        def close(self):
+
+            self.isOpen = False
+            self.game.isActive = False
+            self.game.stopRecording()
+            self.game.stopStreaming()
+
+            if self.game.autoSaver is not None:
+                self.game.autoSaver.stop(saveFirst = self.game.saveOnQuit)
+
+            if self.connection is not None:
+                self.connection.close()
+            else:
+                os.close(self.readFileDescriptor)
+
+            if self.ptySlaveFileDescriptor is not None:
+                os.close(self.ptySlaveFileDescriptor)
+
+    def __init__(self, gameFactory: FunctionType, socketPath: str = None, encodeWorkers: int = 1, maxPendingBytes: int = 1 << 20):
+
+        self.gameFactory: FunctionType = gameFactory
+        self.socketPath: str = socketPath
+        self.maxPendingBytes: int = maxPendingBytes
+
+        self.selector: selectors.BaseSelector = selectors.DefaultSelector()
+
+        # Sessions keyed by the file descriptor their input is read from
+        self.sessions: Dict[int, GameServer.Session] = {}
+
+        # Shared pool which turns canvases into text
+        self.encodePool: ThreadPoolExecutor = ThreadPoolExecutor(max_workers = encodeWorkers)
+
+        # Encoded frames waiting to be queued for sending, added to by the pool
+        self.finishedFrames: deque = deque()
+
+        # Writing to this wakes the event loop from other threads
+        self.wakeReader, self.wakeWriter = socket.socketpair()
+        self.wakeReader.setblocking(False)
+        self.wakeWriter.setblocking(False)
+        self.selector.register(self.wakeReader, selectors.EVENT_READ, "wake")
+
+        # Assets shared by every session
+        self.assets: Dict[str, Any] = {}
+        self.assetLock: Lock = Lock()
+
+        self.listener: socket.socket = None
+        if socketPath is not None:
+            if os.path.exists(socketPath):
+                os.remove(socketPath)
+            self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.listener.bind(socketPath)
+            self.listener.listen()
+            self.listener.setblocking(False)
+            self.selector.register(self.listener, selectors.EVENT_READ, "listener")
+
+        self.running: bool = True
+
+    ##########
+    # ASSETS #
+    ##########
+    def getAsset(self, name: str, loader: FunctionType) -> Any:
+        '''
+        Get an asset shared by every session, loading it with loader() the first time it is asked for.
+        Numpy arrays in the asset are made read only, so one session can't change them for the others.
+        '''
+
+        with self.assetLock:
+            if name not in self.assets:
+                asset = loader()
+
+                arrays = [asset] if isinstance(asset, numpy.ndarray) else list(getattr(asset, "__dict__", {}).values())
+                for array in arrays:
+                    if isinstance(array, numpy.ndarray):
+                        array.flags.writeable = False
+
+                self.assets[name] = asset
+
+            return self.assets[name]
+
+    ############
+    # SESSIONS #
+    ############
+    def addSession(self, readFileDescriptor: int, writeFileDescriptor: int, connection: socket.socket = None) -> "GameServer.Session":
+
+        session = GameServer.Session(self, readFileDescriptor, writeFileDescriptor, connection)
+        self.sessions[readFileDescriptor] = session
+        self.selector.register(readFileDescriptor, selectors.EVENT_READ, session)
+
+        return session
+
+    def addPTYSession(self) -> str:
+        '''
+        Host a session on a new PTY. Returns the path of the PTY's terminal, which a user's terminal can be attached to.
+        '''
+
+        import pty, tty #pylint: disable=import-error
+
+        master, slave = pty.openpty()
+        tty.setraw(slave)
+        os.set_blocking(master, False)
+
+        session = self.addSession(master, master)
+        session.ptySlaveFileDescriptor = slave
+
+        return os.ttyname(slave)
+
+    def removeSession(self, session: "GameServer.Session"):
+
+        if not session.isOpen:
+            return
+
+        self.selector.unregister(session.readFileDescriptor)
+        del self.sessions[session.readFileDescriptor]
+
+        # Send whatever the game wrote last, such as its quit message, if the connection will take it straight away
+        try:
+            session.send()
+        except OSError:
+            pass
+
+        session.close()
+
+    def wake(self):
+        '''
+        Wake the event loop up from another thread.
+        '''
+
+        try:
+            self.wakeWriter.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    ##############
+    # EVENT LOOP #
+    ##############
+    def serveForever(self):
+        '''
+        Run the event loop until stop is called.
+        '''
+
+        try:
+            while self.running:
+                self.step()
+        finally:
+            self.close()
+
+    def step(self):
+        '''
+        Run one pass of the event loop: wait for input or the next update, then update, draw, and send for every session.
+        '''
+
+        # Sleep until some session needs an update or a draw, or something happens on a connection
+        now = timeFunction()
+        timeout = None
+        if len(self.sessions) > 0:
+            nextTime = min(min(session.nextUpdateTime, session.nextDrawTime) for session in self.sessions.values())
+            timeout = max(0.0, nextTime - now)
+
+        for key, mask in self.selector.select(timeout):
+
+            if key.data == "wake":
+                try:
+                    while self.wakeReader.recv(4096):
+                        pass
+                except BlockingIOError:
+                    pass
+
+            elif key.data == "listener":
+                self.acceptConnection()
+
+            else:
+                session: GameServer.Session = key.data
+
+                if mask & selectors.EVENT_READ:
+                    self.readSession(session)
+
+                if session.isOpen and mask & selectors.EVENT_WRITE:
+                    self.sendSession(session)
+
+        # Queue the frames the workers have finished
+        while len(self.finishedFrames) > 0:
+            session, data = self.finishedFrames.popleft()
+            if session.isOpen:
+                session.queueOutput(data)
+
+        now = timeFunction()
+        for session in list(self.sessions.values()):
+            self.runSession(session, now)
+
+        # Only wait for connections to be writable when there is something to send
+        for session in list(self.sessions.values()):
+            events = selectors.EVENT_READ
+            if session.getPendingBytes() > 0:
+                events |= selectors.EVENT_WRITE
+            if self.selector.get_key(session.readFileDescriptor).events != events:
+                self.selector.modify(session.readFileDescriptor, events, session)
+
+    def acceptConnection(self):
+
+        try:
+            connection, _ = self.listener.accept()
+        except BlockingIOError:
+            return
+
+        connection.setblocking(False)
+
+        try:
+            self.addSession(connection.fileno(), connection.fileno(), connection)
+        except Exception: #pylint: disable=broad-except
+            print(traceback.format_exc(), file = sys.stderr)
+            connection.close()
+
+    def readSession(self, session: "GameServer.Session"):
+
+        try:
+            data = session.read()
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+
+        # Nothing read means the other end closed
+        if len(data) == 0:
+            self.removeSession(session)
+            return
+
+        for event in session.eventGetter.feed(data):
+
+            # Control C ends the session
+            if event.keyName == "EXIT":
+                self.removeSession(session)
+                return
+
+            try:
+                session.game._handleEvent(event)
+            except Exception: #pylint: disable=broad-except
+                print(traceback.format_exc(), file = sys.stderr)
+                self.removeSession(session)
+                return
+
+    def sendSession(self, session: "GameServer.Session"):
+
+        try:
+            session.send()
+        except BlockingIOError:
+            pass
+        except OSError:
+            self.removeSession(session)
+
+    def runSession(self, session: "GameServer.Session", now: float):
+        '''
+        Update and draw a session if it is time to.
+        '''
+
+        game = session.game
+
+        try:
+            if now >= session.nextUpdateTime:
+                game.updateFrame()
+                session.nextUpdateTime = max(session.nextUpdateTime + game.updateDelay, now)
+
+            # Frames are skipped while the last one is still being encoded or sent
+            if now >= session.nextDrawTime:
+                session.nextDrawTime = max(session.nextDrawTime + game.drawDelay, now)
+
+                if session.encoding is None and session.getPendingBytes() < self.maxPendingBytes and game.isDisplayActive:
+                    game.composeFrame()
+                    session.encoding = self.encodePool.submit(game.getFrameText)
+                    session.encoding.add_done_callback(lambda future, session = session: self.frameEncoded(session, future))
+
+        except Exception: #pylint: disable=broad-except
+            print(traceback.format_exc(), file = sys.stderr)
+            self.removeSession(session)
+
+        if not game.isActive:
+            self.removeSession(session)
+
+    def frameEncoded(self, session: "GameServer.Session", future: Future):
+        '''
+        Called on a worker thread when a frame has been turned into text.
+        '''
+
+        try:
+            data = future.result().encode("utf-8")
+        except Exception: #pylint: disable=broad-except
+            print(traceback.format_exc(), file = sys.stderr)
+            data = b""
+
+        # The frame is queued before the next one is allowed to start, so frames are always sent in order
+        self.finishedFrames.append((session, data))
+        session.encoding = None
+        self.wake()
+
+    def stop(self):
+        '''
+        Stop the event loop. Can be called from any thread.
+        '''
+
+        self.running = False
+        self.wake()
+
+    def close(self):
+
+        for session in list(self.sessions.values()):
+            self.removeSession(session)
+
+        self.encodePool.shutdown(wait = True)
+
+        if self.listener is not None:
+            self.selector.unregister(self.listener)
+            self.listener.close()
+            if os.path.exists(self.socketPath):
+                os.remove(self.socketPath)
+            self.listener = None
+
+        self.selector.close()
+        self.wakeReader.close()
+        self.wakeWriter.close()
+
+def connectToServer(socketPath: str):
+    '''
+    Play a session on a GameServer from this terminal. The terminal is put in raw mode, keys are sent to the server, and frames are printed.
+    '''
+
+    import termios, tty #pylint: disable=import-error
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.connect(socketPath)
+
+    inputFileDescriptor = sys.stdin.fileno()
+    oldSettings = termios.tcgetattr(inputFileDescriptor)
+
+    selector = selectors.DefaultSelector()
+    selector.register(inputFileDescriptor, selectors.EVENT_READ, "input")
+    selector.register(connection, selectors.EVENT_READ, "connection")
+
+    try:
+        tty.setraw(inputFileDescriptor)
+
+        while True:
+            for key, _ in selector.select():
+
+                if key.data == "input":
+                    connection.sendall(os.read(inputFileDescriptor, 4096))
+
+                else:
+                    data = connection.recv(65536)
+                    if len(data) == 0:
+                        return
+                    os.write(sys.stdout.fileno(), data)
+
+    finally:
+        termios.tcsetattr(inputFileDescriptor, termios.TCSADRAIN, oldSettings)
+        selector.close()
+        connection.close()
\ No newline at end of file
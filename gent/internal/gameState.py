@@ -1,9 +1,16 @@
 # Copyright Clayton Brown 2019. See LICENSE file.
 
+from typing import Dict, Union
+
+import os
 import pickle
 
 from .timing import timeFunction
 
+# File in an incremental save directory mapping each saved attribute to the file holding it.
+#   Attribute files are named after the hash of what they hold, so a new save never overwrites a file the current manifest lists
+INCREMENTAL_MANIFEST: str = "manifest.index"
+
 class GameState:
     '''
     This is the base gamestate class. Gamestate is used to monitor all aspects of the application.
@@ -41,15 +48,41 @@ class GameState:
     @staticmethod
     def load(loadPath: str) -> "GameState":
         '''
-        Loads the whole GameState from a pickle.
+        Loads the whole GameState from a pickle, or from a directory written by an incremental AutoSaver.
         '''
 
         gameState = GameState()
 
+        if os.path.isdir(loadPath):
+            with open(os.path.join(loadPath, INCREMENTAL_MANIFEST), "rb") as f:
+                attributeFiles = pickle.load(f)
+
+            gameState.__dict__ = {}
+            for key, fileName in attributeFiles.items():
+                with open(os.path.join(loadPath, fileName), "rb") as f:
+                    gameState.__dict__[key] = pickle.load(f)
+
+            return gameState
+
         with open(loadPath, "rb") as f:
             gameState.__dict__ = pickle.load(f)
 
         return gameState
+
+    def createSnapshot(self, perAttribute: bool = False) -> Union[bytes, Dict[str, bytes]]:
+        '''
+        Pickle the GameState, so it can be written in the background. Nothing is shared with the live gameState,
+            so it can keep changing while the snapshot is written. Call it from the thread which changes the gameState.
+
+        Parameters
+        ----------
+        perAttribute: Whether to pickle each attribute on its own, for incremental saves. Otherwise the whole GameState is pickled, as save does
+        '''
+
+        if perAttribute:
+            return {key: pickle.dumps(value, protocol = pickle.HIGHEST_PROTOCOL) for key, value in self.__dict__.items()}
+
+        return pickle.dumps(self.__dict__, protocol = pickle.HIGHEST_PROTOCOL)
     
 
     ##########
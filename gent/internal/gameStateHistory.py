@@ -0,0 +1,155 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from threading import Lock
+
+from typing import Any, Dict, Iterable
+
+import copy
+import numpy
+
+from .gameState import GameState
+from ..utilities import RingBuffer
+
+# Types which can't be changed in place, so they can be stored in a snapshot without copying
+IMMUTABLE_TYPES = (int, float, complex, bool, str, bytes, type(None), range)
+
+def isImmutable(value: Any) -> bool:
+    '''
+    Whether a value can never change, so sharing it between snapshots is safe.
+    '''
+
+    if isinstance(value, IMMUTABLE_TYPES):
+        return True
+
+    if isinstance(value, (tuple, frozenset)):
+        return all(isImmutable(item) for item in value)
+
+    return False
+
+def isUnchanged(savedValue: Any, value: Any) -> bool:
+    '''
+    Whether value is still the same as a value saved in a snapshot.
+    '''
+
+    if savedValue is value:
+        return isImmutable(value)
+
+    if type(savedValue) is not type(value):
+        return False
+
+    if isinstance(value, numpy.ndarray):
+        return savedValue.dtype == value.dtype and numpy.array_equal(savedValue, value)
+
+    # Objects which can't be compared are treated as changed
+    try:
+        return bool(savedValue == value)
+    except Exception: #pylint: disable=broad-except
+        return False
+
+class GameStateHistory:
+    '''
+    Bounded history of GameState snapshots, for rewinding and undoing.
+
+    Snapshots share structure: an attribute which hasn't changed since the last snapshot is stored as the same object,
+        so only changed attributes are copied. Immutable values are never copied.
+    Attributes are compared with ==, so objects of classes which don't define __eq__ are copied on every capture.
+    Each snapshot is given a tick, which counts up by one for every capture.
+
+    Parameters
+    ----------
+    gameState: The gameState to take snapshots of
+
+    capacity: The number of snapshots kept. Once full, the oldest snapshot is dropped for each new one
+
+    ignoredAttributes: Attributes which aren't captured or restored. By default the gameState times
+    '''
+
+    def __init__(self, gameState: GameState, capacity: int = 600, ignoredAttributes: Iterable[str] = ("now", "last")):
+
+        self.gameState: GameState = gameState
+        self.ignoredAttributes: set = set(ignoredAttributes)
+
+        # Snapshots of the gameState attributes. Sequence numbers are the ticks
+        self.snapshots: RingBuffer = RingBuffer(capacity)
+
+        # Captures and restores can happen on different threads
+        self.lock: Lock = Lock()
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def capture(self) -> int:
+        '''
+        Take a snapshot of the gameState. Returns the tick of the snapshot.
+        '''
+
+        with self.lock:
+            previous: Dict[str, Any] = self.snapshots[-1] if len(self.snapshots) > 0 else {}
+
+            snapshot = {}
+            for key, value in self.gameState.__dict__.items():
+                if key in self.ignoredAttributes:
+                    continue
+
+                # Unchanged attributes share the previous snapshot's copy
+                if key in previous and isUnchanged(previous[key], value):
+                    snapshot[key] = previous[key]
+                elif isImmutable(value):
+                    snapshot[key] = value
+                else:
+                    snapshot[key] = copy.deepcopy(value)
+
+            self.snapshots.append(snapshot)
+
+            return self.snapshots.getLastSequence()
+
+    def getFirstTick(self) -> int:
+        return self.snapshots.getFirstSequence()
+
+    def getLastTick(self) -> int:
+        return self.snapshots.getLastSequence()
+
+    def restore(self, tick: int, discardLater: bool = True):
+        '''
+        Set the gameState back to how it was at a tick.
+
+        Parameters
+        ----------
+        tick: Tick returned by capture. Must still be in the history
+
+        discardLater: Whether to drop the snapshots after the tick, so the next capture continues on from it
+        '''
+
+        with self.lock:
+            if tick > self.snapshots.getLastSequence():
+                raise Exception("Tick %i hasn't been captured" % tick)
+
+            snapshot = self.snapshots.getBySequence(tick)
+
+            # The gameState gets its own copies, so changing it doesn't change the history
+            state = self.gameState.__dict__
+            for key in list(state):
+                if key not in self.ignoredAttributes and key not in snapshot:
+                    del state[key]
+            for key, value in snapshot.items():
+                state[key] = value if isImmutable(value) else copy.deepcopy(value)
+
+            if discardLater:
+                while self.snapshots.getLastSequence() > tick:
+                    self.snapshots.pop()
+
+    def undo(self, steps: int = 1) -> int:
+        '''
+        Restore the gameState to steps snapshots before the latest one, discarding the later snapshots. Returns the restored tick.
+        '''
+
+        # Ticks skip the snapshots discarded by earlier restores, so steps are counted through the snapshots themselves
+        tick = self.snapshots.getSequence(max(len(self.snapshots) - 1 - steps, 0))
+        self.restore(tick)
+
+        return tick
+
+    def clear(self):
+
+        with self.lock:
+            self.snapshots.clear()
\ No newline at end of file
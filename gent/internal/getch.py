@@ -1,6 +1,6 @@
 # Copyright Clayton Brown 2019. See LICENSE file.
 
-from ..internal.event import createEvent
+from ..internal.event import Event, createEvent, splitSequence, isIncompleteMouseSequence
 
 import platform
 
@@ -72,8 +72,16 @@ class EventGetter:
 
         self.getchThread: GetchThread = GetchThread()
         self.getchThread.start()
+
+        # Events which have been read but not returned yet
+        self.pendingEvents: List[Event] = []
     
     def getEvent(self):
+
+        # Input can contain more than one event. Return the leftovers first
+        if len(self.pendingEvents) > 0:
+            return self.pendingEvents.pop(0)
+
         while len(self.getchThread.sequence) == 0:
             time.sleep(10e-6)
         time.sleep(0.0001)
@@ -81,4 +89,31 @@ class EventGetter:
         eventTuple = tuple(self.getchThread.sequence)
         self.getchThread.sequence = []
 
-        return createEvent(eventTuple)
\ No newline at end of file
+        # Make sure a mouse report isn't cut in half
+        for _ in range(100):
+            if not isIncompleteMouseSequence(eventTuple):
+                break
+            time.sleep(0.0001)
+            eventTuple += tuple(self.getchThread.sequence)
+            self.getchThread.sequence = []
+
+        events = [createEvent(sequence) for sequence in splitSequence(eventTuple)]
+        self.pendingEvents.extend(events[1:])
+
+        return events[0]
+
+    def close(self):
+        '''
+        Stop the getch thread.
+        '''
+
+        # pynput needs a display to import on linux, so it is only imported when it's needed
+        import pynput
+
+        self.getchThread.running = False
+
+        while self.getchThread.is_alive():
+            # Simulate a keypress to end the getch thread
+            keyboard = pynput.keyboard.Controller()
+            keyboard.press(" ")
+            time.sleep(0.05)
\ No newline at end of file
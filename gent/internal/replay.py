@@ -0,0 +1,223 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from threading import Lock
+
+from typing import BinaryIO, List, Tuple
+
+import random
+import struct
+import time
+
+import numpy
+
+from .event import Event, createEvent
+from .timing import timeFunction, sleepFunction
+
+# Recording file layout. The header is the magic bytes, whether there is a seed, and the seed.
+#   Each event is the seconds since recording started, the number of key numbers, and then the key numbers
+RECORDING_MAGIC: bytes = b"GENTREC1"
+RECORDING_HEADER = struct.Struct("<?q")
+RECORDING_EVENT = struct.Struct("<dH")
+
+# Key number sequence which ends a replay. The same as pressing control c
+REPLAY_EXIT_SEQUENCE: Tuple[int] = (3, )
+
+def seedRandom(seed: int):
+    '''
+    Seed both the random module and numpy's global random numbers.
+    '''
+
+    random.seed(seed)
+    numpy.random.seed(seed % 2**32)
+
+class EventRecorder:
+    '''
+    Records events with the time they happened to a compact binary file, so the session can be played back with a ReplayEventGetter.
+
+    Parameters
+    ----------
+    filePath: File to record to. Any existing file is overwritten
+
+    seed: Random seed to store with the recording. If given, random numbers are seeded with it now, and again when the recording is replayed
+    '''
+
+    def __init__(self, filePath: str, seed: int = None):
+
+        self.filePath: str = filePath
+        self.seed: int = seed
+
+        if seed is not None:
+            seedRandom(seed)
+
+        self.file: BinaryIO = open(filePath, "wb")
+        self.file.write(RECORDING_MAGIC)
+        self.file.write(RECORDING_HEADER.pack(seed is not None, seed or 0))
+
+        self.startTime: float = timeFunction()
+        self.eventCount: int = 0
+        self.lock: Lock = Lock()
+
+    def record(self, event: Event):
+        '''
+        Write an event to the recording.
+        '''
+
+        keyNumber = tuple(event.keyNumber)
+
+        with self.lock:
+            if self.file is None:
+                return
+
+            self.file.write(RECORDING_EVENT.pack(timeFunction() - self.startTime, len(keyNumber)))
+            self.file.write(struct.pack("<%iI" % len(keyNumber), *keyNumber))
+            self.eventCount += 1
+
+    def close(self):
+
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+def loadRecording(filePath: str) -> Tuple[int, List[Tuple[float, Tuple[int]]]]:
+    '''
+    Read a recording written by an EventRecorder. Returns the seed (None if there isn't one) and a list of (time, keyNumber) for each event.
+    '''
+
+    with open(filePath, "rb") as f:
+        data = f.read()
+
+    if data[:len(RECORDING_MAGIC)] != RECORDING_MAGIC:
+        raise Exception(filePath + " is not an event recording")
+
+    offset = len(RECORDING_MAGIC)
+    hasSeed, seed = RECORDING_HEADER.unpack_from(data, offset)
+    offset += RECORDING_HEADER.size
+
+    events = []
+    while offset + RECORDING_EVENT.size <= len(data):
+        eventTime, count = RECORDING_EVENT.unpack_from(data, offset)
+        offset += RECORDING_EVENT.size
+
+        # A recording which was cut off part way through an event just ends early
+        if offset + 4 * count > len(data):
+            break
+
+        events.append((eventTime, struct.unpack_from("<%iI" % count, data, offset)))
+        offset += 4 * count
+
+    return (seed if hasSeed else None), events
+
+class ReplayEventGetter:
+    '''
+    Stands in for the EventGetter, giving the game the events from a recording instead of the keyboard. No terminal is needed.
+    Once the recording runs out, an EXIT event is given so the game quits. Pass it to the Game as its eventGetter.
+
+    Parameters
+    ----------
+    filePath: Recording written by an EventRecorder
+
+    realTime: Whether to wait until each event's recorded time, or give the events as fast as possible
+    '''
+
+    def __init__(self, filePath: str, realTime: bool = True):
+
+        self.seed, self.events = loadRecording(filePath)
+        self.realTime: bool = realTime
+
+        # Index of the next event to give
+        self.eventIndex: int = 0
+        self.startTime: float = None
+
+    def getEvent(self) -> Event:
+
+        if self.startTime is None:
+            self.startTime = timeFunction()
+
+        if self.eventIndex >= len(self.events):
+            return createEvent(REPLAY_EXIT_SEQUENCE)
+
+        eventTime, keyNumber = self.events[self.eventIndex]
+        self.eventIndex += 1
+
+        if self.realTime:
+            timeLeft = eventTime - (timeFunction() - self.startTime)
+            if timeLeft > 0:
+                sleepFunction(timeLeft)
+
+        return createEvent(keyNumber)
+
+    def getEventsUntil(self, now: float) -> List[Event]:
+        '''
+        Get every event recorded before now without waiting. Used by Game.simulate.
+        '''
+
+        if self.startTime is None:
+            self.startTime = now
+
+        events = []
+        while self.eventIndex < len(self.events) and self.startTime + self.events[self.eventIndex][0] <= now:
+            events.append(createEvent(self.events[self.eventIndex][1]))
+            self.eventIndex += 1
+
+        return events
+
+    def isFinished(self) -> bool:
+        return self.eventIndex >= len(self.events)
+
+    def close(self):
+        '''
+        Nothing needs to be closed for a replay.
+        '''
+
+class NullEventGetter:
+    '''
+    Stands in for the EventGetter when there is no keyboard, such as when the game runs on a VirtualClock or writes to a VirtualTerminal.
+    Games use one by default in those cases. Events can still be given to the game with pushEvent.
+    '''
+
+    def __init__(self):
+
+        # Events waiting to be given to the game
+        self.pendingEvents: List[Event] = []
+        self.lock: Lock = Lock()
+
+        self.isClosed: bool = False
+
+    def pushEvent(self, event: Event):
+        '''
+        Queue an event, as if it was typed.
+        '''
+
+        with self.lock:
+            self.pendingEvents.append(event)
+
+    def getEvent(self) -> Event:
+        '''
+        Wait for a pushed event. Once closed, an EXIT event is given so the game loop ends.
+        '''
+
+        while True:
+            with self.lock:
+                if len(self.pendingEvents) > 0:
+                    return self.pendingEvents.pop(0)
+
+            if self.isClosed:
+                return createEvent(REPLAY_EXIT_SEQUENCE)
+
+            # Real time, since a virtual clock might never be advanced
+            time.sleep(0.01)
+
+    def getEventsUntil(self, now: float) -> List[Event]: #pylint: disable=unused-argument
+        '''
+        Get every pushed event without waiting. Used by Game.simulate.
+        '''
+
+        with self.lock:
+            events = self.pendingEvents
+            self.pendingEvents = []
+
+        return events
+
+    def close(self):
+        self.isClosed = True
\ No newline at end of file
@@ -0,0 +1,240 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from collections import OrderedDict
+
+from dataclasses import is_dataclass
+
+from threading import Lock
+
+from typing import Any, Dict, List, Tuple
+
+import numpy
+
+from .canvas import Canvas
+from .spatialIndex import SpatialGrid
+
+# The Game attributes a screen function can set which belong to that screen
+FOCUS_ATTRIBUTES: Tuple[str, ...] = ("activeGameObject", "helpObject", "helpActive")
+
+def getObjectMemory(value: Any, visited: set) -> int:
+    '''
+    Estimate the bytes used by the canvases and arrays a gameObject holds, including the gameObjects it holds.
+    Anything else is small enough to be ignored.
+    '''
+
+    if id(value) in visited:
+        return 0
+    visited.add(id(value))
+
+    if isinstance(value, numpy.ndarray):
+        return value.nbytes
+
+    if isinstance(value, Canvas):
+        return sum(getObjectMemory(array, visited) for array in (value.characters, value.textColors, value.backgroundColors, value.transparency))
+
+    if isinstance(value, (list, tuple, set)):
+        return sum(getObjectMemory(item, visited) for item in value)
+
+    if isinstance(value, dict):
+        return sum(getObjectMemory(item, visited) for item in value.values())
+
+    # Only gameObjects and dataclasses holding them are followed. The game and the gameState are shared, so they aren't part of a screen
+    from .game import GameObject
+    if isinstance(value, GameObject) or (is_dataclass(value) and not isinstance(value, type)):
+        return sum(getObjectMemory(item, visited) for key, item in value.__dict__.items() if key != "game")
+
+    return 0
+
+def getNestedGameObjects(value: Any, visited: set) -> List[Any]:
+    '''
+    Every gameObject held by a value, including the gameObjects those hold, such as the TextLines of a TextBox.
+    '''
+
+    from .game import GameObject
+
+    if id(value) in visited:
+        return []
+    visited.add(id(value))
+
+    if isinstance(value, (list, tuple, set)):
+        return [gameObject for item in value for gameObject in getNestedGameObjects(item, visited)]
+
+    if isinstance(value, dict):
+        return [gameObject for item in value.values() for gameObject in getNestedGameObjects(item, visited)]
+
+    if isinstance(value, GameObject):
+        return [value] + [gameObject for key, item in value.__dict__.items() if key != "game" for gameObject in getNestedGameObjects(item, visited)]
+
+    # Such as the TextLineData holding the TextLines of a TextBox
+    if is_dataclass(value) and not isinstance(value, type):
+        return [gameObject for item in value.__dict__.values() for gameObject in getNestedGameObjects(item, visited)]
+
+    return []
+
+class ScreenSnapshot:
+    '''
+    Every gameObject on a screen, so the screen can be swapped back in without being built again.
+    These are the same maps the Game uses, not copies.
+
+    Parameters
+    ----------
+    focus: The FOCUS_ATTRIBUTES the screen's function set, and their values when the screen was left. These are put back when it is restored
+    '''
+
+    def __init__(self, gameObjectIDToLayerMap: Dict[int, int], gameObjectsIDMap: Dict[int, Any], layerToGameObjectIDMap: Dict[int, set], spatialIndex: SpatialGrid, focus: Dict[str, Any] = None):
+
+        self.gameObjectIDToLayerMap: Dict[int, int] = gameObjectIDToLayerMap
+        self.gameObjectsIDMap: Dict[int, Any] = gameObjectsIDMap
+        self.layerToGameObjectIDMap: Dict[int, set] = layerToGameObjectIDMap
+        self.spatialIndex: SpatialGrid = spatialIndex
+        self.focus: Dict[str, Any] = {} if focus is None else focus
+
+        # Estimated bytes the screen's gameObjects use. Only worked out once the screen is cached
+        self.memory: int = None
+
+    def getMemory(self) -> int:
+
+        if self.memory is None:
+            visited = set()
+            self.memory = sum(getObjectMemory(gameObject, visited) for gameObject in self.gameObjectsIDMap.values())
+
+        return self.memory
+
+    def getGameObjects(self) -> List[Any]:
+        '''
+        The gameObjects the screen holds directly, which are the ones it owns along with their nested gameObjects.
+        '''
+
+        return list(self.gameObjectsIDMap.values()) + list(self.focus.values())
+
+    def releaseCanvases(self, keptIDs: set):
+        '''
+        Give the canvases of every gameObject on the screen back to the CANVAS_POOL, once the screen is no longer needed.
+
+        Parameters
+        ----------
+        keptIDs: ids of gameObjects still used elsewhere, such as by the current screen, whose canvases are kept
+        '''
+
+        for gameObject in getNestedGameObjects(self.getGameObjects(), set()):
+            if id(gameObject) not in keptIDs:
+                gameObject.releaseCanvases()
+
+class ScreenCache:
+    '''
+    Least recently used cache of built screens. Once the screens use more memory than the budget, the least recently used ones are dropped,
+        and will be built again the next time they are gone to.
+    Dropped screens are queued rather than releasing their canvases straight away, since the draw thread may still be drawing them.
+        The Game gives their canvases back to the CANVAS_POOL at the start of the next frame.
+
+    Parameters
+    ----------
+    memoryBudget: Bytes the cached screens can use in total
+    '''
+
+    def __init__(self, memoryBudget: int = 32 * 1024 * 1024):
+
+        self.memoryBudget: int = memoryBudget
+
+        # Snapshots keyed by screen name, from least to most recently used
+        self.snapshots: OrderedDict = OrderedDict()
+        self.memory: int = 0
+
+        # Screens no longer needed, waiting for their canvases to be released
+        self.releasedSnapshots: List[ScreenSnapshot] = []
+
+        self.lock: Lock = Lock()
+
+    def __contains__(self, screenName: str):
+        return screenName in self.snapshots
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def store(self, screenName: str, snapshot: ScreenSnapshot) -> List[str]:
+        '''
+        Cache a screen. Returns the names of any screens dropped to stay within the budget.
+        '''
+
+        with self.lock:
+            self._discard(screenName)
+
+            self.snapshots[screenName] = snapshot
+            self.memory += snapshot.getMemory()
+
+            # Drop the least recently used screens, but always keep the newest one
+            dropped = []
+            while self.memory > self.memoryBudget and len(self.snapshots) > 1:
+                name, oldest = self.snapshots.popitem(last = False)
+                self.memory -= oldest.memory
+                self.releasedSnapshots.append(oldest)
+                dropped.append(name)
+
+            return dropped
+
+    def take(self, screenName: str) -> ScreenSnapshot:
+        '''
+        Remove a screen from the cache to make it the active one. Returns None if it isn't cached.
+        '''
+
+        with self.lock:
+            return self._discard(screenName)
+
+    def discard(self, screenName: str):
+
+        with self.lock:
+            snapshot = self._discard(screenName)
+            if snapshot is not None:
+                self.releasedSnapshots.append(snapshot)
+
+    def _discard(self, screenName: str) -> ScreenSnapshot:
+
+        snapshot = self.snapshots.pop(screenName, None)
+        if snapshot is not None:
+            self.memory -= snapshot.memory
+
+        return snapshot
+
+    def clear(self):
+
+        with self.lock:
+            self.releasedSnapshots.extend(self.snapshots.values())
+            self.snapshots.clear()
+            self.memory = 0
+
+    def setMemoryBudget(self, memoryBudget: int):
+        '''
+        Change the budget, dropping screens if they no longer fit.
+        '''
+
+        with self.lock:
+            self.memoryBudget = memoryBudget
+
+            while self.memory > self.memoryBudget and len(self.snapshots) > 0:
+                _, oldest = self.snapshots.popitem(last = False)
+                self.memory -= oldest.memory
+                self.releasedSnapshots.append(oldest)
+
+    def release(self, snapshot: ScreenSnapshot):
+        '''
+        Queue a screen which isn't cached to have its canvases released.
+        '''
+
+        with self.lock:
+            self.releasedSnapshots.append(snapshot)
+
+    def hasReleased(self) -> bool:
+        return len(self.releasedSnapshots) > 0
+
+    def takeReleased(self) -> Tuple[List[ScreenSnapshot], List[Any]]:
+        '''
+        Take the queued screens, along with the gameObjects of the screens still cached, whose canvases must be kept.
+        '''
+
+        with self.lock:
+            released = self.releasedSnapshots
+            self.releasedSnapshots = []
+
+            cachedGameObjects = [gameObject for snapshot in self.snapshots.values() for gameObject in snapshot.getGameObjects()]
+
+            return released, cachedGameObjects
\ No newline at end of file
@@ -0,0 +1,139 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from threading import Lock
+
+from typing import Dict, Set, Tuple
+
+from .box import Box
+
+class SpatialGrid:
+    '''
+    Uniform grid spatial index of boxes. Each box is stored in every grid cell it overlaps,
+        so region and point queries only need to look at the cells they touch.
+
+    Parameters
+    ----------
+    cellSize: The width and height of each grid cell in characters.
+    '''
+
+    def __init__(self, cellSize: int = 8):
+
+        self.cellSize: int = cellSize
+
+        # The IDs in each grid cell, keyed by (cellX, cellY)
+        self.cells: Dict[Tuple[int, int], Set[int]] = {}
+
+        # The (x, y, w, h) of each ID
+        self.boxes: Dict[int, Tuple[int, int, int, int]] = {}
+
+        # The index is changed from the event thread and queried from the draw thread
+        self.lock: Lock = Lock()
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __contains__(self, ID: int):
+        return ID in self.boxes
+
+    def getCells(self, x: int, y: int, w: int, h: int):
+        '''
+        Generator for every cell a box overlaps. Empty boxes still belong to the cell they are in.
+        '''
+
+        startX, startY = x // self.cellSize, y // self.cellSize
+        endX = (x + max(w, 1) - 1) // self.cellSize
+        endY = (y + max(h, 1) - 1) // self.cellSize
+
+        for cellX in range(startX, endX + 1):
+            for cellY in range(startY, endY + 1):
+                yield (cellX, cellY)
+
+    def insert(self, ID: int, box: Box):
+        '''
+        Add a box to the index. If the ID is already in the index, its box is replaced.
+        '''
+
+        with self.lock:
+            self._remove(ID)
+
+            self.boxes[ID] = (box.x, box.y, box.w, box.h)
+            for cell in self.getCells(box.x, box.y, box.w, box.h):
+                if cell not in self.cells:
+                    self.cells[cell] = set()
+                self.cells[cell].add(ID)
+
+    def update(self, ID: int, box: Box):
+        '''
+        Move a box which is already in the index. Nothing is done if the box hasn't changed.
+        '''
+
+        if self.boxes.get(ID) == (box.x, box.y, box.w, box.h):
+            return
+
+        self.insert(ID, box)
+
+    def remove(self, ID: int):
+        '''
+        Remove a box from the index.
+        '''
+
+        with self.lock:
+            self._remove(ID)
+
+    def _remove(self, ID: int):
+
+        if ID not in self.boxes:
+            return
+
+        for cell in self.getCells(*self.boxes[ID]):
+            self.cells[cell].discard(ID)
+            if len(self.cells[cell]) == 0:
+                del self.cells[cell]
+
+        del self.boxes[ID]
+
+    def clear(self):
+
+        with self.lock:
+            self.cells = {}
+            self.boxes = {}
+
+    def queryRegion(self, box: Box) -> Set[int]:
+        '''
+        Get the ID of every box which overlaps the region.
+        '''
+
+        IDs = set()
+
+        with self.lock:
+
+            # Gather the candidates from the cells the region touches
+            candidates = set()
+            for cell in self.getCells(box.x, box.y, box.w, box.h):
+                if cell in self.cells:
+                    candidates.update(self.cells[cell])
+
+            # Then make sure each candidate actually overlaps the region
+            for ID in candidates:
+                x, y, w, h = self.boxes[ID]
+                if x < box.x + box.w and box.x < x + w and y < box.y + box.h and box.y < y + h:
+                    IDs.add(ID)
+
+        return IDs
+
+    def queryPoint(self, x: int, y: int) -> Set[int]:
+        '''
+        Get the ID of every box which contains the point.
+        '''
+
+        IDs = set()
+
+        with self.lock:
+
+            cell = (x // self.cellSize, y // self.cellSize)
+            for ID in self.cells.get(cell, ()):
+                boxX, boxY, boxW, boxH = self.boxes[ID]
+                if boxX <= x < boxX + boxW and boxY <= y < boxY + boxH:
+                    IDs.add(ID)
+
+        return IDs
\ No newline at end of file
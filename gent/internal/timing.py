@@ -2,11 +2,100 @@
 
 import time as pythonTime
 
-import sys
+from threading import Condition
 
-timeFunction = None
+class Clock:
+    '''
+    Base class for the clock the game runs on. Everything in the game reads the time through timeFunction and waits through sleepFunction,
+        so swapping the clock with setClock changes how time passes for the whole game.
+    '''
 
-if sys.platform == "win32":
-    timeFunction = pythonTime.clock
-else:
-    timeFunction = pythonTime.time
+    def time(self) -> float:
+        '''
+        The current time in seconds.
+        '''
+
+        # Virtual function to be overwritten by children
+        return 0.0
+
+    def sleep(self, seconds: float):
+        '''
+        Wait for seconds to pass on this clock.
+        '''
+
+        # Virtual function to be overwritten by children
+
+class MonotonicClock(Clock):
+    '''
+    Real time clock which never goes backwards, even if the system time changes. This is the default clock.
+    '''
+
+    def time(self) -> float:
+        return pythonTime.perf_counter()
+
+    def sleep(self, seconds: float):
+        pythonTime.sleep(seconds)
+
+class VirtualClock(Clock):
+    '''
+    Clock which only moves when it is told to with advance. Used to run games without a terminal as fast as possible, such as with Game.simulate.
+
+    Sleeping on a virtual clock waits until other code has advanced the clock far enough.
+
+    Parameters
+    ----------
+    startTime: The time the clock starts at
+    '''
+
+    def __init__(self, startTime: float = 0.0):
+
+        self.now: float = startTime
+
+        # Sleeping threads wait on this until the clock has been advanced far enough
+        self.condition: Condition = Condition()
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+
+        with self.condition:
+            endTime = self.now + seconds
+            self.condition.wait_for(lambda: self.now >= endTime)
+
+    def advance(self, seconds: float):
+        '''
+        Move the clock forward.
+        '''
+
+        with self.condition:
+            self.now += seconds
+            self.condition.notify_all()
+
+# The clock the game is currently running on
+CLOCK: Clock = MonotonicClock()
+
+def setClock(clock: Clock):
+    '''
+    Change the clock the game runs on. Should be done before the GameState is created.
+    '''
+
+    global CLOCK #pylint: disable=global-statement
+    CLOCK = clock
+
+def getClock() -> Clock:
+    return CLOCK
+
+def timeFunction() -> float:
+    '''
+    The current time in seconds on the game's clock.
+    '''
+
+    return CLOCK.time()
+
+def sleepFunction(seconds: float):
+    '''
+    Wait for seconds to pass on the game's clock.
+    '''
+
+    CLOCK.sleep(seconds)
@@ -0,0 +1,306 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from typing import List, Tuple
+
+import re
+
+import numpy
+
+from .canvas import Canvas
+
+# Control sequences: ESC [ parameters command
+CONTROL_SEQUENCE = re.compile(r"\x1b\[([0-9;?]*)([A-Za-z])")
+
+# The start of a control sequence which was cut off at the end of a write
+INCOMPLETE_CONTROL_SEQUENCE = re.compile(r"\x1b(\[[0-9;?]*)?$")
+
+class VirtualTerminal:
+    '''
+    Minimal terminal emulator which turns the game's output back into a grid of characters and colors, without a real terminal.
+    Pass it to a Game as its outputStream to check that what was printed matches the canvas, and to measure how many bytes each frame takes.
+
+    Understands cursor positioning, cursor movement, clearing, 24 bit SGR colors, and line wrapping. Anything else is ignored.
+
+    Parameters
+    ----------
+    width, height: Size of the terminal in characters
+
+    defaultTextColor, defaultBackgroundColor: The colors used when the colors are reset
+    '''
+
+    def __init__(self, width: int, height: int, defaultTextColor: Tuple[int, int, int] = (255, 255, 255), defaultBackgroundColor: Tuple[int, int, int] = (0, 0, 0)):
+
+        self.width: int = width
+        self.height: int = height
+        self.defaultTextColor: Tuple[int, int, int] = defaultTextColor
+        self.defaultBackgroundColor: Tuple[int, int, int] = defaultBackgroundColor
+
+        # The cells, laid out the same way as a canvas
+        self.characters: numpy.ndarray = numpy.full((width, height), ord(" "), dtype = numpy.uint32)
+        self.textColors: numpy.ndarray = numpy.zeros((width, height, 3), dtype = numpy.uint8)
+        self.backgroundColors: numpy.ndarray = numpy.zeros((width, height, 3), dtype = numpy.uint8)
+        self.textColors[:,:] = defaultTextColor
+        self.backgroundColors[:,:] = defaultBackgroundColor
+
+        # Cursor position and the colors text is written in
+        self.x: int = 0
+        self.y: int = 0
+        self.textColor: Tuple[int, int, int] = defaultTextColor
+        self.backgroundColor: Tuple[int, int, int] = defaultBackgroundColor
+
+        # After writing in the last column, the cursor stays there until the next character, which goes on the next line
+        self.pendingWrap: bool = False
+
+        # The end of a write which was cut off part way through a control sequence
+        self.leftover: str = ""
+
+        # Byte counts. A frame ends each time flush is called
+        self.bytesWritten: int = 0
+        self.currentFrameBytes: int = 0
+        self.frameBytes: List[int] = []
+
+    #####################
+    # FILE LIKE METHODS #
+    #####################
+    def write(self, data: str) -> int:
+        '''
+        Parse output written to the terminal.
+        '''
+
+        length = len(data)
+        byteCount = len(data.encode("utf-8"))
+        self.bytesWritten += byteCount
+        self.currentFrameBytes += byteCount
+
+        data = self.leftover + data
+        self.leftover = ""
+
+        # Hold on to a cut off control sequence until the rest of it is written
+        incomplete = INCOMPLETE_CONTROL_SEQUENCE.search(data)
+        if incomplete is not None:
+            self.leftover = data[incomplete.start():]
+            data = data[:incomplete.start()]
+
+        position = 0
+        for match in CONTROL_SEQUENCE.finditer(data):
+            self.writeText(data[position:match.start()])
+            self.handleControlSequence(match.group(1), match.group(2))
+            position = match.end()
+        self.writeText(data[position:])
+
+        return length
+
+    def flush(self):
+        '''
+        Marks the end of a frame for the byte counts.
+        '''
+
+        if self.currentFrameBytes > 0:
+            self.frameBytes.append(self.currentFrameBytes)
+            self.currentFrameBytes = 0
+
+    def isatty(self) -> bool:
+        return False
+
+    ###########
+    # PARSING #
+    ###########
+    def writeText(self, text: str):
+        '''
+        Write plain text at the cursor, a row at a time.
+        '''
+
+        index = 0
+        while index < len(text):
+
+            character = text[index]
+
+            # Carriage returns and new lines are handled one at a time. Output isn't raw, so a new line also returns the cursor
+            if character == "\r":
+                self.x = 0
+                self.pendingWrap = False
+                index += 1
+                continue
+
+            if character == "\n":
+                self.x = 0
+                self.pendingWrap = False
+                self.lineFeed()
+                index += 1
+                continue
+
+            if character == "\x1b":
+                index += 1
+                continue
+
+            if self.pendingWrap:
+                self.x = 0
+                self.pendingWrap = False
+                self.lineFeed()
+
+            # Find the run of printable characters which fit on this row
+            end = index
+            rowEnd = index + self.width - self.x
+            while end < len(text) and end < rowEnd and text[end] not in "\r\n\x1b":
+                end += 1
+
+            count = end - index
+            self.characters[self.x:self.x + count, self.y] = [ord(c) for c in text[index:end]]
+            self.textColors[self.x:self.x + count, self.y] = self.textColor
+            self.backgroundColors[self.x:self.x + count, self.y] = self.backgroundColor
+
+            self.x += count
+            if self.x >= self.width:
+                self.x = self.width - 1
+                self.pendingWrap = True
+
+            index = end
+
+    def lineFeed(self):
+        '''
+        Move the cursor down a line, scrolling everything up if it is on the last line.
+        '''
+
+        if self.y < self.height - 1:
+            self.y += 1
+            return
+
+        self.characters[:,:-1] = self.characters[:,1:]
+        self.textColors[:,:-1] = self.textColors[:,1:]
+        self.backgroundColors[:,:-1] = self.backgroundColors[:,1:]
+        self.clearRegion(0, self.height - 1, self.width, self.height)
+
+    def clearRegion(self, startX: int, startY: int, endX: int, endY: int):
+
+        self.characters[startX:endX, startY:endY] = ord(" ")
+        self.textColors[startX:endX, startY:endY] = self.textColor
+        self.backgroundColors[startX:endX, startY:endY] = self.backgroundColor
+
+    def handleControlSequence(self, parameterText: str, command: str):
+
+        # Private modes (such as mouse reporting) don't change the cells
+        if parameterText.startswith("?"):
+            return
+
+        parameters = [int(p) if p != "" else 0 for p in parameterText.split(";")] if parameterText != "" else []
+
+        def getParameter(index: int, default: int) -> int:
+            if index < len(parameters) and parameters[index] != 0:
+                return parameters[index]
+            return default
+
+        if command in "HABCDJK":
+            self.pendingWrap = False
+
+        # Cursor positioning is 1 based
+        if command in ("H", "f"):
+            self.y = min(getParameter(0, 1), self.height) - 1
+            self.x = min(getParameter(1, 1), self.width) - 1
+
+        elif command == "A":
+            self.y = max(self.y - getParameter(0, 1), 0)
+        elif command == "B":
+            self.y = min(self.y + getParameter(0, 1), self.height - 1)
+        elif command == "C":
+            self.x = min(self.x + getParameter(0, 1), self.width - 1)
+        elif command == "D":
+            self.x = max(self.x - getParameter(0, 1), 0)
+
+        # Clearing the screen and lines
+        elif command == "J":
+            mode = parameters[0] if parameters else 0
+            if mode == 0:
+                self.clearRegion(self.x, self.y, self.width, self.y + 1)
+                self.clearRegion(0, self.y + 1, self.width, self.height)
+            elif mode == 1:
+                self.clearRegion(0, 0, self.width, self.y)
+                self.clearRegion(0, self.y, self.x + 1, self.y + 1)
+            else:
+                self.clearRegion(0, 0, self.width, self.height)
+
+        elif command == "K":
+            mode = parameters[0] if parameters else 0
+            if mode == 0:
+                self.clearRegion(self.x, self.y, self.width, self.y + 1)
+            elif mode == 1:
+                self.clearRegion(0, self.y, self.x + 1, self.y + 1)
+            else:
+                self.clearRegion(0, self.y, self.width, self.y + 1)
+
+        elif command == "m":
+            self.handleSGR(parameters)
+
+    def handleSGR(self, parameters: List[int]):
+        '''
+        Select graphic rendition. Only the color parameters gent uses are understood.
+        '''
+
+        if len(parameters) == 0:
+            parameters = [0]
+
+        i = 0
+        while i < len(parameters):
+            parameter = parameters[i]
+
+            if parameter == 0:
+                self.textColor = self.defaultTextColor
+                self.backgroundColor = self.defaultBackgroundColor
+            elif parameter == 39:
+                self.textColor = self.defaultTextColor
+            elif parameter == 49:
+                self.backgroundColor = self.defaultBackgroundColor
+
+            # 24 bit colors are 38;2;r;g;b and 48;2;r;g;b
+            elif parameter in (38, 48) and i + 4 < len(parameters) and parameters[i + 1] == 2:
+                color = tuple(parameters[i + 2:i + 5])
+                if parameter == 38:
+                    self.textColor = color
+                else:
+                    self.backgroundColor = color
+                i += 4
+
+            i += 1
+
+    ############
+    # CHECKING #
+    ############
+    def compare(self, canvas: Canvas, location: Tuple[int, int] = (0, 0)) -> numpy.ndarray:
+        '''
+        Find the cells which don't match a canvas. Returns an array of the (x, y) of each cell which is different,
+            which is empty if the terminal shows exactly what is on the canvas.
+
+        Parameters
+        ----------
+        location: Where the top left of the canvas is on the terminal
+        '''
+
+        x, y = location
+        w, h = canvas.width, canvas.height
+
+        different = (
+            (self.characters[x:x + w, y:y + h] != canvas.characters) |
+            numpy.any(self.textColors[x:x + w, y:y + h] != canvas.textColors, axis = 2) |
+            numpy.any(self.backgroundColors[x:x + w, y:y + h] != canvas.backgroundColors, axis = 2)
+        )
+
+        return numpy.argwhere(different) + numpy.array([x, y])
+
+    def matches(self, canvas: Canvas, location: Tuple[int, int] = (0, 0)) -> bool:
+        return len(self.compare(canvas, location)) == 0
+
+    def getAverageFrameBytes(self) -> float:
+        '''
+        Average bytes written for each frame.
+        '''
+
+        if len(self.frameBytes) == 0:
+            return 0.0
+
+        return sum(self.frameBytes) / len(self.frameBytes)
+
+    def getText(self) -> str:
+        '''
+        The characters on the terminal, one line per row.
+        '''
+
+        return "\n".join("".join(chr(c) for c in self.characters[:, j]) for j in range(self.height))
\ No newline at end of file
@@ -1,3 +1,3 @@
-# # Copyright Clayton Brown 2019. See LICENSE file.
+# Copyright Clayton Brown 2019. See LICENSE file.
 
-# from .sampling import ProbabilityDistribution
\ No newline at end of file
+from .sampling import ProbabilityDistribution
\ No newline at end of file
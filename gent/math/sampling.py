@@ -1,116 +1,145 @@
-# # Copyright Clayton Brown 2019. See LICENSE file.
+# Copyright Clayton Brown 2019. See LICENSE file.
 
-# import numpy
+import numpy
 
-# from types import FunctionType
-# from csaps import UnivariateCubicSmoothingSpline
+from types import FunctionType
 
-# class ProbabilityDistribution:
-#     '''
-#     Function to handle probability distributions.
+class ProbabilityDistribution:
+    '''
+    Function to handle probability distributions.
 
-#     Parameters
-#     ----------
+    Parameters
+    ----------
 
-#     distributionFunction:
-#         FunctionType which takes in a single float value and returns a second float value.
-#         Describes a distribution function on the interval (0-1).
-#         Function is not required to have an area of 1 in the interval (0-1), that interval is autmatically generated for you.
-#         Function must not be negative in the range (0-1). (Negative probability doesn't make much sense anyway)
-#     '''
+    distributionFunction:
+        FunctionType which takes in a single float value and returns a second float value.
+        Describes a distribution function on the interval (0-1).
+        Function is not required to have an area of 1 in the interval (0-1), that interval is autmatically generated for you.
+        Function must not be negative in the range (0-1). (Negative probability doesn't make much sense anyway)
+        If the function also works on numpy arrays, it is called once on every point at the same time, which is much faster.
 
-#     def __init__(self, distributionFunction: FunctionType):
+    N:
+        Number of points used to approximate the distribution. See setDistributionFunction.
 
-#         # Object Variables #
-#         # Function describing how the distribution should look.
-#         self.distributionFunction: FunctionType = None
+    seed:
+        Seed or numpy Generator for the random numbers. Distributions with the same seed generate the same numbers.
+    '''
 
-#         # The total area of the distribution function between 0 and 1
-#         self.areaModulation: float = None
+    def __init__(self, distributionFunction: FunctionType, N: int = int(1e5), seed = None):
 
-#         # The approximated integral for the distribution function between 0 and 1
-#         # This spline is also inverted. This means self.integralSpline(p), where p is between 0 and 1,
-#         #   returns the x value where p percent of the area under the curve of self.distributionFunction in the range (0-1) is to the left.
-#         self.integralSpline: UnivariateCubicSmoothingSpline = None
+        # Object Variables #
+        # Function describing how the distribution should look.
+        self.distributionFunction: FunctionType = None
 
-#         # Set the apropriate distribution function
-#         self.setDistributionFunction(distributionFunction)
+        # The total area of the distribution function between 0 and 1
+        self.areaModulation: float = None
 
-#     def setDistributionFunction(self, distributionFunction: FunctionType, N: int = int(1e5)):
-#         '''
-#         Assigns the appropriate distribution function and calculates the integralSpline necessary to match that distribution function.
+        # The approximated integral for the distribution function between 0 and 1, sampled at each xData value.
+        # Inverting this with numpy.interp(p * self.areaModulation, self.totalAreas, self.xData), where p is between 0 and 1,
+        #   gives the x value where p percent of the area under the curve of self.distributionFunction in the range (0-1) is to the left.
+        self.xData: numpy.ndarray = None
+        self.totalAreas: numpy.ndarray = None
 
-#         Parameters
-#         ----------
-#         distributionFunction:
-#             Districution function to create integral spline for.
+        # Random number generator used for the samples
+        self.generator: numpy.random.Generator = numpy.random.default_rng(seed)
 
-#         N:
-#             Number of points to use to create the spline approximation.
-#             Larger N (N > 1e5) will slow down initial generation, but be more accurate.
-#             Smaller N (N < 1e3) will speed up geenration significantly, but for complex functions will los accuracy.
-#         '''
+        # Set the apropriate distribution function
+        self.setDistributionFunction(distributionFunction, N)
 
-#         self.distributionFunction = distributionFunction
+    def setDistributionFunction(self, distributionFunction: FunctionType, N: int = int(1e5)):
+        '''
+        Assigns the appropriate distribution function and calculates the integral necessary to match that distribution function.
 
-#         # Create the xData. This is just a linspace between 0 and 1.
-#         # xData2 is a version of this which is offset by one index to allow for the builtin map function to work for area generation
-#         xData1 = numpy.linspace(0.0, 1.0, num = N + 1)
-#         xData2 = numpy.roll(xData1, -1)
+        Parameters
+        ----------
+        distributionFunction:
+            Districution function to create the integral for.
 
-#         # Create the yData. This maps the xData values at each point to self.distributionFunction(x).
-#         # Also create the yData2 variable which is equivalent to the xData2, but for yValues
-#         yData1 = numpy.array(list(map(self.distributionFunction, xData1)))
-#         yData2 = numpy.roll(yData1, -1)
+        N:
+            Number of points to use to create the approximation.
+            Larger N (N > 1e5) will slow down initial generation, but be more accurate.
+            Smaller N (N < 1e3) will speed up geenration significantly, but for complex functions will los accuracy.
+        '''
 
-#         # Simple area function to use with map. Use midpoint approach.
-#         def areaFunction(x1, x2, y1, y2):
-#             return (x2 - x1) * (y1 + y2) / 2
+        self.distributionFunction = distributionFunction
 
-#         # Get a numpy array of the areas of each trapezoid
-#         areas = numpy.array(list(map(areaFunction, xData1[:-1], xData2[:-1], yData1[:-1], yData2[:-1])))
+        # Create the xData. This is just a linspace between 0 and 1.
+        self.xData = numpy.linspace(0.0, 1.0, num = N + 1)
 
-#         # areaModulation describes the total area underneath the probability distribution in the range (0-1)
-#         self.areaModulation = numpy.sum(areas)
+        # Create the yData. This maps the xData values at each point to self.distributionFunction(x).
+        yData = self.evaluate(self.xData)
 
-#         # Calculate the total area (the integral) at each xValue
-#         totalAreas = numpy.zeros((N + 1,))
-#         for i in range(totalAreas.shape[0] - 1):
-#             totalAreas[i + 1] = totalAreas[i] + areas[i]
+        if numpy.any(yData < 0):
+            raise Exception("Distribution functions must not be negative in the range (0-1)")
 
-#         # Use those areas to create the integral spline
-#         self.integralSpline = UnivariateCubicSmoothingSpline(totalAreas, xData1)
-    
-#     def __call__(self, n: int = 1):
-#         '''
-#         Generate random numbers according to the loaded distribution.
+        # Get the area of each trapezoid between neighbouring points
+        areas = numpy.diff(self.xData) * (yData[:-1] + yData[1:]) / 2
 
-#         Parameters
-#         ----------
+        # Calculate the total area (the integral) at each xValue
+        self.totalAreas = numpy.zeros((N + 1,))
+        numpy.cumsum(areas, out = self.totalAreas[1:])
 
-#         n: the number of random numbers to generate. If n == 1: will return a float instead of a numpy array
-#         '''
+        # areaModulation describes the total area underneath the probability distribution in the range (0-1)
+        self.areaModulation = self.totalAreas[-1]
 
-#         # Create the random numbers accoring the integral spline.
-#         randomNumbers = self.integralSpline(numpy.random.random((n,)) * self.areaModulation) #pylint: disable=no-member
+        if self.areaModulation <= 0:
+            raise Exception("Distribution functions must have some area in the range (0-1)")
 
-#         # Return type float if n is set to 1
-#         if n == 1:
-#             return randomNumbers[0]
-        
-#         # Otherwise just return a numpy array of random values according to the desired probability distribution.
-#         return randomNumbers
+    def evaluate(self, xData: numpy.ndarray) -> numpy.ndarray:
+        '''
+        Evaluate the distribution function at every x value. The function is called once on the whole array if it supports it,
+            otherwise it is called on each value.
+        '''
 
+        try:
+            yData = numpy.asarray(self.distributionFunction(xData), dtype = numpy.float64)
+            if yData.shape == xData.shape:
+                return yData
 
-# # Testing call
-# if __name__ == "__main__":
+            # Functions which return a constant can be spread across every value
+            if yData.ndim == 0:
+                return numpy.full(xData.shape, float(yData))
 
-#     from matplotlib import pyplot as plt
+        except (TypeError, ValueError):
+            pass
 
-#     def lightnesDistribution(x): return (.5 - abs(x - .5))**2
-#     def chromaDistribution(x): return x
+        return numpy.vectorize(self.distributionFunction, otypes = [numpy.float64])(xData)
 
-#     D = ProbabilityDistribution(chromaDistribution)
+    def __call__(self, n: int = 1, generator: numpy.random.Generator = None):
+        '''
+        Generate random numbers according to the loaded distribution.
 
-#     plt.hist(D(10000000), 250)
-#     plt.show()
+        Parameters
+        ----------
+
+        n: the number of random numbers to generate. If n == 1: will return a float instead of a numpy array
+
+        generator: Generator to use instead of the distribution's own
+        '''
+
+        if generator is None:
+            generator = self.generator
+
+        # Create the random numbers accoring to the inverted integral.
+        randomNumbers = numpy.interp(generator.random(n) * self.areaModulation, self.totalAreas, self.xData)
+
+        # Return type float if n is set to 1
+        if n == 1:
+            return float(randomNumbers[0])
+
+        # Otherwise just return a numpy array of random values according to the desired probability distribution.
+        return randomNumbers
+
+
+# Testing call
+if __name__ == "__main__":
+
+    from matplotlib import pyplot as plt
+
+    def lightnesDistribution(x): return (.5 - abs(x - .5))**2
+    def chromaDistribution(x): return x
+
+    D = ProbabilityDistribution(chromaDistribution)
+
+    plt.hist(D(10000000), 250)
+    plt.show()
@@ -5,3 +5,9 @@ from .inputBox import InputBox
 
 from .textLine import TextLine
 from .selector import Selector, BaseSelectorObject
+from .selectorSource import SelectorSource, SequenceSource, PagedSource, FilteredSource
+
+from .textView import TextView
+
+from .sprite import Sprite
+from .videoPlayer import VideoPlayer
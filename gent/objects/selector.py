@@ -1,11 +1,14 @@
 # Copyright Clayton Brown 2019. See LICENSE file.
 
-from ..internal import GameObject, Box, Selection_Fill, Event
+from ..internal import GameObject, ObjectHandler, Box, Selection_Fill, Event, EVENT_HANDLER
+from ..constants import CONNECTION_UP, CONNECTION_DOWN, CONNECTION_LEFT, CONNECTION_RIGHT, HOTKEY_FILTER
 
 from .textBox import TextBox
 from .textLine import TextLine
+from .selectorSource import SelectorSource, FilteredSource, createSource
 
-from typing import List, Tuple
+from typing import Dict, List, Tuple, Union
+from types import FunctionType
 
 class BaseSelectorObject(GameObject):
     '''
@@ -73,6 +76,29 @@ class DefaultSelectorObject(BaseSelectorObject):
     def resetSelectorObject(self):
         self.textBox.text = ""
 
+class GridObjectHandler(ObjectHandler):
+    '''
+    ObjectHandler for the Selector grid. Instead of storing a connection for every pair of selectorObjects,
+        the neighbour in each direction is worked out from the grid position.
+    '''
+
+    def getConnectedObject(self, gameObject: BaseSelectorObject, keyName: str) -> BaseSelectorObject:
+
+        x, y = gameObject.gridPosition
+
+        if keyName in CONNECTION_UP:
+            y -= 1
+        elif keyName in CONNECTION_DOWN:
+            y += 1
+        elif keyName in CONNECTION_LEFT:
+            x -= 1
+        elif keyName in CONNECTION_RIGHT:
+            x += 1
+        else:
+            return None
+
+        return self.gameObject.getFilledSelectorObject((x, y))
+
 class Selector(GameObject):
     '''
     The Selector object handles a grid of choices. There is a custom SelectorText object which is just a wrapper for the textBox object.
@@ -83,12 +109,16 @@ class Selector(GameObject):
 
     dimensions: The dimensions of each element of the Selector. Each axis must be divisible by the width of the box.
 
-    elements: List of elements the selector contains
+    elements: List of elements the selector contains. Can also be a lazy sequence or a SelectorSource, in which case only the elements on the current page are fetched.
 
     maxSelections: The maximum number of things which can be selected at any given time.
+
+    filterable: Whether or not pressing "/" lets the user type to filter the elements.
+
+    filterKey: Function which turns an element into the string the filter searches. Defaults to str.
     '''
 
-    def __init__(self, box: Box, dimensions: Tuple[int, int], elements: List[str], SelectorObject: BaseSelectorObject = DefaultSelectorObject, maxSelections: int = 1, paged: bool = False, **kwargs):
+    def __init__(self, box: Box, dimensions: Tuple[int, int], elements: Union[List, SelectorSource], SelectorObject: BaseSelectorObject = DefaultSelectorObject, maxSelections: int = 1, paged: bool = False, filterable: bool = False, filterKey: FunctionType = str, **kwargs):
         GameObject.__init__(self, box, selectionHandler = Selection_Fill(drawSelect = False, drawDefault = False), **kwargs)
 
         self.paged: bool = paged
@@ -103,11 +133,21 @@ class Selector(GameObject):
 
         # Set the attributes passed in
         self.dimensions: Tuple[int, int] = dimensions
-        self.elements: List = elements
+        self.elements: Union[List, SelectorSource] = elements
+        self.source: SelectorSource = createSource(elements)
         self.maxSelections: int = maxSelections
+        self.filterable: bool = filterable
+        self.filterKey: FunctionType = filterKey
 
-        # List of the previous selections made by the user, in order of selection
-        self.selectedGridPositions: List[Tuple[int, int]] = []
+        # The elements currently being displayed. Either the source itself, or the filtered elements of the source
+        self.displaySource: SelectorSource = self.source
+
+        # Filtering state. The source builds its search index the first time a filter is typed
+        self.filterText: str = ""
+        self.isTypingFilter: bool = False
+
+        # The previous selections made by the user, in order of selection. Stored as dictionary keys for quick lookups
+        self.selectedGridPositions: Dict[Tuple[int, int], None] = {}
 
         # Determine the number of textBoxes in each direction
         if self.paged:
@@ -118,7 +158,7 @@ class Selector(GameObject):
         # Variables concerning which page is currently being displayed
         self.page: int = 1
         self.elementsPerPage: int = self.gridDimensions[0] * self.gridDimensions[1]
-        self.maxPages: int = (len(self.elements) // self.elementsPerPage) + 1
+        self.maxPages: int = (len(self.displaySource) // self.elementsPerPage) + 1
 
         # Create all the SelectorText objects
         self.selectorGrid: List[List[SelectorObject]] = []
@@ -138,39 +178,55 @@ class Selector(GameObject):
         if self.paged:
             self.pageText: TextLine = TextLine(
                 Box(0, self.h - 1, self.w, 1),
-                "Page %i/%i" % (self.page, self.maxPages),
+                self.getPageText(),
                 (255, 255, 255),
                 (0, 0, 0),
                 justify = "R"
             )
 
         # Create the object handler and set the initial gameObject to the element in the topLeft
-        self.addObjectHandler()
+        self.objectHandler = GridObjectHandler(self)
+        for selectorObject in self.getSelectorObjects():
+            self.objectHandler.addGameObject(selectorObject)
         self.objectHandler.currentGameObject = self.selectorGrid[0][0]
 
+        # The number of selectorObjects, in row order, which contain data
+        self.filledCount: int = 0
+
         # Update the text in each selectorTextObject
         self.updateSelectorObjects(self.elements)
 
-    def updateSelectorObjects(self, elements: List = None):
+    def updateSelectorObjects(self, elements: Union[List, SelectorSource] = None):
         '''
         Given a list of elements, set all the SelectorText Objects text. Then appropriately set the connections. An element can be of any data type. The updating of SelectorObjects via elements are handled internally.
         '''
 
         # Set the elements
-        if type(elements) == list:
+        if elements is not None:
             self.elements = elements
+            self.source = createSource(elements)
+            self.displaySource = self.source
+            self.filterText = ""
             self.page = 1
-            self.maxPages = (len(self.elements) // self.elementsPerPage) + 1
+            self.maxPages = (len(self.displaySource) // self.elementsPerPage) + 1
+
+        # Only fetch the elements on the current page
+        pageStart = (self.page - 1) * self.elementsPerPage
+        pageElements = self.displaySource.getElements(pageStart, self.elementsPerPage)
+
+        # Let the source get the adjacent pages ready in case the page is flipped
+        self.displaySource.prefetch(pageStart + self.elementsPerPage, self.elementsPerPage)
+        self.displaySource.prefetch(pageStart - self.elementsPerPage, self.elementsPerPage)
 
         # Keep track of how much text has been added
-        elementIndex = (self.page - 1) * self.elementsPerPage
+        elementIndex = 0
 
         # Loop through each and every selectorTextObject
         for selectorText in self.getSelectorObjects():
             
             # As long as there are still elements to display, add the element text
-            if elementIndex < len(self.elements):
-                selectorText.updateSelectorObject(self.elements[elementIndex])
+            if elementIndex < len(pageElements):
+                selectorText.updateSelectorObject(pageElements[elementIndex])
                 selectorText.hasData = True
                 elementIndex += 1
             
@@ -198,31 +254,150 @@ class Selector(GameObject):
 
         return self.selectorGrid[position[1]][position[0]]
 
+    def getFilledSelectorObject(self, position: Tuple[int, int]) -> BaseSelectorObject:
+        '''
+        Get the Selector object at a specific location, as long as it is in the grid and contains data. Otherwise returns None.
+        '''
+
+        if position[0] < 0 or position[0] >= self.gridDimensions[0] or position[1] < 0 or position[1] >= self.gridDimensions[1]:
+            return None
+
+        # Objects are filled in row order, so only the first filledCount objects contain data
+        if position[1] * self.gridDimensions[0] + position[0] >= self.filledCount:
+            return None
+
+        return self.getSelectorObject(position)
+
     def removeSelectorTextObject(self, position: Tuple[int, int]):
-        self.getSelectorObject(self.selectedGridPositions.pop(self.selectedGridPositions.index(position))).isSelected = False
+        del self.selectedGridPositions[position]
+        self.getSelectorObject(position).isSelected = False
+
+    def _handleEvent(self, event: Event):
+        '''
+        While a filter is being typed, every event goes to the filter instead of the selector objects.
+        '''
+
+        if self.filterable and self.isTypingFilter:
+            self.handleFilterEvent(event)
+            return EVENT_HANDLER.HANDLED
+
+        if self.filterable and event.keyName in HOTKEY_FILTER and self.objectHandler.selectingObject:
+            self.isTypingFilter = True
+            if self.paged: self.pageText.text = self.getPageText()
+            return EVENT_HANDLER.HANDLED
+
+        return GameObject._handleEvent(self, event)
+
+    def isCapturingKeys(self) -> bool:
+
+        # Every key typed goes into the filter
+        if self.filterable and self.isTypingFilter:
+            return True
+
+        return GameObject.isCapturingKeys(self)
+
+    def _handleMouseEvent(self, event: Event, origin: Tuple[int, int] = (0, 0)):
+        '''
+        Clicking a selector object is the same as moving to it and pressing RETURN, so it goes through the same selection bookkeeping.
+            Clicks on selector objects without data are ignored.
+        '''
+
+        if event.keyName != "MOUSE_PRESS" or event.mouseButton != 0:
+            return GameObject._handleMouseEvent(self, event, origin)
+
+        x = event.mouseX - origin[0] - self.realX - self.xOffset
+        y = event.mouseY - origin[1] - self.realY - self.yOffset
+
+        for selectorObject in self.objectHandler.getGameObjectsAtPoint(x, y):
+            if self.getFilledSelectorObject(selectorObject.gridPosition) is not selectorObject:
+                return EVENT_HANDLER.HANDLED
+
+            # Clicking while typing a filter keeps the filter, like RETURN
+            if self.isTypingFilter:
+                self.handleFilterEvent(Event(keyName = "RETURN"))
+
+            self.objectHandler.selectObject(selectorObject)
+            self._handleEvent(Event(keyName = "RETURN"))
+            return EVENT_HANDLER.HANDLED
+
+        return GameObject._handleMouseEvent(self, event, origin)
+
+    def handleFilterEvent(self, event: Event):
+        '''
+        Typed characters narrow the filter. RETURN keeps the filter, and ESCAPE removes it.
+        '''
+
+        filterText = self.filterText
+
+        if event.keyName == "RETURN":
+            self.isTypingFilter = False
+
+        elif event.keyName == "ESCAPE":
+            self.isTypingFilter = False
+            filterText = ""
+
+        elif event.keyName == "BACKSPACE":
+            filterText = filterText[:-1]
+
+        elif event.char and len(event.char) == 1 and ord(event.char) >= 32 and event.keyName not in {"TAB", "DELETE"}:
+            filterText += event.char
+
+        self.setFilter(filterText)
+
+    def setFilter(self, filterText: str):
+        '''
+        Only display the elements which contain filterText (case insensitive). An empty filterText displays every element.
+        '''
+
+        # Nothing needs to be recalculated if the filter didn't change
+        if filterText == self.filterText:
+            if self.paged: self.pageText.text = self.getPageText()
+            return
+
+        self.filterText = filterText
+
+        if len(filterText) == 0:
+            self.displaySource = self.source
+
+        else:
+            self.displaySource = FilteredSource(self.source, self.source.search(filterText, self.filterKey))
+
+        # Start again from the first page of the filtered elements
+        self.page = 1
+        self.maxPages = (len(self.displaySource) // self.elementsPerPage) + 1
+
+        if self.paged:
+            self.updatePageText()
+        else:
+            self.clearSelections()
+            self.updateSelectorObjects()
+
+        # The current selector object may no longer have anything in it, which would leave no neighbours to move to
+        self.objectHandler.selectObject(self.selectorGrid[0][0])
 
     def onEvent(self, event: Event):
         '''
         When something happens to the selector object, make sure all the object's "isSelected" attribute gets correctly updated.
         '''
 
-        # Look through each SelectorText object in the grid
-        for selectorText in self.getSelectorObjects():
+        # Only the current selector object can be toggled by an event, so there is no need to look through the whole grid
+        selectorText = self.objectHandler.currentGameObject
+        if selectorText is not None:
 
-            # If the selector object is selected and it wasn't prevoius selected, toggle the selection and break out of the loop as only one object can be slected on each event.
+            # If the selector object is selected and it wasn't prevoius selected, add it to the previous selections
             if selectorText.isSelected and selectorText.gridPosition not in self.selectedGridPositions:
 
                 # If the maximum number of selected objects has already been reached, remove the first object selected from previousSelections
                 if len(self.selectedGridPositions) == self.maxSelections:
-                    self.getSelectorObject(self.selectedGridPositions.pop(0)).isSelected = False
+                    firstPosition = next(iter(self.selectedGridPositions))
+                    del self.selectedGridPositions[firstPosition]
+                    self.getSelectorObject(firstPosition).isSelected = False
 
-                # Add the selector object to previous selections and break the loop
-                self.selectedGridPositions.append(selectorText.gridPosition)
-                break
+                self.selectedGridPositions[selectorText.gridPosition] = None
                 
             # If the selector object is not selected and it's in previous selections, remove it from previous selections
-            if not selectorText.isSelected and selectorText.gridPosition in self.selectedGridPositions:
-                self.selectedGridPositions.remove(selectorText.gridPosition)
+            elif not selectorText.isSelected and selectorText.gridPosition in self.selectedGridPositions:
+                del self.selectedGridPositions[selectorText.gridPosition]
         
         # Handle page flipping
         if self.paged:
@@ -241,16 +416,36 @@ class Selector(GameObject):
         '''
 
         # First set the pageText
-        self.pageText.text = "Page %i/%i" % (self.page, self.maxPages)
+        self.pageText.text = self.getPageText()
 
         # Then, make sure all previous selections are cleared.
         # TODO: Make selector compatible with selections on multiple pages
-        while len(self.selectedGridPositions) > 0:
-            self.getSelectorObject(self.selectedGridPositions.pop(0)).isSelected = False
+        self.clearSelections()
 
         # Then set the text in each selectorObject to match the new page
         self.updateSelectorObjects()
 
+    def getPageText(self) -> str:
+        '''
+        Text for the pageText object. Includes the filter if there is one.
+        '''
+
+        pageText = "Page %i/%i" % (self.page, self.maxPages)
+
+        if self.isTypingFilter or len(self.filterText) > 0:
+            pageText = "/" + self.filterText + "  " + pageText
+
+        return pageText
+
+    def clearSelections(self):
+        '''
+        Unselect every selected selector object.
+        '''
+
+        for position in self.selectedGridPositions:
+            self.getSelectorObject(position).isSelected = False
+        self.selectedGridPositions.clear()
+
     def render(self):
 
         # Draw each selectorText object on the convas        
@@ -263,20 +458,9 @@ class Selector(GameObject):
     
     def setConnections(self):
         '''
-        Add the connections for each SelectionText object to the objectHandler
-        '''
-        
-        # Clear whatever the current objectHandler connections are
-        self.objectHandler.clearConnections()
-
-        # Loop through each selectorText object to determine what connections need to be added
-        for selectorObject in self.getSelectorObjects():
+        Update the connections for the SelectionText objects.
 
-            # No need to do anything if the selectorObject contains no text
-            if not selectorObject.hasData: continue
+        The GridObjectHandler works out connections from grid positions, so only the number of objects which contain data needs to be recorded.
+        '''
 
-            # As long as the object isn't against the left or top of the grid, add the appropriate connections
-            if selectorObject.gridPosition[0] > 0:
-                self.objectHandler.addConnection(self.selectorGrid[selectorObject.gridPosition[1]][selectorObject.gridPosition[0] - 1], selectorObject, "R")
-            if selectorObject.gridPosition[1] > 0:
-                self.objectHandler.addConnection(self.selectorGrid[selectorObject.gridPosition[1] - 1][selectorObject.gridPosition[0]], selectorObject, "D")
\ No newline at end of file
+        self.filledCount = sum(1 for selectorObject in self.getSelectorObjects() if selectorObject.hasData)
\ No newline at end of file
@@ -0,0 +1,300 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from collections import OrderedDict
+
+from threading import Thread, Lock, Event
+
+from types import FunctionType
+
+from typing import Dict, List, Sequence, Tuple
+
+from ..utilities import SearchIndex
+
+def getRuns(indices: List[int]) -> List[Tuple[int, int]]:
+    '''
+    Split indices into runs of consecutive indices, as (start, count) pairs.
+    '''
+
+    runs = []
+    for index in indices:
+        if len(runs) > 0 and runs[-1][0] + runs[-1][1] == index:
+            runs[-1][1] += 1
+        else:
+            runs.append([index, 1])
+
+    return [(start, count) for start, count in runs]
+
+class SelectorSource:
+    '''
+    Base class for where a Selector gets its elements from. The Selector only ever asks for the elements on the page it is displaying.
+    '''
+
+    # The number of elements read at a time when the search index is built
+    SEARCH_CHUNK_SIZE: int = 256
+
+    # Built the first time the source is searched, along with the filterKey it was built with
+    searchIndex: SearchIndex = None
+    searchKey: FunctionType = None
+
+    def __len__(self):
+        '''
+        The total number of elements.
+        '''
+
+        # Virtual function to be overwritten by children
+        return 0
+
+    def getElements(self, start: int, count: int) -> List:
+        '''
+        Get up to count elements, starting at the start index.
+        '''
+
+        # Virtual function to be overwritten by children
+        return []
+
+    def prefetch(self, start: int, count: int):
+        '''
+        Hint that the elements in this range will probably be asked for soon.
+        '''
+
+        # Virtual function to be overwritten by any children which need it
+
+    def getElementsAt(self, indices: List[int]) -> List:
+        '''
+        Get the elements at some indices, in the same order. By default each run of consecutive indices is read with one getElements call.
+        '''
+
+        elements = []
+        for start, count in getRuns(indices):
+            elements.extend(self.getElements(start, count))
+
+        return elements
+
+    def prefetchAt(self, indices: List[int]):
+        '''
+        Hint that the elements at these indices will probably be asked for soon.
+        '''
+
+        for start, count in getRuns(indices):
+            self.prefetch(start, count)
+
+    def search(self, query: str, filterKey: FunctionType = str) -> List[int]:
+        '''
+        Get the indices of every element whose filterKey contains query (case insensitive), in order.
+
+        By default a SearchIndex is built the first time, reading the elements a chunk at a time so they are never all held at once.
+            Only the keys are kept. Sources which can search themselves, such as a database, should override this.
+        '''
+
+        if self.searchIndex is None or self.searchKey is not filterKey:
+            self.searchIndex = SearchIndex()
+            self.searchKey = filterKey
+
+            for start in range(0, len(self), self.SEARCH_CHUNK_SIZE):
+                self.searchIndex.addKeys(map(filterKey, self.getElements(start, self.SEARCH_CHUNK_SIZE)))
+
+        return self.searchIndex.setQuery(query)
+
+class SequenceSource(SelectorSource):
+    '''
+    Source for anything which supports len() and indexing, such as a list or a lazy sequence. Only the requested elements are ever indexed.
+    '''
+
+    def __init__(self, elements: Sequence):
+        self.elements: Sequence = elements
+
+    def __len__(self):
+        return len(self.elements)
+
+    def getElements(self, start: int, count: int) -> List:
+        return [self.elements[i] for i in range(start, min(start + count, len(self.elements)))]
+
+class PagedSource(SelectorSource):
+    '''
+    Source which loads elements a page at a time through a fetch function, such as a database or disk read.
+    Recently used pages are cached, and adjacent pages can be fetched in the background before they are needed.
+
+    Parameters
+    ----------
+    fetchPage: Function which takes in (pageIndex, pageSize) and returns a list of the elements on that page
+
+    length: The total number of elements
+
+    pageSize: The number of elements fetchPage returns for each page
+
+    maxCachedPages: The number of pages kept in memory
+
+    usePrefetch: Whether or not prefetch hints start background fetches
+
+    searchFunction: Function which takes in a query and returns the indices of the matching elements, such as a database query.
+        If not given, searching reads every page once to build a search index
+    '''
+
+    class PrefetchThread(Thread):
+        '''
+        Fetches a single page in the background.
+        '''
+
+        def __init__(self, source: "PagedSource", pageIndex: int):
+            Thread.__init__(self, daemon = True)
+
+            self.source: PagedSource = source
+            self.pageIndex: int = pageIndex
+
+        def run(self):
+            self.source.getPage(self.pageIndex)
+
+    def __init__(self, fetchPage: FunctionType, length: int, pageSize: int, maxCachedPages: int = 8, usePrefetch: bool = True, searchFunction: FunctionType = None):
+
+        self.fetchPage: FunctionType = fetchPage
+        self.length: int = length
+        self.pageSize: int = pageSize
+        self.maxCachedPages: int = maxCachedPages
+        self.usePrefetch: bool = usePrefetch
+        self.searchFunction: FunctionType = searchFunction
+
+        # Cached pages, ordered from least recently used to most recently used
+        self.pages: OrderedDict = OrderedDict()
+
+        # Pages currently being fetched. Other threads wait on the event instead of fetching the page again
+        self.pendingPages: Dict[int, Event] = {}
+
+        self.lock: Lock = Lock()
+
+    def __len__(self):
+        return self.length
+
+    def getPage(self, pageIndex: int) -> List:
+        '''
+        Get a single page, fetching it if it isn't cached.
+        '''
+
+        while True:
+
+            with self.lock:
+
+                # Cached pages can be returned right away
+                if pageIndex in self.pages:
+                    self.pages.move_to_end(pageIndex)
+                    return self.pages[pageIndex]
+
+                # If nobody is fetching the page, this thread will fetch it
+                pendingEvent = self.pendingPages.get(pageIndex)
+                if pendingEvent is None:
+                    pendingEvent = Event()
+                    self.pendingPages[pageIndex] = pendingEvent
+                    break
+
+            # Otherwise, wait for the other fetch to finish and check the cache again
+            pendingEvent.wait()
+
+        try:
+            page = list(self.fetchPage(pageIndex, self.pageSize))
+
+            with self.lock:
+                self.pages[pageIndex] = page
+                while len(self.pages) > self.maxCachedPages:
+                    self.pages.popitem(last = False)
+
+        finally:
+            with self.lock:
+                del self.pendingPages[pageIndex]
+            pendingEvent.set()
+
+        return page
+
+    def getElements(self, start: int, count: int) -> List:
+
+        elements = []
+
+        end = min(start + count, self.length)
+        index = start
+        while index < end:
+            pageIndex = index // self.pageSize
+            pageStart = pageIndex * self.pageSize
+
+            page = self.getPage(pageIndex)
+            elements.extend(page[index - pageStart:end - pageStart])
+
+            index = pageStart + self.pageSize
+
+        return elements
+
+    def getElementsAt(self, indices: List[int]) -> List:
+
+        # Each page is read once, however many of the indices are on it
+        pages = {}
+        elements = []
+        for index in indices:
+            pageIndex = index // self.pageSize
+            if pageIndex not in pages:
+                pages[pageIndex] = self.getPage(pageIndex)
+            elements.append(pages[pageIndex][index - pageIndex * self.pageSize])
+
+        return elements
+
+    def prefetchAt(self, indices: List[int]):
+
+        for pageIndex in sorted({index // self.pageSize for index in indices}):
+            self.prefetch(pageIndex * self.pageSize, 1)
+
+    def prefetch(self, start: int, count: int):
+
+        if not self.usePrefetch:
+            return
+
+        end = min(start + count, self.length)
+        if start >= end or start < 0:
+            return
+
+        for pageIndex in range(start // self.pageSize, (end - 1) // self.pageSize + 1):
+
+            with self.lock:
+                if pageIndex in self.pages or pageIndex in self.pendingPages:
+                    continue
+
+            PagedSource.PrefetchThread(self, pageIndex).start()
+
+    def search(self, query: str, filterKey: FunctionType = str) -> List[int]:
+
+        if self.searchFunction is not None:
+            return list(self.searchFunction(query))
+
+        # Read a page at a time, straight from fetchPage so the cached pages aren't pushed out
+        if self.searchIndex is None or self.searchKey is not filterKey:
+            self.searchIndex = SearchIndex()
+            self.searchKey = filterKey
+
+            for pageIndex in range((self.length + self.pageSize - 1) // self.pageSize):
+                page = list(self.fetchPage(pageIndex, self.pageSize))
+                self.searchIndex.addKeys(map(filterKey, page[:self.length - pageIndex * self.pageSize]))
+
+        return self.searchIndex.setQuery(query)
+
+class FilteredSource(SelectorSource):
+    '''
+    Source which only contains some of the elements of another source, given by their indices.
+    '''
+
+    def __init__(self, source: SelectorSource, indices: List[int]):
+        self.source: SelectorSource = source
+        self.indices: List[int] = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def getElements(self, start: int, count: int) -> List:
+        return self.source.getElementsAt(self.indices[start:start + count])
+
+    def prefetch(self, start: int, count: int):
+        self.source.prefetchAt(self.indices[max(start, 0):start + count])
+
+def createSource(elements) -> SelectorSource:
+    '''
+    Wrap elements in a SelectorSource if they aren't one already.
+    '''
+
+    if isinstance(elements, SelectorSource):
+        return elements
+
+    return SequenceSource(elements)
\ No newline at end of file
@@ -0,0 +1,116 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from ..internal import GameObject, Box, timeFunction
+from ..utilities import SpriteSheet
+
+from typing import Dict, Sequence
+
+class Sprite(GameObject):
+    '''
+    Sprites are a gameObject which draw animation frames from a SpriteSheet. The frame is worked out from the gameState clock when the sprite is rendered,
+        so animations run at the same speed no matter how often the sprite is drawn, and sprites drawn inside other gameObjects animate too.
+
+    Parameters
+    ----------
+    box: Position and size of the sprite. Should be at least as big as the frames of the spriteSheet
+
+    spriteSheet: Frames for the sprite
+
+    frameRate: Animation frames per second
+
+    animations: Named lists of frame indices. "default" plays every frame of the spriteSheet unless it is given
+
+    loop: Whether animations start over after their last frame, or stay on it
+    '''
+
+    def __init__(self, box: Box, spriteSheet: SpriteSheet, frameRate: float = 10, animations: Dict[str, Sequence[int]] = None, loop: bool = True, **kwargs):
+        GameObject.__init__(self, box, **kwargs)
+
+        self.spriteSheet: SpriteSheet = spriteSheet
+        self.frameRate: float = frameRate
+        self.loop: bool = loop
+
+        self.animations: Dict[str, Sequence[int]] = {"default": range(len(spriteSheet))}
+        if animations is not None:
+            self.animations.update(animations)
+
+        # The current animation, and the gameState time it started at. The start is set the first time the sprite is rendered
+        self.animationName: str = "default"
+        self.animationStart: float = None
+
+        # Index into the spriteSheet of the frame being drawn
+        self.frameIndex: int = self.animations["default"][0]
+
+        # Whether the frames are mirrored left to right, or flipped upside down
+        self.flipX: bool = False
+        self.flipY: bool = False
+
+        # Frames have transparent pixels
+        self.useTransparency = True
+
+    def getTime(self) -> float:
+        '''
+        The current gameState time. Falls back to the clock time when the sprite isn't in a game, such as when it is drawn inside another gameObject.
+        '''
+
+        if self.game is not None:
+            return self.game.gameState.now
+
+        if self.parentObjectHandler is not None:
+            game = self.parentObjectHandler.getGame()
+            if game is not None:
+                return game.gameState.now
+
+        return timeFunction()
+
+    def play(self, animationName: str, restart: bool = True):
+        '''
+        Switch to a different animation.
+
+        Parameters
+        ----------
+        restart: Whether to start from the first frame if the animation is already playing
+        '''
+
+        if animationName not in self.animations:
+            raise Exception("Sprite has no animation named " + animationName)
+
+        if animationName == self.animationName and not restart:
+            return
+
+        self.animationName = animationName
+        self.animationStart = self.getTime()
+        self.frameIndex = self.animations[animationName][0]
+
+    def isFinished(self) -> bool:
+        '''
+        Whether a non looping animation has reached its last frame.
+        '''
+
+        if self.loop or self.animationStart is None:
+            return False
+
+        frames = self.animations[self.animationName]
+        return int((self.getTime() - self.animationStart) * self.frameRate) >= len(frames) - 1
+
+    def updateFrameIndex(self):
+        '''
+        Work out which frame should be showing from how long the animation has been playing.
+        '''
+
+        now = self.getTime()
+        if self.animationStart is None:
+            self.animationStart = now
+
+        frames = self.animations[self.animationName]
+        frameNumber = int((now - self.animationStart) * self.frameRate)
+        if self.loop:
+            frameNumber %= len(frames)
+        else:
+            frameNumber = min(frameNumber, len(frames) - 1)
+
+        self.frameIndex = frames[frameNumber]
+
+    def render(self):
+        self.updateFrameIndex()
+        self.bufferCanvas.drawImage(self.spriteSheet.getFrame(self.frameIndex, self.flipX, self.flipY), (self.xOffset, self.yOffset))
\ No newline at end of file
@@ -46,6 +46,10 @@ class TextBox(GameObject):
         self.backgroundColor: tuple = backgroundColor
         self.justify: str = justify
 
+        # The text is only split again when the text or width changes
+        self.splitKey: tuple = None
+        self.lines: List[str] = []
+
         # A List of text lines for each line in the textBox
         self.textLineDataList: List[TextLineData] = []
         for i in range(self.h):
@@ -57,9 +61,9 @@ class TextBox(GameObject):
 
     def clearText(self):
 
+        # The textLines are rendered when they are drawn, so there is no need to render them here
         for textLineData in self.textLineDataList:
             textLineData.textLine.text = ""
-            textLineData.textLine._render()
             textLineData.textIndex = 0
 
     def render(self):
@@ -69,7 +73,10 @@ class TextBox(GameObject):
         '''
 
         # Get all the text to split
-        lines = recursiveSplit(self.text, self.w)
+        if self.splitKey != (self.text, self.w):
+            self.splitKey = (self.text, self.w)
+            self.lines = recursiveSplit(self.text, self.w)
+        lines = self.lines
 
         # Keep track of the start index for each line
         lineStart = 0
@@ -86,6 +93,6 @@ class TextBox(GameObject):
                 textLineData.textLine.text = ""
                 textLineData.textIndex = (i - len(lines)) * self.w + lineStart
             
-            textLineData.textLine._render()
+            # Drawing renders the textLine, so there is no need to render it separately
             textLineData.textLine.draw(self.bufferCanvas, (self.xOffset, self.yOffset))
         
\ No newline at end of file
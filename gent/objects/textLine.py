@@ -1,8 +1,7 @@
 # Copyright Clayton Brown 2019. See LICENSE file.
 
 from ..internal import GameObject, Box
-
-import numpy
+from ..utilities import TEXT_CACHE
 
 class TextLine(GameObject):
     '''
@@ -27,26 +26,16 @@ class TextLine(GameObject):
 
     def render(self):
 
-        # Create adjusted text to ignore the trailing space
-        adjustedText = self.text
-        if len(adjustedText) > 0 and (adjustedText[-1] == " " or adjustedText[-1] == "\n"):
-            adjustedText = adjustedText[:-1]
-
-        # Determine where the text needs to start to handle the justification
-        startIndex = 0
-        if self.justify == "R":
-            startIndex = self.w - len(adjustedText)
-        elif self.justify == "C":
-            startIndex = (self.w - len(adjustedText)) // 2
-        
-        # Loop through all the text values and assign the correct characters
-        for i in range(min(len(adjustedText), self.w)):
-            self.bufferCanvas.characters[startIndex + i, 0] = ord(adjustedText[i])
-        
+        # Get the rendered cells for the text. Unchanged text is a cache hit instead of a re-render
+        renderedLine = TEXT_CACHE.getLine(self.text, self.w, self.justify, self.textColor, self.backgroundColor)
+
+        # Copy the characters onto the canvas
+        self.bufferCanvas.characters[:self.w, 0] = renderedLine.characters
+
         # Update the start and end values for the textLine
-        self.lineStart = startIndex
-        self.lineEnd = startIndex + len(self.text)
+        self.lineStart = renderedLine.lineStart
+        self.lineEnd = renderedLine.lineEnd
 
         # Set the text color and background
-        self.bufferCanvas.textColors[:,:] = numpy.array(self.textColor)
-        self.bufferCanvas.backgroundColors[:,:] = numpy.array(self.backgroundColor)
\ No newline at end of file
+        self.bufferCanvas.textColors[:,:] = renderedLine.textColor
+        self.bufferCanvas.backgroundColors[:,:] = renderedLine.backgroundColor
\ No newline at end of file
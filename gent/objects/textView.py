@@ -0,0 +1,353 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from ..internal import GameObject, Box, Event, EVENT_HANDLER
+from ..utilities import RingBuffer
+
+from collections import OrderedDict
+
+from threading import Lock
+
+from typing import List, Tuple
+
+import numpy
+
+import os
+
+class TextView(GameObject):
+    '''
+    Scrollable view for large or streaming text, such as logs.
+
+    Lines are kept in a bounded ring buffer and are only wrapped when they are visible,
+        so the cost of each frame depends on the height of the view rather than the number of lines.
+
+    Parameters
+    ----------
+    box: Position of the TextView
+
+    textColor, backgroundColor: Colors of the text
+
+    maxLines: The number of lines kept before the oldest lines are dropped
+
+    follow: Whether or not the view starts off following the newest lines
+    '''
+
+    def __init__(self, box: Box, textColor: tuple, backgroundColor: tuple, maxLines: int = 100000, follow: bool = True, **kwargs):
+        GameObject.__init__(self, box, **kwargs)
+
+        # Set the initialization parameters
+        self.textColor: tuple = textColor
+        self.backgroundColor: tuple = backgroundColor
+
+        # Every line of text, oldest to newest
+        self.lines: RingBuffer = RingBuffer(maxLines)
+
+        # Lines are added from the update thread and read from the draw thread
+        self.lock: Lock = Lock()
+
+        # Wrapped rows for recently visible lines, keyed by the line sequence number
+        self.wrapCache: OrderedDict = OrderedDict()
+        self.maxWrapCacheSize: int = 4 * self.h + 64
+
+        # Scroll position. The sequence number of the top line, and which of its wrapped rows is at the top
+        self.topLine: int = 0
+        self.topRow: int = 0
+
+        # When following, the view always shows the newest lines
+        self.follow: bool = follow
+
+        # File tailing state
+        self.tailFile = None
+        self.tailPath: str = None
+        self.tailChunkSize: int = 1 << 20
+        self.partialLine: str = ""
+
+    ###########
+    # CONTENT #
+    ###########
+    def addLine(self, line: str):
+        '''
+        Add a single line of text. The line shouldn't contain any newlines.
+        '''
+
+        with self.lock:
+            self.lines.append(line)
+
+    def addText(self, text: str):
+        '''
+        Add a block of text, splitting it into lines.
+        '''
+
+        with self.lock:
+            self.lines.extend(text.split("\n"))
+
+    def clearText(self):
+        '''
+        Remove every line from the view.
+        '''
+
+        with self.lock:
+            self.lines.clear()
+            self.wrapCache.clear()
+            self.follow = True
+
+    def tail(self, filePath: str, fromStart: bool = False):
+        '''
+        Follow a growing file. New text is read a chunk at a time on each update.
+
+        Parameters
+        ----------
+        filePath: The file to follow
+
+        fromStart: Whether to read the text already in the file, or only what is added from now on
+        '''
+
+        self.stopTail()
+
+        self.tailPath = filePath
+        self.tailFile = open(filePath, "r", errors = "replace")
+        self.partialLine = ""
+
+        if not fromStart:
+            self.tailFile.seek(0, os.SEEK_END)
+
+    def stopTail(self):
+        '''
+        Stop following the current file.
+        '''
+
+        if self.tailFile is not None:
+            self.tailFile.close()
+
+        self.tailFile = None
+        self.tailPath = None
+
+    def readTail(self):
+        '''
+        Read whatever has been added to the tailed file since the last read.
+        '''
+
+        if self.tailFile is None:
+            return
+
+        # A missing file, such as part way through a log rotation, just has no new lines yet
+        try:
+            pathStat = os.stat(self.tailPath)
+        except FileNotFoundError:
+            return
+
+        # If a new file has replaced the tailed one, finish the old file and then read the new one from the beginning
+        fileStat = os.fstat(self.tailFile.fileno())
+        if (pathStat.st_dev, pathStat.st_ino) != (fileStat.st_dev, fileStat.st_ino):
+            try:
+                newFile = open(self.tailPath, "r", errors = "replace")
+            except FileNotFoundError:
+                return
+
+            self.addTailText(self.tailFile.read())
+            if len(self.partialLine) > 0:
+                self.addTailText("\n")
+
+            self.tailFile.close()
+            self.tailFile = newFile
+
+        # If the same file shrank, it was truncated, so start reading it again from the beginning
+        elif pathStat.st_size < self.tailFile.tell():
+            self.tailFile.seek(0)
+            self.partialLine = ""
+
+        # Limit how much is read at once so a large file doesn't stall the update
+        self.addTailText(self.tailFile.read(self.tailChunkSize))
+
+    def addTailText(self, text: str):
+        '''
+        Add text read from the tailed file. The last line isn't finished until a newline is read.
+        '''
+
+        if len(text) == 0:
+            return
+
+        lines = (self.partialLine + text).split("\n")
+        self.partialLine = lines.pop()
+
+        with self.lock:
+            self.lines.extend(lines)
+
+    def update(self):
+        self.readTail()
+
+    ##########
+    # LAYOUT #
+    ##########
+    def wrapLine(self, sequence: int) -> List[str]:
+        '''
+        Get the wrapped rows for a line.
+        '''
+
+        rows = self.wrapCache.get(sequence)
+        if rows is not None:
+            self.wrapCache.move_to_end(sequence)
+            return rows
+
+        line = self.lines.getBySequence(sequence)
+        rows = [line[i:i + self.w] for i in range(0, len(line), self.w)]
+        if len(rows) == 0:
+            rows = [""]
+
+        self.wrapCache[sequence] = rows
+        while len(self.wrapCache) > self.maxWrapCacheSize:
+            self.wrapCache.popitem(last = False)
+
+        return rows
+
+    def getTopPosition(self) -> Tuple[int, int]:
+        '''
+        Determine which line and row are at the top of the view.
+        '''
+
+        firstLine = self.lines.getFirstSequence()
+        lastLine = self.lines.getLastSequence()
+
+        # When following, count rows back from the newest line
+        if self.follow:
+            rowsLeft = self.h
+            sequence = lastLine
+            while sequence >= firstLine:
+                rowCount = len(self.wrapLine(sequence))
+                if rowCount >= rowsLeft:
+                    return sequence, rowCount - rowsLeft
+                rowsLeft -= rowCount
+                sequence -= 1
+
+            return firstLine, 0
+
+        # If the top line has been dropped from the buffer, start from the oldest line instead
+        if self.topLine < firstLine:
+            return firstLine, 0
+
+        return self.topLine, self.topRow
+
+    def countRowsFromTop(self, limit: int) -> int:
+        '''
+        Count the rows from the top of the view to the newest line, stopping once limit is reached.
+        '''
+
+        sequence, row = self.getTopPosition()
+        lastLine = self.lines.getLastSequence()
+
+        rowCount = 0
+        while rowCount < limit and sequence <= lastLine:
+            rowCount += len(self.wrapLine(sequence)) - row
+            row = 0
+            sequence += 1
+
+        return rowCount
+
+    def getVisibleRows(self) -> List[str]:
+        '''
+        Get the rows of text which currently fit in the view.
+        '''
+
+        rows = []
+
+        sequence, row = self.getTopPosition()
+        lastLine = self.lines.getLastSequence()
+        while len(rows) < self.h and sequence <= lastLine:
+            rows.extend(self.wrapLine(sequence)[row:row + self.h - len(rows)])
+            row = 0
+            sequence += 1
+
+        return rows
+
+    #############
+    # SCROLLING #
+    #############
+    def scroll(self, rows: int):
+        '''
+        Scroll the view by a number of rows. Negative values scroll up.
+        '''
+
+        with self.lock:
+
+            firstLine = self.lines.getFirstSequence()
+            lastLine = self.lines.getLastSequence()
+
+            self.topLine, self.topRow = self.getTopPosition()
+            self.follow = False
+
+            # Scrolling up
+            while rows < 0:
+                if self.topRow > 0:
+                    step = min(self.topRow, -rows)
+                    self.topRow -= step
+                    rows += step
+                elif self.topLine > firstLine:
+                    self.topLine -= 1
+                    self.topRow = len(self.wrapLine(self.topLine))
+                else:
+                    break
+
+            # Scrolling down
+            while rows > 0 and self.topLine <= lastLine:
+                remainingRows = len(self.wrapLine(self.topLine)) - self.topRow
+                if rows < remainingRows:
+                    self.topRow += rows
+                    rows = 0
+                else:
+                    rows -= remainingRows
+                    self.topLine += 1
+                    self.topRow = 0
+
+            # Once the view reaches the bottom, start following again
+            if self.topLine > lastLine or self.countRowsFromTop(self.h + 1) <= self.h:
+                self.follow = True
+
+    def scrollToTop(self):
+
+        with self.lock:
+            self.follow = False
+            self.topLine = self.lines.getFirstSequence()
+            self.topRow = 0
+
+    def scrollToBottom(self):
+
+        with self.lock:
+            self.follow = True
+
+    def handleEvent(self, event: Event):
+        '''
+        Scroll with the arrow keys, page up/down, home, and end.
+        '''
+
+        if event.keyName == "UP":
+            self.scroll(-1)
+        elif event.keyName == "DOWN":
+            self.scroll(1)
+        elif event.keyName == "PAGE_UP":
+            self.scroll(-self.h)
+        elif event.keyName == "PAGE_DOWN":
+            self.scroll(self.h)
+        elif event.keyName == "HOME":
+            self.scrollToTop()
+        elif event.keyName == "END":
+            self.scrollToBottom()
+        else:
+            return EVENT_HANDLER.DID_NOT_HANDLE
+
+        return EVENT_HANDLER.HANDLED
+
+    #############
+    # RENDERING #
+    #############
+    def render(self):
+
+        with self.lock:
+            rows = self.getVisibleRows()
+
+        # Set the text color and background
+        self.bufferCanvas.textColors[:,:] = numpy.array(self.textColor)
+        self.bufferCanvas.backgroundColors[:,:] = numpy.array(self.backgroundColor)
+
+        # Only the visible rows are ever written
+        for j in range(len(rows)):
+            row = rows[j]
+            self.bufferCanvas.characters[self.xOffset:self.xOffset + len(row), self.yOffset + j] = numpy.fromiter(map(ord, row), dtype = numpy.uint16, count = len(row))
\ No newline at end of file
@@ -0,0 +1,119 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from ..internal import GameObject, Box, timeFunction
+from ..utilities import FrameSequence
+
+class VideoPlayer(GameObject):
+    '''
+    VideoPlayers are a gameObject which play a FrameSequence. The frame is worked out from the clock when the player is drawn,
+        so if drawing falls behind, frames are skipped instead of the video slowing down. Nothing is done on the update thread.
+
+    Parameters
+    ----------
+    box: Position and size of the player. Should be at least as big as the frames
+
+    frameSequence: Frames to play
+
+    loop: Whether to start over after the last frame, or stay on it
+
+    autoPlay: Whether to start playing as soon as the player is first drawn
+    '''
+
+    def __init__(self, box: Box, frameSequence: FrameSequence, loop: bool = False, autoPlay: bool = True, **kwargs):
+        GameObject.__init__(self, box, **kwargs)
+
+        self.frameSequence: FrameSequence = frameSequence
+        self.loop: bool = loop
+
+        # While playing, the position is worked out from the time playback started at. While paused, it is stored directly
+        self.playing: bool = autoPlay
+        self.startTime: float = None
+        self.pausedPosition: float = 0
+
+        # The last frame drawn, and the number of frames skipped because drawing fell behind
+        self.frameIndex: int = None
+        self.droppedFrames: int = 0
+
+    def getTime(self) -> float:
+        '''
+        The current gameState time. Falls back to the real time when the player hasn't been added to a game.
+        '''
+
+        if self.game is not None:
+            return self.game.gameState.now
+
+        return timeFunction()
+
+    def getPosition(self) -> float:
+        '''
+        Playback position in seconds.
+        '''
+
+        if not self.playing:
+            return self.pausedPosition
+
+        if self.startTime is None:
+            self.startTime = self.getTime() - self.pausedPosition
+
+        return self.getTime() - self.startTime
+
+    def seek(self, position: float):
+        '''
+        Jump to a position in seconds. The frames aren't read in order, so this takes the same time no matter where the position is.
+        '''
+
+        position = max(0, min(position, self.frameSequence.getDuration()))
+
+        if self.playing:
+            self.startTime = self.getTime() - position
+        else:
+            self.pausedPosition = position
+
+        # Jumping isn't falling behind
+        self.frameIndex = None
+
+    def play(self):
+
+        if self.playing:
+            return
+
+        self.playing = True
+        self.startTime = self.getTime() - self.pausedPosition
+
+    def pause(self):
+
+        if not self.playing:
+            return
+
+        self.pausedPosition = self.getPosition()
+        self.playing = False
+
+    def isFinished(self) -> bool:
+        '''
+        Whether a non looping video has reached its last frame.
+        '''
+
+        return not self.loop and self.getPosition() >= self.frameSequence.getDuration()
+
+    def getFrameIndex(self) -> int:
+        '''
+        The frame which should be showing at the current position.
+        '''
+
+        frameIndex = int(self.getPosition() * self.frameSequence.frameRate)
+
+        if self.loop:
+            return frameIndex % len(self.frameSequence)
+
+        return min(frameIndex, len(self.frameSequence) - 1)
+
+    def render(self):
+
+        frameIndex = self.getFrameIndex()
+
+        # Count the frames which were never drawn
+        if self.frameIndex is not None and frameIndex > self.frameIndex + 1:
+            self.droppedFrames += frameIndex - self.frameIndex - 1
+        self.frameIndex = frameIndex
+
+        self.bufferCanvas.drawImage(self.frameSequence.getFrame(frameIndex), (self.xOffset, self.yOffset))
\ No newline at end of file
@@ -1,6 +1,19 @@
 # Copyright Clayton Brown 2019. See LICENSE file.
 
 from .text import recursiveSplit
+from .text import RenderedTextCache, RenderedLine, TEXT_CACHE
+from .text import SearchIndex
+
+from .ringBuffer import RingBuffer
 
 from .image import loadPNG
-from .image import ImageData
\ No newline at end of file
+from .image import setImageCacheDirectory
+from .image import saveImageData, loadImageData
+from .image import ImageData
+from .image import convertImage
+
+from .spriteSheet import SpriteSheet
+
+from .frameSequence import FrameSequence, saveFrameSequence
+
+from .palette import createGradient, createHueGradient, applyPalette
\ No newline at end of file
@@ -1,5 +1,7 @@
 # Copyright Clayton Brown 2019. See LICENSE file.
 
+import numpy
+
 class Color:
     '''
     Class for handling colors. Create and transition between them very easily.
@@ -15,10 +17,10 @@ class Color:
         return (round(self.r * 255), round(self.g * 255), round(self.b * 255))
 
     def getHSL(self):
-        pass
+        return tuple(float(value) for value in getHSLArray((self.r, self.g, self.b)))
 
     def getHCL(self):
-        pass
+        return tuple(float(value) for value in getHCLArray((self.r, self.g, self.b)))
 
     def __repr__(self):
 
@@ -149,3 +151,172 @@ def createHCL(h: float, c: float, l: float):
     HCL = mixColors(HL, chromaColor, mixRatio)
     
     return HCL
+
+
+# Array versions of the functions above. Colors are float arrays shaped (..., 3) with values from 0 to 1,
+#   and hue, saturation, chroma, and lightness are float arrays shaped (...). Whole canvases can be converted in one call.
+
+def asFloatArray(values) -> numpy.ndarray:
+    '''
+    Convert values to a float array, keeping the float type if it already is one
+    '''
+
+    values = numpy.asarray(values)
+    if not numpy.issubdtype(values.dtype, numpy.floating):
+        values = values.astype(numpy.float32)
+
+    return values
+
+def colorArrayFromUInt8(colors: numpy.ndarray) -> numpy.ndarray:
+    '''
+    Convert 0-255 colors, such as canvas.backgroundColors, into 0-1 colors
+    '''
+
+    return numpy.asarray(colors, dtype = numpy.float32) / 255
+
+def colorArrayToUInt8(colors: numpy.ndarray, out: numpy.ndarray = None) -> numpy.ndarray:
+    '''
+    Convert 0-1 colors into 0-255 colors. Values are rounded the same way as Color.getRGB
+
+    Parameters
+    ----------
+    out: uint8 array to write the result into, such as canvas.backgroundColors
+    '''
+
+    scaled = numpy.clip(numpy.rint(asFloatArray(colors) * 255), 0, 255)
+
+    if out is None:
+        return scaled.astype(numpy.uint8)
+
+    out[...] = scaled
+    return out
+
+def mixColorArrays(c1: numpy.ndarray, c2: numpy.ndarray, mixParameter, out: numpy.ndarray = None) -> numpy.ndarray:
+    '''
+    Mix two color arrays together. Works the same as mixColors
+
+    Parameters
+    ----------
+    c1/2: The first and second colors to mix together. Either can be a single color
+
+    mixParameter: At 0, the resulting color is c1. At 1, the resulting color is c2. Can be a single value, or one value for each color
+
+    out: Array to write the result into
+    '''
+
+    c1 = asFloatArray(c1)
+    c2 = asFloatArray(c2)
+
+    # A mix parameter for each color applies to all three channels
+    mixParameter = asFloatArray(mixParameter)
+    if mixParameter.ndim > 0:
+        mixParameter = mixParameter[..., numpy.newaxis]
+
+    result = c1 + (c2 - c1) * mixParameter
+
+    if out is None:
+        return result
+
+    out[...] = result
+    return out
+
+def createFromHueArray(h) -> numpy.ndarray:
+    '''
+    Array version of createFromHue. Like createFromHue, hues of 1.0 or more are black.
+    Negative hues are red, where createFromHue would give a negative green.
+    '''
+
+    # Each channel rises, holds, and falls across the six sixths of the hue circle
+    h = asFloatArray(h)
+    h6 = h * 6
+    color = numpy.clip(numpy.stack([
+        numpy.abs(h6 - 3) - 1,
+        2 - numpy.abs(h6 - 2),
+        2 - numpy.abs(h6 - 4)
+    ], axis = -1), 0.0, 1.0)
+
+    # createFromHue doesn't set any channel past the last sixth
+    color[h >= 1.0] = 0.0
+
+    return color
+
+def createHueLightnessArray(h, l) -> numpy.ndarray:
+    '''
+    The base hue mixed with black or white for the lightness, shared by createHSLArray and createHCLArray
+    '''
+
+    l = asFloatArray(l)
+    mixColor = (l > .5).astype(l.dtype)[..., numpy.newaxis]
+
+    return mixColorArrays(createFromHueArray(h), mixColor, numpy.abs(l - .5) / .5)
+
+def createHSLArray(h, s, l) -> numpy.ndarray:
+    '''
+    Array version of createHSL
+    '''
+
+    l = asFloatArray(l)
+    HL = createHueLightnessArray(h, l)
+
+    # Then consider saturation
+    return mixColorArrays(HL, l[..., numpy.newaxis], 1.0 - asFloatArray(s))
+
+def createHCLArray(h, c, l) -> numpy.ndarray:
+    '''
+    Array version of createHCL
+    '''
+
+    l = asFloatArray(l)
+    c = asFloatArray(c)
+    HL = createHueLightnessArray(h, l)
+
+    # Colors which don't have enough chroma are left as they are, the rest have chroma mixed in
+    colorRange = HL.max(axis = -1) - HL.min(axis = -1)
+    mixRatio = numpy.where(colorRange > c, 1.0 - c / numpy.maximum(colorRange, 1e-12), 0.0)
+
+    return mixColorArrays(HL, l[..., numpy.newaxis], mixRatio)
+
+def getHueArray(colors) -> numpy.ndarray:
+    '''
+    Hue of each color, from 0 up to 1. Inverse of createFromHueArray. Gray colors have a hue of 0
+    '''
+
+    colors = asFloatArray(colors)
+    r, g, b = colors[..., 0], colors[..., 1], colors[..., 2]
+    maxValue = colors.max(axis = -1)
+    colorRange = maxValue - colors.min(axis = -1)
+    safeRange = numpy.where(colorRange > 0, colorRange, 1.0)
+
+    # Which sixth of the hue circle the color is in depends on its largest channel
+    h = numpy.where(
+        maxValue == r, ((g - b) / safeRange) % 6,
+        numpy.where(maxValue == g, (b - r) / safeRange + 2, (r - g) / safeRange + 4)
+    ) / 6
+
+    return numpy.where(colorRange > 0, h, 0.0)
+
+def getHSLArray(colors) -> numpy.ndarray:
+    '''
+    Inverse of createHSLArray. Returns an array shaped (..., 3) of hue, saturation, and lightness
+    '''
+
+    colors = asFloatArray(colors)
+    maxValue = colors.max(axis = -1)
+    minValue = colors.min(axis = -1)
+
+    l = (maxValue + minValue) / 2
+    saturationRange = 1.0 - numpy.abs(2 * l - 1)
+    s = numpy.where(saturationRange > 0, (maxValue - minValue) / numpy.maximum(saturationRange, 1e-12), 0.0)
+
+    return numpy.stack([getHueArray(colors), s, l], axis = -1)
+
+def getHCLArray(colors) -> numpy.ndarray:
+    '''
+    Inverse of createHCLArray. Returns an array shaped (..., 3) of hue, chroma, and lightness
+    '''
+
+    colors = asFloatArray(colors)
+    maxValue = colors.max(axis = -1)
+    minValue = colors.min(axis = -1)
+
+    return numpy.stack([getHueArray(colors), maxValue - minValue, (maxValue + minValue) / 2], axis = -1)
\ No newline at end of file
@@ -0,0 +1,128 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from typing import Iterable
+
+import numpy
+
+from dataclasses import fields
+
+import json
+import os
+import shutil
+import tempfile
+
+from .image import ImageData
+
+class FrameSequence:
+    '''
+    Read only sequence of pre converted frames saved by saveFrameSequence. The frames are memory mapped,
+        so only the frames which are actually drawn are ever read from disk, and nothing needs to be decoded.
+
+    Parameters
+    ----------
+    directory: Directory the frames were saved to
+    '''
+
+    def __init__(self, directory: str):
+
+        self.directory: str = directory
+
+        with open(os.path.join(directory, "sequence.json"), "r") as f:
+            metadata = json.load(f)
+
+        self.frameRate: float = metadata["frameRate"]
+
+        # One array for each ImageData field, shaped (frames, w, h, ...)
+        self.backgroundColorData: numpy.ndarray = self.loadField("backgroundColorData")
+        self.textColorData: numpy.ndarray = self.loadField("textColorData")
+        self.transparencyData: numpy.ndarray = self.loadField("transparencyData")
+        self.characterData: numpy.ndarray = self.loadField("characterData")
+
+        self.w, self.h = self.backgroundColorData.shape[1:3]
+
+    def loadField(self, name: str) -> numpy.ndarray:
+        return numpy.load(os.path.join(self.directory, name + ".npy"), mmap_mode = "r")
+
+    def __len__(self):
+        return self.backgroundColorData.shape[0]
+
+    def getDuration(self) -> float:
+        '''
+        Length of the sequence in seconds.
+        '''
+
+        return len(self) / self.frameRate
+
+    def getFrame(self, index: int) -> ImageData:
+        '''
+        Get a frame as ImageData. The arrays are read only views of the file.
+        '''
+
+        return ImageData(
+            self.backgroundColorData[index],
+            self.textColorData[index],
+            self.transparencyData[index],
+            self.characterData[index]
+        )
+
+def saveFrameSequence(directory: str, frames: Iterable[ImageData], frameRate: float, frameCount: int = None):
+    '''
+    Save frames so they can be played back by a FrameSequence. The frames are written one at a time, so they can come from a generator
+        without all being held in memory. Like saveImageData, the directory only appears once every frame has been written.
+
+    Parameters
+    ----------
+    frames: ImageData for each frame. Every frame must be the same size
+
+    frameRate: Frames per second to play the sequence at
+
+    frameCount: The number of frames. Only needed if frames doesn't support len()
+    '''
+
+    if frameCount is None:
+        frames = list(frames)
+        frameCount = len(frames)
+
+    if frameCount == 0:
+        raise Exception("A frame sequence needs at least one frame")
+
+    parentDirectory = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parentDirectory, exist_ok = True)
+
+    temporaryDirectory = tempfile.mkdtemp(dir = parentDirectory)
+    try:
+        arrays = None
+        for i, frame in enumerate(frames):
+            if i >= frameCount:
+                raise Exception("More frames were given than frameCount")
+
+            # The files are created once the first frame shows the size of each field. Colors are stored the same way as the canvas
+            if arrays is None:
+                arrays = {}
+                for field in fields(ImageData):
+                    data = getattr(frame, field.name)
+                    dtype = numpy.uint16 if field.name == "characterData" else numpy.uint8
+                    arrays[field.name] = numpy.lib.format.open_memmap(
+                        os.path.join(temporaryDirectory, field.name + ".npy"), mode = "w+", dtype = dtype, shape = (frameCount,) + data.shape
+                    )
+
+            for field in fields(ImageData):
+                arrays[field.name][i] = getattr(frame, field.name)
+
+        if arrays is None or i + 1 != frameCount:
+            raise Exception("Fewer frames were given than frameCount")
+
+        for array in arrays.values():
+            array.flush()
+        del arrays
+
+        with open(os.path.join(temporaryDirectory, "sequence.json"), "w") as f:
+            json.dump({"frameRate": frameRate, "frameCount": frameCount}, f)
+
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.replace(temporaryDirectory, directory)
+
+    except Exception:
+        shutil.rmtree(temporaryDirectory, ignore_errors = True)
+        raise
\ No newline at end of file
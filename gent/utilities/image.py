@@ -1,11 +1,43 @@
 # Copyright Clayton Brown 2019. See LICENSE file.
 
-from typing import Tuple
+from typing import Dict, Tuple
 
 from PIL import Image
 import numpy
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+# Directory where converted images are cached. None turns the cache off
+IMAGE_CACHE_DIRECTORY: str = None
+
+# Change this whenever the conversion changes, so old cache entries aren't used
+IMAGE_CACHE_VERSION: int = 1
+
+# Hashes of files which have already been read, keyed by (filePath, modified time, size)
+FILE_HASHES: Dict[Tuple[str, int, int], str] = {}
+
+# The (w, h) in pixels of a single character for each convertImage mode
+CELL_SIZES: Dict[str, Tuple[int, int]] = {"half": (1, 2), "quarter": (2, 2), "braille": (2, 4)}
+
+# The bit each pixel of a character sets, in the order convertImage groups a character's pixels (px * cellH + py)
+CELL_BITS: Dict[str, numpy.ndarray] = {
+    "quarter": numpy.array([1, 4, 2, 8], dtype = numpy.uint8),
+    "braille": numpy.array([0x01, 0x02, 0x04, 0x40, 0x08, 0x10, 0x20, 0x80], dtype = numpy.uint8)
+}
+
+# Quadrant block character for each combination of bits. 1 = top left, 2 = top right, 4 = bottom left, 8 = bottom right
+QUARTER_BLOCK_CHARACTERS: numpy.ndarray = numpy.array([ord(character) for character in " ▘▝▀▖▌▞▛▗▚▐▜▄▙▟█"], dtype = numpy.uint16)
+
+# Ordered dithering thresholds, between 0 and 1
+BAYER_MATRIX: numpy.ndarray = numpy.array([[0, 8, 2, 10], [12, 4, 14, 6], [3, 11, 1, 9], [15, 7, 13, 5]], dtype = numpy.float32) / 16
+
+# Weights for the perceived brightness of a color
+LUMINANCE_WEIGHTS: numpy.ndarray = numpy.array([0.299, 0.587, 0.114], dtype = numpy.float32)
 
 @dataclass
 class ImageData:
@@ -18,17 +50,110 @@ class ImageData:
     transparencyData: numpy.ndarray
     characterData: numpy.ndarray
 
-def loadPNG(filePath: str, outputSize: Tuple[int], useHalfBlocks: bool = True) -> ImageData:
+def setImageCacheDirectory(directory: str):
+    '''
+    Set the directory loadPNG caches converted images in. Set to None to turn the cache off.
+    '''
+
+    global IMAGE_CACHE_DIRECTORY #pylint: disable=global-statement
+    IMAGE_CACHE_DIRECTORY = directory
+
+def saveImageData(directory: str, imageData: ImageData):
+    '''
+    Save imageData as uncompressed .npy files in a directory, so that it can be memory mapped by loadImageData.
+    The files are written to a temporary directory which is then renamed, so a partly written directory is never read.
+    '''
+
+    parentDirectory = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parentDirectory, exist_ok = True)
+
+    temporaryDirectory = tempfile.mkdtemp(dir = parentDirectory)
+    try:
+        for field in fields(ImageData):
+            numpy.save(os.path.join(temporaryDirectory, field.name + ".npy"), getattr(imageData, field.name))
+        os.replace(temporaryDirectory, directory)
+
+    # If something else saved the same directory first, just use theirs
+    except OSError:
+        shutil.rmtree(temporaryDirectory, ignore_errors = True)
+        if not os.path.isdir(directory):
+            raise
+
+def loadImageData(directory: str, mmapMode: str = "r") -> ImageData:
+    '''
+    Load imageData saved by saveImageData. By default the arrays are read only memory maps of the files.
+    '''
+
+    return ImageData(*[
+        numpy.load(os.path.join(directory, field.name + ".npy"), mmap_mode = mmapMode)
+        for field in fields(ImageData)
+    ])
+
+def getFileHash(filePath: str) -> str:
+    '''
+    Hash of a file's contents. Files are only read again if they have been modified.
+    '''
+
+    stat = os.stat(filePath)
+    key = (os.path.abspath(filePath), stat.st_mtime_ns, stat.st_size)
+
+    if key not in FILE_HASHES:
+        with open(filePath, "rb") as f:
+            FILE_HASHES[key] = hashlib.sha1(f.read()).hexdigest()
+
+    return FILE_HASHES[key]
+
+def loadPNG(filePath: str, outputSize: Tuple[int], useHalfBlocks: bool = True, cacheDirectory: str = None) -> ImageData:
     '''
     Output size is normalized into terminal space. Meaning an image that's 20x20 will
         actually appear to be 20x40. (because a terminal character is twice as tall as it is wide)
 
+    If cacheDirectory (or IMAGE_CACHE_DIRECTORY) is set, the converted image is cached there and memory mapped
+        on later loads instead of being decoded again. Cached images are read only.
+
     Returns are:
         Background colors
         Text colors
         Transparency
     '''
 
+    if cacheDirectory is None:
+        cacheDirectory = IMAGE_CACHE_DIRECTORY
+
+    if cacheDirectory is None:
+        return decodePNG(filePath, outputSize, useHalfBlocks)
+
+    # Cached images are keyed by the file contents, the output size, and the block mode
+    cacheKey = "%s_%ix%i_%s_v%i" % (
+        getFileHash(filePath),
+        outputSize[0],
+        outputSize[1],
+        "half" if useHalfBlocks else "full",
+        IMAGE_CACHE_VERSION
+    )
+    cachePath = os.path.join(cacheDirectory, cacheKey)
+
+    if os.path.isdir(cachePath):
+        try:
+            return loadImageData(cachePath)
+        except (OSError, ValueError):
+            shutil.rmtree(cachePath, ignore_errors = True)
+
+    imageData = decodePNG(filePath, outputSize, useHalfBlocks)
+
+    # A cache which can't be written to shouldn't stop the image from loading
+    try:
+        saveImageData(cachePath, imageData)
+    except OSError:
+        pass
+
+    return imageData
+
+def decodePNG(filePath: str, outputSize: Tuple[int], useHalfBlocks: bool = True) -> ImageData:
+    '''
+    Decode and convert a png without using the cache. See loadPNG.
+    '''
+
     if not useHalfBlocks:
         imageData = numpy.swapaxes(numpy.array(Image.open(filePath).resize(outputSize, Image.BOX)), 0, 1)
         return ImageData(
@@ -49,7 +174,94 @@ def loadPNG(filePath: str, outputSize: Tuple[int], useHalfBlocks: bool = True) -
             numpy.ones(outputSize, dtype=numpy.int16) * 9600
         )
 
-def convertImage():
+def convertImage(image: numpy.ndarray, mode: str = "half", dither: bool = False, out: ImageData = None) -> ImageData:
+    '''
+    Convert an RGB or RGBA image array into ImageData. Every step works on whole arrays, so this is fast enough to run every frame.
+
+    Parameters
+    ----------
+    image: Array shaped (height, width, 3 or 4), the same layout as numpy.array(PIL.Image). Pixels which don't fill a whole cell are cropped off
+
+    mode: How many pixels each character shows
+        "half": 1x2 pixels per character, using the upper half block. Colors are exact
+        "quarter": 2x2 pixels per character, using quadrant block characters
+        "braille": 2x4 pixels per character, using braille dots
+        Quarter and braille characters can only show two colors, so each character's pixels are split into its light and dark pixels
+
+    dither: Whether to use ordered dithering when splitting pixels into light and dark. Has no effect in half mode
+
+    out: ImageData to write the result into instead of allocating a new one. Only used if it is the right size
     '''
 
-    '''
\ No newline at end of file
+    if mode not in CELL_SIZES:
+        raise Exception("Unknown convertImage mode: " + str(mode))
+
+    cellW, cellH = CELL_SIZES[mode]
+
+    image = numpy.asarray(image)
+    if image.ndim == 2:
+        image = numpy.repeat(image[:,:,numpy.newaxis], 3, axis = 2)
+
+    w, h = image.shape[1] // cellW, image.shape[0] // cellH
+    if w == 0 or h == 0:
+        raise Exception("Image is too small to fill a single character")
+
+    # Crop to whole cells and swap into (x, y) order like the canvas
+    pixels = numpy.swapaxes(image[:h * cellH, :w * cellW], 0, 1)
+    colors = pixels[:,:,:3]
+    alpha = pixels[:,:,3] if pixels.shape[2] > 3 else None
+
+    if out is None or out.backgroundColorData.shape[:2] != (w, h):
+        out = ImageData(
+            numpy.zeros((w, h, 3), dtype = numpy.uint8),
+            numpy.zeros((w, h, 3), dtype = numpy.uint8),
+            numpy.zeros((w, h), dtype = numpy.uint8),
+            numpy.zeros((w, h), dtype = numpy.uint16)
+        )
+
+    # Half blocks show the top pixel as the text color and the bottom pixel as the background color
+    if mode == "half":
+        out.textColorData[:] = colors[:,::2]
+        out.backgroundColorData[:] = colors[:,1::2]
+        out.transparencyData[:] = 255 if alpha is None else alpha[:,1::2]
+        out.characterData[:] = 9600
+        return out
+
+    # Group the pixels of each cell together. Pixel (px, py) of a cell ends up at index px * cellH + py
+    cells = colors.reshape(w, cellW, h, cellH, 3).transpose(0, 2, 1, 3, 4).reshape(w, h, cellW * cellH, 3).astype(numpy.float32)
+    luminance = cells @ LUMINANCE_WEIGHTS
+
+    # Pixels lighter than the average of their cell are drawn in the text color
+    threshold = luminance.mean(axis = 2, keepdims = True)
+    if dither:
+        bayer = numpy.tile(BAYER_MATRIX, (w * cellW // 4 + 1, h * cellH // 4 + 1))[:w * cellW, :h * cellH]
+        bayer = bayer.reshape(w, cellW, h, cellH).transpose(0, 2, 1, 3).reshape(w, h, cellW * cellH)
+        threshold = threshold + (bayer - 0.5) * (luminance.max(axis = 2, keepdims = True) - luminance.min(axis = 2, keepdims = True))
+    isLight = luminance > threshold
+
+    # The text color is the average of the light pixels, and the background color the average of the dark pixels
+    lightCount = isLight.sum(axis = 2)
+    darkCount = cellW * cellH - lightCount
+    lightSum = (cells * isLight[:,:,:,numpy.newaxis]).sum(axis = 2)
+    darkSum = cells.sum(axis = 2) - lightSum
+    lightColors = lightSum / numpy.maximum(lightCount, 1)[:,:,numpy.newaxis]
+    darkColors = darkSum / numpy.maximum(darkCount, 1)[:,:,numpy.newaxis]
+
+    # A cell with only one kind of pixel uses the same color for both
+    out.textColorData[:] = numpy.where((lightCount == 0)[:,:,numpy.newaxis], darkColors, lightColors)
+    out.backgroundColorData[:] = numpy.where((darkCount == 0)[:,:,numpy.newaxis], lightColors, darkColors)
+
+    # Each light pixel sets a bit, which picks the character
+    bits = isLight.astype(numpy.uint8) @ CELL_BITS[mode]
+    if mode == "quarter":
+        out.characterData[:] = QUARTER_BLOCK_CHARACTERS[bits]
+    else:
+        out.characterData[:] = bits
+        out.characterData += 0x2800
+
+    if alpha is None:
+        out.transparencyData[:] = 255
+    else:
+        out.transparencyData[:] = alpha.reshape(w, cellW, h, cellH).mean(axis = (1, 3))
+
+    return out
\ No newline at end of file
@@ -0,0 +1,121 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from functools import lru_cache
+
+from typing import Sequence, Tuple
+
+import numpy
+
+from .color import mixColorArrays, createHSLArray, createHCLArray, colorArrayToUInt8
+
+def createGradient(colors: Sequence[Tuple[int, int, int]], steps: int) -> numpy.ndarray:
+    '''
+    Lookup table of colors blending evenly through each of the given colors.
+
+    Tables are cached, so asking for the same gradient again doesn't compute anything. The returned table is shared, so it is read only.
+
+    Parameters
+    ----------
+    colors: 0-255 (r, g, b) colors to blend between. There must be at least two
+
+    steps: The number of colors in the table
+
+    Returns an array shaped (steps, 3) of uint8 colors
+    '''
+
+    return cachedGradient(tuple(tuple(int(value) for value in color) for color in colors), int(steps))
+
+@lru_cache(maxsize = 64)
+def cachedGradient(colors: Tuple[Tuple[int, int, int], ...], steps: int) -> numpy.ndarray:
+
+    if len(colors) < 2:
+        raise Exception("A gradient needs at least two colors")
+
+    stops = numpy.array(colors, dtype = numpy.float64) / 255
+
+    # Work out which pair of colors each step is between, and how far between them it is
+    position = numpy.linspace(0, len(stops) - 1, steps)
+    segment = numpy.minimum(position.astype(numpy.int64), len(stops) - 2)
+    mixParameter = position - segment
+
+    palette = colorArrayToUInt8(mixColorArrays(stops[segment], stops[segment + 1], mixParameter))
+    palette.flags.writeable = False
+
+    return palette
+
+@lru_cache(maxsize = 64)
+def createHueGradient(steps: int, startHue: float = 0.0, endHue: float = 1.0, saturation: float = 1.0, lightness: float = 0.5, useHCL: bool = False) -> numpy.ndarray:
+    '''
+    Lookup table of colors moving along the hue circle. Cached and read only like createGradient.
+
+    Parameters
+    ----------
+    steps: The number of colors in the table
+
+    startHue, endHue: Hues to go between. endHue can be past 1 to wrap around the circle
+
+    saturation: Saturation of the colors, or chroma if useHCL is set
+
+    lightness: Lightness of the colors
+
+    useHCL: Whether to use createHCL instead of createHSL
+    '''
+
+    # The color functions don't wrap hues themselves
+    hues = numpy.linspace(startHue, endHue, steps, endpoint = False) % 1.0
+
+    if useHCL:
+        colors = createHCLArray(hues, saturation, numpy.full(steps, lightness))
+    else:
+        colors = createHSLArray(hues, saturation, numpy.full(steps, lightness))
+
+    palette = colorArrayToUInt8(colors)
+    palette.flags.writeable = False
+
+    return palette
+
+def applyPalette(canvas, palette: numpy.ndarray, indices: numpy.ndarray, location: Tuple[int, int] = (0, 0), offset: int = 0, target: str = "background"):
+    '''
+    Color a region of a canvas by looking colors up in a palette. Indices wrap around the palette,
+        so cycling the colors of an animated background is just changing the offset each frame.
+
+    Parameters
+    ----------
+    canvas: Canvas to color
+
+    palette: Lookup table from createGradient or createHueGradient, shaped (colors, 3)
+
+    indices: Integer array shaped (w, h) of palette indices for each character of the region
+
+    location: (x, y) of the top left of the region on the canvas. Any part of the region off the canvas is skipped
+
+    offset: Added to every index before looking up the color
+
+    target: "background", "text", or "both"
+    '''
+
+    if target not in ("background", "text", "both"):
+        raise Exception("Unknown palette target: " + str(target))
+
+    # Clip the region to the canvas
+    x, y = location
+    w, h = indices.shape
+
+    startX, startY = max(x, 0), max(y, 0)
+    endX, endY = min(x + w, canvas.width), min(y + h, canvas.height)
+    if startX >= endX or startY >= endY:
+        return
+
+    indices = indices[startX - x:endX - x, startY - y:endY - y]
+    x, y = startX, startY
+    w, h = endX - startX, endY - startY
+
+    if offset != 0:
+        indices = indices + offset
+
+    # The colors are written straight into the canvas without any temporary color arrays
+    if target in ("background", "both"):
+        numpy.take(palette, indices, axis = 0, mode = "wrap", out = canvas.backgroundColors[x:x + w, y:y + h])
+
+    if target in ("text", "both"):
+        numpy.take(palette, indices, axis = 0, mode = "wrap", out = canvas.textColors[x:x + w, y:y + h])
\ No newline at end of file
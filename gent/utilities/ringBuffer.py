@@ -0,0 +1,166 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from typing import Any, Iterable, List
+
+class RingBuffer:
+    '''
+    Fixed capacity buffer. Once the buffer is full, appending an item overwrites the oldest item.
+
+    Items are indexed from the oldest (0) to the newest (len - 1). Every item is also given a sequence number
+    which stays the same for as long as the item is in the buffer, even as older items are overwritten.
+    Sequence numbers are never reused, so after a pop there is a gap before the next item's sequence number.
+
+    Parameters
+    ----------
+    capacity: The maximum number of items the buffer holds.
+    '''
+
+    def __init__(self, capacity: int):
+
+        if capacity < 1:
+            raise Exception("RingBuffer capacity must be at least one")
+
+        self.capacity: int = capacity
+
+        # Storage for the items and their sequence numbers, allocated once
+        self.items: List[Any] = [None] * capacity
+        self.sequences: List[int] = [0] * capacity
+
+        # Index in self.items of the oldest item, and how many items are stored
+        self.start: int = 0
+        self.length: int = 0
+
+        # Total number of items ever appended. This is the sequence number of the next item
+        self.totalAppended: int = 0
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index: int):
+
+        # Allow negative indexing from the newest item
+        if index < 0:
+            index += self.length
+        if index < 0 or index >= self.length:
+            raise IndexError("RingBuffer index out of range")
+
+        return self.items[(self.start + index) % self.capacity]
+
+    def __iter__(self):
+        for i in range(self.length):
+            yield self.items[(self.start + i) % self.capacity]
+
+    def append(self, item: Any):
+        '''
+        Add an item to the end of the buffer, overwriting the oldest item if the buffer is full.
+        '''
+
+        if self.length < self.capacity:
+            index = (self.start + self.length) % self.capacity
+            self.length += 1
+        else:
+            index = self.start
+            self.start = (self.start + 1) % self.capacity
+
+        self.items[index] = item
+        self.sequences[index] = self.totalAppended
+
+        self.totalAppended += 1
+
+    def extend(self, items: Iterable[Any]):
+        '''
+        Append each item in order.
+        '''
+
+        for item in items:
+            self.append(item)
+
+    def pop(self) -> Any:
+        '''
+        Remove and return the newest item. Its sequence number isn't given to the next item.
+        '''
+
+        if self.length == 0:
+            raise IndexError("pop from an empty RingBuffer")
+
+        index = (self.start + self.length - 1) % self.capacity
+        item = self.items[index]
+        self.items[index] = None
+        self.length -= 1
+
+        return item
+
+    def clear(self):
+        '''
+        Remove every item. Sequence numbers keep counting up from where they were.
+        '''
+
+        self.items = [None] * self.capacity
+        self.start = 0
+        self.length = 0
+
+    def getSequence(self, index: int) -> int:
+        '''
+        Sequence number of the item at an index.
+        '''
+
+        if index < 0:
+            index += self.length
+        if index < 0 or index >= self.length:
+            raise IndexError("RingBuffer index out of range")
+
+        return self.sequences[(self.start + index) % self.capacity]
+
+    def getFirstSequence(self) -> int:
+        '''
+        Sequence number of the oldest item in the buffer. If the buffer is empty, this is the sequence number the next item will get.
+        '''
+
+        if self.length == 0:
+            return self.totalAppended
+
+        return self.sequences[self.start]
+
+    def getLastSequence(self) -> int:
+        '''
+        Sequence number of the newest item in the buffer. If the buffer is empty, this is one less than getFirstSequence.
+        '''
+
+        if self.length == 0:
+            return self.totalAppended - 1
+
+        return self.sequences[(self.start + self.length - 1) % self.capacity]
+
+    def getIndex(self, sequence: int) -> int:
+        '''
+        Index of the item with a sequence number. Raises an IndexError if it isn't in the buffer.
+        '''
+
+        # Without any pops the sequence numbers have no gaps, so the index can be worked out directly
+        index = sequence - self.getFirstSequence()
+        if index < 0:
+            raise IndexError("Item has already been overwritten")
+        if index < self.length and self.getSequence(index) == sequence:
+            return index
+
+        # Sequence numbers always increase from the oldest item to the newest, so binary search for it
+        low, high = 0, self.length
+        while low < high:
+            middle = (low + high) // 2
+            if self.getSequence(middle) < sequence:
+                low = middle + 1
+            else:
+                high = middle
+
+        index = low
+        if index >= self.length or self.getSequence(index) != sequence:
+            raise IndexError("No item with sequence number %i" % sequence)
+
+        return index
+
+    def getBySequence(self, sequence: int) -> Any:
+        '''
+        Get an item by its sequence number.
+        '''
+
+        return self[self.getIndex(sequence)]
\ No newline at end of file
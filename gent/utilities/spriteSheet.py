@@ -0,0 +1,109 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from typing import List, Tuple
+
+import numpy
+
+from .image import ImageData, loadPNG
+
+class SpriteSheet:
+    '''
+    Animation frames stored together in one contiguous array for each ImageData field. Each array is shaped (frames, w, h, ...),
+        so getting a frame, or a flipped frame, is a view into the arrays instead of a copy.
+
+    Parameters
+    ----------
+    frames: List of ImageData for each frame. Every frame must be the same size
+
+    useHalfBlocks: Whether the frames were loaded with half blocks. Flipping these vertically also swaps the text and background colors,
+        because the top and bottom halves of each character swap places
+    '''
+
+    def __init__(self, frames: List[ImageData], useHalfBlocks: bool = True):
+
+        if len(frames) == 0:
+            raise Exception("SpriteSheet needs at least one frame")
+
+        size = frames[0].backgroundColorData.shape[:2]
+        for frame in frames:
+            if frame.backgroundColorData.shape[:2] != size:
+                raise Exception("Every SpriteSheet frame must be the same size")
+
+        self.useHalfBlocks: bool = useHalfBlocks
+        self.w, self.h = size
+
+        # Use the same types as the canvas, so drawing a frame doesn't need to convert anything
+        self.backgroundColorData: numpy.ndarray = numpy.ascontiguousarray(numpy.stack([frame.backgroundColorData for frame in frames]), dtype = numpy.uint8)
+        self.textColorData: numpy.ndarray = numpy.ascontiguousarray(numpy.stack([frame.textColorData for frame in frames]), dtype = numpy.uint8)
+        self.transparencyData: numpy.ndarray = numpy.ascontiguousarray(numpy.stack([frame.transparencyData for frame in frames]), dtype = numpy.uint8)
+        self.characterData: numpy.ndarray = numpy.ascontiguousarray(numpy.stack([frame.characterData for frame in frames]), dtype = numpy.uint16)
+
+    def __len__(self):
+        return self.backgroundColorData.shape[0]
+
+    @staticmethod
+    def fromImageData(imageData: ImageData, frameSize: Tuple[int, int], frameCount: int = None, useHalfBlocks: bool = True) -> "SpriteSheet":
+        '''
+        Split a single image of frames laid out in a grid into a SpriteSheet. Frames are read left to right, then top to bottom.
+
+        Parameters
+        ----------
+        frameSize: (w, h) of each frame
+
+        frameCount: The number of frames in the image. Defaults to every frame in the grid
+        '''
+
+        frameW, frameH = frameSize
+        columns = imageData.backgroundColorData.shape[0] // frameW
+        rows = imageData.backgroundColorData.shape[1] // frameH
+
+        if frameCount is None:
+            frameCount = columns * rows
+
+        frames = []
+        for i in range(frameCount):
+            x, y = (i % columns) * frameW, (i // columns) * frameH
+            frames.append(ImageData(*[
+                data[x:x + frameW, y:y + frameH]
+                for data in (imageData.backgroundColorData, imageData.textColorData, imageData.transparencyData, imageData.characterData)
+            ]))
+
+        return SpriteSheet(frames, useHalfBlocks)
+
+    @staticmethod
+    def fromPNG(filePath: str, frameSize: Tuple[int, int], columns: int, rows: int = 1, frameCount: int = None, useHalfBlocks: bool = True) -> "SpriteSheet":
+        '''
+        Load a png of frames laid out in a grid. frameSize is in terminal space, the same as loadPNG's outputSize.
+        '''
+
+        imageData = loadPNG(filePath, (frameSize[0] * columns, frameSize[1] * rows), useHalfBlocks)
+
+        return SpriteSheet.fromImageData(imageData, frameSize, frameCount, useHalfBlocks)
+
+    def getFrame(self, index: int, flipX: bool = False, flipY: bool = False) -> ImageData:
+        '''
+        Get a frame as ImageData. The arrays are views into the sheet, so they shouldn't be written to.
+
+        Parameters
+        ----------
+        flipX: Mirror the frame left to right
+
+        flipY: Flip the frame upside down
+        '''
+
+        xSlice = slice(None, None, -1) if flipX else slice(None)
+        ySlice = slice(None, None, -1) if flipY else slice(None)
+
+        backgroundColorData = self.backgroundColorData[index, xSlice, ySlice]
+        textColorData = self.textColorData[index, xSlice, ySlice]
+
+        # The top half of a half block character is the text color, and the bottom half is the background color
+        if flipY and self.useHalfBlocks:
+            backgroundColorData, textColorData = textColorData, backgroundColorData
+
+        return ImageData(
+            backgroundColorData,
+            textColorData,
+            self.transparencyData[index, xSlice, ySlice],
+            self.characterData[index, xSlice, ySlice]
+        )
\ No newline at end of file
@@ -1,3 +1,7 @@
 # Copyright Clayton Brown 2019. See LICENSE file.
 
-from .lineSplitter import recursiveSplit
\ No newline at end of file
+from .lineSplitter import recursiveSplit
+
+from .renderCache import RenderedTextCache, RenderedLine, TEXT_CACHE
+
+from .searchIndex import SearchIndex
\ No newline at end of file
@@ -0,0 +1,134 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from collections import OrderedDict
+
+from dataclasses import dataclass
+
+from threading import Lock
+
+from typing import Tuple
+
+import numpy
+
+@dataclass
+class RenderedLine:
+    '''
+    The rendered cells for a single line of text.
+
+    The arrays are shared by everything which hits the same cache entry, so they should never be written to.
+    '''
+
+    # Character values for each cell of the line (width,)
+    characters: numpy.ndarray
+
+    # The text and background color of the line
+    textColor: numpy.ndarray
+    backgroundColor: numpy.ndarray
+
+    # Where the text starts and ends after justification
+    lineStart: int
+    lineEnd: int
+
+def renderLine(text: str, width: int, justify: str, textColor: tuple, backgroundColor: tuple) -> RenderedLine:
+    '''
+    Render a single line of text into cells. Justify is "L", "R", or "C".
+    '''
+
+    # Create adjusted text to ignore the trailing space
+    adjustedText = text
+    if len(adjustedText) > 0 and (adjustedText[-1] == " " or adjustedText[-1] == "\n"):
+        adjustedText = adjustedText[:-1]
+
+    # Determine where the text needs to start to handle the justification
+    startIndex = 0
+    if justify == "R":
+        startIndex = width - len(adjustedText)
+    elif justify == "C":
+        startIndex = (width - len(adjustedText)) // 2
+
+    # Loop through all the text values and assign the correct characters
+    characters = numpy.full((width,), ord(" "), dtype = numpy.uint16)
+    for i in range(min(len(adjustedText), width)):
+        characters[startIndex + i] = ord(adjustedText[i])
+
+    # Entries are shared, so make sure nobody can change them by accident
+    characters.flags.writeable = False
+    textColorArray = numpy.array(textColor, dtype = numpy.uint8)
+    textColorArray.flags.writeable = False
+    backgroundColorArray = numpy.array(backgroundColor, dtype = numpy.uint8)
+    backgroundColorArray.flags.writeable = False
+
+    return RenderedLine(characters, textColorArray, backgroundColorArray, startIndex, startIndex + len(text))
+
+class RenderedTextCache:
+    '''
+    Least recently used cache of rendered text lines. Keyed by (text, width, justify, textColor, backgroundColor).
+
+    Parameters
+    ----------
+    maxEntries: The number of lines kept before the least recently used line is evicted.
+    '''
+
+    def __init__(self, maxEntries: int = 2048):
+
+        self.maxEntries: int = maxEntries
+
+        # Ordered from least recently used to most recently used
+        self.entries: OrderedDict = OrderedDict()
+
+        # Lines are rendered from both the draw thread and the event thread
+        self.lock: Lock = Lock()
+
+        # Statistics for tuning maxEntries
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def getLine(self, text: str, width: int, justify: str, textColor: tuple, backgroundColor: tuple) -> RenderedLine:
+        '''
+        Return the rendered cells for a line of text, rendering it only if it isn't already cached.
+        '''
+
+        key = (text, width, justify, tuple(textColor), tuple(backgroundColor))
+
+        with self.lock:
+            renderedLine = self.entries.get(key)
+            if renderedLine is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return renderedLine
+
+        # Render outside of the lock so other threads aren't held up
+        renderedLine = renderLine(text, width, justify, textColor, backgroundColor)
+
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = renderedLine
+
+            # Evict the least recently used lines
+            while len(self.entries) > self.maxEntries:
+                self.entries.popitem(last = False)
+
+        return renderedLine
+
+    def setMaxEntries(self, maxEntries: int):
+        '''
+        Change the size of the cache, evicting lines if it is now too large.
+        '''
+
+        with self.lock:
+            self.maxEntries = maxEntries
+            while len(self.entries) > self.maxEntries:
+                self.entries.popitem(last = False)
+
+    def clear(self):
+        '''
+        Remove every line from the cache and reset the statistics.
+        '''
+
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+# Shared cache used by every TextLine
+TEXT_CACHE: RenderedTextCache = RenderedTextCache()
\ No newline at end of file
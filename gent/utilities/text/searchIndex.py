@@ -0,0 +1,79 @@
+# Copyright Clayton Brown 2019. See LICENSE file.
+
+from typing import Dict, Iterable, List
+
+class SearchIndex:
+    '''
+    Case insensitive substring index over a list of strings, used for filtering as the user types.
+
+    The index is built once, or a chunk at a time with addKeys. The first character of a query is looked up directly in the index,
+        and each extra character only narrows the results of the previous query instead of searching every string again.
+
+    Parameters
+    ----------
+    keys: The strings to search. Results are indices into this list.
+    '''
+
+    def __init__(self, keys: Iterable[str] = ()):
+
+        self.keys: List[str] = []
+
+        # For each character, the indices of every key which contains it
+        self.characterIndex: Dict[str, List[int]] = {}
+
+        # The current query, and the results for each prefix of it. resultStack[n] holds the results for query[:n]
+        self.query: str = ""
+        self.resultStack: List[List[int]] = [[]]
+
+        self.addKeys(keys)
+
+    def addKeys(self, keys: Iterable[str]):
+        '''
+        Add more strings to the end of the index. The current query is cleared.
+        '''
+
+        start = len(self.keys)
+        self.keys.extend(key.lower() for key in keys)
+
+        for i in range(start, len(self.keys)):
+            for character in set(self.keys[i]):
+                if character not in self.characterIndex:
+                    self.characterIndex[character] = []
+                self.characterIndex[character].append(i)
+
+        self.query = ""
+        self.resultStack = [list(range(len(self.keys)))]
+
+    def setQuery(self, query: str) -> List[int]:
+        '''
+        Change the query and return the indices of every key which contains it, in their original order.
+        '''
+
+        query = query.lower()
+
+        # Keep the results for the start of the query which hasn't changed
+        commonLength = 0
+        while commonLength < min(len(query), len(self.query)) and query[commonLength] == self.query[commonLength]:
+            commonLength += 1
+        del self.resultStack[commonLength + 1:]
+
+        # Then narrow the results one character at a time
+        for i in range(commonLength, len(query)):
+            self.resultStack.append(self.refine(self.resultStack[-1], query[:i + 1]))
+
+        self.query = query
+
+        return self.resultStack[-1]
+
+    def refine(self, previousResults: List[int], query: str) -> List[int]:
+        '''
+        Narrow the results for a query which is one character longer than the query which produced previousResults.
+        '''
+
+        if len(query) == 1:
+            return list(self.characterIndex.get(query, []))
+
+        return [i for i in previousResults if query in self.keys[i]]
+
+    def getResults(self) -> List[int]:
+        return self.resultStack[-1]
\ No newline at end of file